@@ -1,29 +1,10 @@
 from crewai.project import CrewBase, agent, crew, task
-from crewai import Agent, Crew, Task, LLM
-from crewai_tools import FileReadTool
-from pathlib import Path
-import os
-
-# Initialize language models with API keys from environment variables
-openai = LLM(
-    model="gpt-4o",
-    api_key=os.getenv("OPENAI_API_KEY")
-)
-
-gemini = LLM(
-    model="gemini/gemini-2.0-flash-exp",
-    api_key=os.getenv("GEMINI_API_KEY")
-)
-
-anthropic = LLM(
-    model="claude-3-5-sonnet-20241022",
-    api_key=os.getenv("ANTHROPIC_API_KEY")
-)
-
-deepseek = LLM(
-    model="openrouter/deepseek/deepseek-r1",
-    api_key=os.getenv("OPENROUTER_API_KEY")
-)
+from crewai import Agent, Crew, Task
+from crew_events import CrewProgress
+from llms import get_llm
+from storage import user_dir, with_output_file
+from task_graph import schedule_tasks
+from tools.token_budget import BudgetedFileReadTool, token_budget_from_env
 
 @CrewBase
 class AnalysisCrew():
@@ -32,17 +13,24 @@ class AnalysisCrew():
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
-    def __init__(self, inputs: dict):
+    def __init__(self, inputs: dict, on_event=None, bypass_cache: bool = False):
         """
         Initialize the AnalysisCrew with user-specific settings.
 
         Args:
             user_id (str): The ID of the user for whom the analysis is being performed.
             inputs (dict): The inputs required for the analysis.
+            on_event (callable, optional): Callback receiving progress events.
+            bypass_cache (bool): Whether to run every task even if its output is cached.
         """
         try:
             self.inputs = inputs
-            self.output_dir = Path('outputs') / str(self.inputs['user_id'])
+            self.on_event = on_event
+            self.bypass_cache = bypass_cache
+            self.progress = None
+            self.output_dir = user_dir(self.inputs['user_id'])
+            # Caps and measures what the file tools feed to the agents
+            self.token_budget = token_budget_from_env()
         except Exception as e:
             print(f"Error initializing AnalysisCrew: {e}")
             raise
@@ -58,7 +46,7 @@ class AnalysisCrew():
         try:
             return Agent(
                 config=self.agents_config['data_analyst'],
-                llm=anthropic,
+                llm=get_llm('anthropic'),
                 verbose=False
             )
         except Exception as e:
@@ -75,26 +63,24 @@ class AnalysisCrew():
             Task: The configured task for analyzing keyword rankings data.
         """
         try:
-            return Task(
-                config=self.tasks_config['analyze_keyword_rankings_data'],
-                agent=self.data_analyst_agent(),
-                tools=[
-                    FileReadTool(
-                        name="Read competitor rankings data",
-                        description="Read the competitor_rankings.json file",
-                        file_path=self.output_dir / 'data' / 'competitor_rankings.json',
-                        encoding='utf-8',
-                        errors='ignore'
-                    ),
-                    FileReadTool(
-                        name="Read user rankings data",
-                        description="Read the user_rankings.json file",
-                        file_path=self.output_dir / 'data' / 'user_rankings.json',
-                        encoding='utf-8',
-                        errors='ignore'
-                    )
-                ],
-                output_file=str(self.output_dir / 'crew' / '1_analysis.md')
+            agent = self.data_analyst_agent()
+            return with_output_file(
+                Task(
+                    config=self.tasks_config['analyze_keyword_rankings_data'],
+                    agent=agent,
+                    tools=[
+                        BudgetedFileReadTool(
+                            name="Read keyword analysis tables",
+                            description="Read the analysis_tables.md file",
+                            file_path=self.output_dir / 'data' / 'analysis_tables.md',
+                            task_name='analyze_keyword_rankings_data',
+                            budget=self.token_budget,
+                            model=agent.llm.model
+                        )
+                    ]
+                ),
+                # The keyword tables are added to the report by compose_analysis_report
+                self.output_dir / 'crew' / '1_analysis_narrative.md'
             )
         except Exception as e:
             print(f"Error creating analyze keyword rankings data task: {e}")
@@ -109,10 +95,24 @@ class AnalysisCrew():
             Crew: The configured crew with agents and tasks.
         """
         try:
+            # Independent tasks run concurrently; dependencies come from tasks.yaml
+            tasks = schedule_tasks(self.tasks, self.tasks_config)
+            if self.on_event is None:
+                return Crew(
+                    agents=self.agents,
+                    tasks=tasks,
+                    verbose=True
+                )
+
+            # Report task, tool and agent output progress to the caller
+            self.progress = CrewProgress(self.on_event, tasks)
             return Crew(
                 agents=self.agents,
-                tasks=self.tasks,
-                verbose=True
+                tasks=tasks,
+                verbose=True,
+                step_callback=self.progress.step_callback,
+                task_callback=self.progress.task_callback,
+                before_kickoff_callbacks=[self.progress.before_kickoff]
             )
         except Exception as e:
             print(f"Error creating crew: {e}")
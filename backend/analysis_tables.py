@@ -0,0 +1,234 @@
+from pathlib import Path
+import pandas as pd
+
+METRIC_COLUMNS = {
+    'searchVolume': 'Search Volume',
+    'rankingDifficulty': 'Ranking Difficulty',
+    'totalMonthlyClicks': 'Total Monthly Clicks',
+    'exactCostPerClick': 'Exact Cost Per Click',
+    'paidCompetitors': 'Paid Competitors'
+}
+USER_DOMAIN = 'Your domain'
+
+def rankings_frame(rankings_data: dict) -> pd.DataFrame:
+    """Flatten SpyFu rankings into one row per domain and keyword.
+
+    Args:
+        rankings_data (dict): Domain to its rankings in the SpyFu tool's format.
+            Domains whose fetch failed are skipped.
+
+    Returns:
+        pd.DataFrame: Columns domain, keyword and the metric fields, in input order.
+    """
+    rows = [
+        {'domain': domain, **result}
+        for domain, data in rankings_data.items()
+        for result in data.get('results', [])
+        if result.get('keyword')
+    ]
+    frame = pd.DataFrame(rows, columns=['domain', 'keyword', *METRIC_COLUMNS])
+    for field in METRIC_COLUMNS:
+        frame[field] = pd.to_numeric(frame[field], errors='coerce').astype('float64')
+    return frame
+
+def _format_value(value) -> str:
+    """Format a table cell, printing missing values as '-'."""
+    if pd.isna(value):
+        return '-'
+    if isinstance(value, float):
+        return f'{value:,.2f}' if not value.is_integer() else f'{int(value):,}'
+    if isinstance(value, int):
+        return f'{value:,}'
+    return str(value).replace('|', '\\|')
+
+def markdown_table(frame: pd.DataFrame) -> str:
+    """Render a data frame as a markdown table.
+
+    Args:
+        frame (pd.DataFrame): The rows to render, with display column names.
+
+    Returns:
+        str: The markdown table.
+    """
+    lines = [
+        '| ' + ' | '.join(str(column) for column in frame.columns) + ' |',
+        '|' + '|'.join('---' for _ in frame.columns) + '|'
+    ]
+    for row in frame.itertuples(index=False):
+        lines.append('| ' + ' | '.join(_format_value(value) for value in row) + ' |')
+    return '\n'.join(lines)
+
+def _keyword_table(frame: pd.DataFrame) -> str:
+    """Render the keyword metrics of one domain."""
+    return markdown_table(frame[['keyword', *METRIC_COLUMNS]].rename(columns={'keyword': 'Keyword', **METRIC_COLUMNS}))
+
+def keyword_tables(competitors: pd.DataFrame, user: pd.DataFrame) -> str:
+    """Render the per-competitor and user keyword tables.
+
+    Args:
+        competitors (pd.DataFrame): Competitor rankings from rankings_frame.
+        user (pd.DataFrame): User rankings from rankings_frame.
+
+    Returns:
+        str: Markdown sections with one table per competitor and one for the user.
+    """
+    sections = ['## 1. Competitor Keyword Analysis']
+    for domain, frame in competitors.groupby('domain', sort=False):
+        sections.append(f'### {domain}\n\n{_keyword_table(frame)}')
+
+    sections.append('## 2. User Keyword Analysis')
+    sections.append(_keyword_table(user) if not user.empty else 'No keyword data is available for your domain.')
+    return '\n\n'.join(sections)
+
+def summary_statistics(competitors: pd.DataFrame, user: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate the keyword metrics of every domain.
+
+    Args:
+        competitors (pd.DataFrame): Competitor rankings from rankings_frame.
+        user (pd.DataFrame): User rankings from rankings_frame.
+
+    Returns:
+        pd.DataFrame: One row per domain, the user's first.
+    """
+    frame = pd.concat([user.assign(domain=USER_DOMAIN), competitors], ignore_index=True)
+    summary = frame.groupby('domain', sort=False).agg(
+        keywords=('keyword', 'nunique'),
+        total_volume=('searchVolume', 'sum'),
+        median_difficulty=('rankingDifficulty', 'median'),
+        total_clicks=('totalMonthlyClicks', 'sum'),
+        average_cpc=('exactCostPerClick', 'mean'),
+        max_cpc=('exactCostPerClick', 'max')
+    ).reset_index()
+    summary.columns = [
+        'Domain', 'Keywords', 'Total Search Volume', 'Median Ranking Difficulty',
+        'Total Monthly Clicks', 'Average Cost Per Click', 'Highest Cost Per Click'
+    ]
+    return summary
+
+def keyword_gaps(competitors: pd.DataFrame, user: pd.DataFrame, limit: int = 15) -> pd.DataFrame:
+    """Find the competitor keywords the user does not rank for.
+
+    Keywords are ordered by search volume per point of ranking difficulty, so
+    large, easy keywords come first.
+
+    Args:
+        competitors (pd.DataFrame): Competitor rankings from rankings_frame.
+        user (pd.DataFrame): User rankings from rankings_frame.
+        limit (int): Maximum number of keywords returned.
+
+    Returns:
+        pd.DataFrame: The gap keywords with their metrics and competitor counts.
+    """
+    missing = competitors[~competitors['keyword'].isin(user['keyword'])]
+    gaps = missing.groupby('keyword', sort=False).agg(
+        competitors=('domain', 'nunique'),
+        **{field: (field, 'max') for field in METRIC_COLUMNS}
+    ).reset_index()
+    gaps['opportunity'] = gaps['searchVolume'] / (gaps['rankingDifficulty'].fillna(0) + 1)
+    gaps = gaps.sort_values('opportunity', ascending=False, kind='stable').head(limit)
+    return gaps[['keyword', 'competitors', *METRIC_COLUMNS]].rename(
+        columns={'keyword': 'Keyword', 'competitors': 'Competitors Ranking', **METRIC_COLUMNS}
+    )
+
+def metric_rankings(competitors: pd.DataFrame, user: pd.DataFrame, limit: int = 10) -> dict:
+    """Rank all keywords by search volume and by cost per click.
+
+    Args:
+        competitors (pd.DataFrame): Competitor rankings from rankings_frame.
+        user (pd.DataFrame): User rankings from rankings_frame.
+        limit (int): Number of keywords in each ranking.
+
+    Returns:
+        dict: Ranking title to a data frame of the top keywords.
+    """
+    frame = pd.concat([user.assign(domain=USER_DOMAIN), competitors], ignore_index=True)
+    keywords = frame.drop_duplicates('keyword').copy()
+    keywords['user_ranks'] = keywords['keyword'].isin(user['keyword']).map({True: 'Yes', False: 'No'})
+
+    rankings = {}
+    for field, title in (('searchVolume', 'Top Keywords by Search Volume'), ('exactCostPerClick', 'Top Keywords by Cost Per Click')):
+        top = keywords.nlargest(limit, field, keep='first')
+        rankings[title] = top[['keyword', 'searchVolume', 'exactCostPerClick', 'rankingDifficulty', 'user_ranks']].rename(columns={
+            'keyword': 'Keyword',
+            'user_ranks': 'You Rank',
+            **METRIC_COLUMNS
+        })
+    return rankings
+
+def keyword_overlap(competitors: pd.DataFrame, user: pd.DataFrame) -> pd.DataFrame:
+    """Count the keywords each pair of domains has in common.
+
+    Args:
+        competitors (pd.DataFrame): Competitor rankings from rankings_frame.
+        user (pd.DataFrame): User rankings from rankings_frame.
+
+    Returns:
+        pd.DataFrame: A domain by domain matrix of shared keyword counts.
+    """
+    frame = pd.concat([user.assign(domain=USER_DOMAIN), competitors], ignore_index=True)
+    if frame.empty:
+        return pd.DataFrame(columns=['Domain'])
+    domains = list(dict.fromkeys(frame['domain']))
+    membership = pd.crosstab(frame['keyword'], frame['domain']).clip(upper=1)[domains]
+    overlap = membership.T.dot(membership)
+    overlap.insert(0, 'Domain', overlap.index)
+    return overlap
+
+def build_analysis_tables(competitor_rankings: dict, user_rankings: dict) -> dict:
+    """Precompute the tables of the keyword rankings analysis.
+
+    Args:
+        competitor_rankings (dict): Competitor domain to its rankings.
+        user_rankings (dict): The user's rankings.
+
+    Returns:
+        dict: 'report' holds the keyword tables for the final report, and
+            'briefing' holds those tables plus the summary statistics, gaps,
+            metric rankings and overlap the analyst writes the narrative from.
+    """
+    competitors = rankings_frame(competitor_rankings)
+    user = rankings_frame({USER_DOMAIN: user_rankings})
+
+    report = keyword_tables(competitors, user)
+    sections = [
+        report,
+        f'## Summary Statistics\n\n{markdown_table(summary_statistics(competitors, user))}',
+        f'## Keyword Gaps (competitor keywords you do not rank for)\n\n{markdown_table(keyword_gaps(competitors, user))}'
+    ]
+    for title, frame in metric_rankings(competitors, user).items():
+        sections.append(f'## {title}\n\n{markdown_table(frame)}')
+    sections.append(f'## Keyword Overlap (shared keywords between domains)\n\n{markdown_table(keyword_overlap(competitors, user))}')
+
+    return {
+        'report': report,
+        'briefing': '\n\n'.join(sections)
+    }
+
+def write_analysis_tables(competitor_rankings: dict, user_rankings: dict, data_dir: Path):
+    """Precompute the analysis tables and save them for the analysis crew.
+
+    Args:
+        competitor_rankings (dict): Competitor domain to its rankings.
+        user_rankings (dict): The user's rankings.
+        data_dir (Path): The user's data directory.
+    """
+    tables = build_analysis_tables(competitor_rankings, user_rankings)
+    with open(data_dir / 'analysis_tables.md', 'w', encoding='utf-8') as f:
+        f.write(tables['briefing'])
+    with open(data_dir / 'analysis_report_tables.md', 'w', encoding='utf-8') as f:
+        f.write(tables['report'])
+
+def compose_analysis_report(output_dir: Path):
+    """Combine the precomputed keyword tables with the analyst's narrative.
+
+    Args:
+        output_dir (Path): The user's output directory.
+    """
+    with open(output_dir / 'data' / 'analysis_report_tables.md', 'r', encoding='utf-8') as f:
+        tables = f.read()
+    narrative_path = output_dir / 'crew' / '1_analysis_narrative.md'
+    with open(narrative_path, 'r', encoding='utf-8') as f:
+        narrative = f.read()
+
+    with open(output_dir / 'crew' / '1_analysis.md', 'w', encoding='utf-8') as f:
+        f.write(f'# SEO Keyword Performance Analysis\n\n{tables}\n\n{narrative.strip()}\n')
@@ -1,28 +1,46 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from spire.doc import Document, FileFormat
 from urllib.parse import unquote
 from pydantic import BaseModel
 from dotenv import load_dotenv
-from threading import Thread
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Thread, Event
 import shutil
+import queue
+import json
 import uuid
 import os
-import agentops
 
-from blog_writer import generate_blog
+from docx_store import get_docx, available_docx_files, prerender_docx
+from storage import user_dir, user_lock, get_storage
+from conversion_service import conversion_service
 from main import (
     run_analysis_crew,
     get_available_keywords,
     save_keyword_details,
     run_seo_crew
 )
+from jobs import job_manager, JobQueueFullError
+from seo_warmup import seo_warmups
 
 # Load environment variables
 load_dotenv()
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS").split(",")
+# Heading every blog outline starts with, as required by the outline task
+OUTLINE_MARKER = '# Blog Outline'
+
+# The Gemini client library is imported on first use, or by the startup warm-up, to keep startup fast
+def generate_blog(*args, **kwargs):
+    """Generate a blog post with blog_writer.generate_blog."""
+    from blog_writer import generate_blog as write_blog
+    return write_blog(*args, **kwargs)
+
+def warm_up_genai():
+    """Import the Gemini client library and create the shared clients."""
+    from blog_writer import warm_up_genai as warm_up
+    warm_up()
 
 app = FastAPI()
 
@@ -39,6 +57,7 @@ class UserData(BaseModel):
     """Model for user data input."""
     institution_name: str
     domain_url: str
+    bypass_cache: bool = False
 
 class KeywordsData(BaseModel):
     """Model for keywords data input."""
@@ -48,6 +67,22 @@ class OutlineData(BaseModel):
     """Model for outline data input."""
     outline: str
 
+def require_user_id(userId):
+    """Reject a missing or malformed user ID before an endpoint uses it.
+
+    Args:
+        userId (str): Unique identifier for the user, as sent by the client.
+
+    Raises:
+        HTTPException: 400 if the user ID is missing or could escape the storage root.
+    """
+    if not userId:
+        raise HTTPException(status_code=400, detail='User ID is required')
+    try:
+        user_dir(userId)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 def create_user_directory(userId):
     """Create user-specific directories for storing outputs.
 
@@ -55,12 +90,12 @@ def create_user_directory(userId):
         userId (str): Unique identifier for the user.
     """
     try:
-        user_dir = Path('outputs') / userId
-        crew_dir = user_dir / 'crew'
-        data_dir = user_dir / 'data'
-        blogs_dir = user_dir / 'blogs'
+        outputs_dir = user_dir(userId)
+        crew_dir = outputs_dir / 'crew'
+        data_dir = outputs_dir / 'data'
+        blogs_dir = outputs_dir / 'blogs'
 
-        user_dir.mkdir(parents=True, exist_ok=True)
+        outputs_dir.mkdir(parents=True, exist_ok=True)
         crew_dir.mkdir(exist_ok=True)
         data_dir.mkdir(exist_ok=True)
         blogs_dir.mkdir(exist_ok=True)
@@ -74,64 +109,169 @@ def cleanup_user_directory(userId):
         userId (str): Unique identifier for the user.
     """
     try:
-        user_dir = Path('outputs') / userId
-        if user_dir.exists():
-            shutil.rmtree(user_dir)
+        outputs_dir = user_dir(userId)
+        with user_lock(userId):
+            if outputs_dir.exists():
+                shutil.rmtree(outputs_dir)
+            get_storage().delete_user(userId)
     except Exception as e:
         print(f"Error cleaning up directory for user {userId}: {str(e)}")
 
-def convert_markdown_to_docx(markdown_file, output_filename, userId):
-    """Convert a markdown file to a DOCX file and save it.
+def format_sse(event: dict) -> str:
+    """Format a job event as a server-sent event.
 
     Args:
-        markdown_file (Path): Path to the markdown file to convert.
-        output_filename (str): Name of the output DOCX file.
-        userId (str): Unique identifier for the user.
+        event (dict): The event with its id, type and payload.
 
     Returns:
-        Path: Path to the saved DOCX file, or None if conversion failed.
+        str: The event in text/event-stream format.
     """
-    try:
-        # Setup output directory for DOCX files
-        doc_dir = Path('outputs') / userId / 'doc'
-        doc_dir.mkdir(parents=True, exist_ok=True)
-        output_path = doc_dir / output_filename
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
 
-        # Load the markdown file and save it as DOCX
-        doc = Document()
-        doc.LoadFromFile(str(markdown_file))
-        doc.SaveToFile(str(output_path), FileFormat.Docx2016)
-        doc.Dispose()
+def queue_event_response(events, request: Request = None, cancelled: Event = None):
+    """Stream events put on a queue by a worker thread as server-sent events.
 
-        print(f"✅ Saved to: {output_path}")
-        return output_path
+    Args:
+        events (queue.Queue): Queue of (event type, payload) tuples, ended by None.
+        request (Request, optional): The streaming request, checked for a client disconnect.
+        cancelled (Event, optional): Set when the client disconnects, so the worker thread stops.
 
-    except Exception as e:
-        print(f"Error converting {markdown_file}: {str(e)}")
+    Returns:
+        StreamingResponse: The text/event-stream response.
+    """
+    async def event_stream():
+        event_id = 0
+        try:
+            while True:
+                try:
+                    item = await run_in_threadpool(events.get, timeout=1.0)
+                except queue.Empty:
+                    if request is not None and await request.is_disconnected():
+                        print("Client disconnected, stopping the event stream")
+                        break
+                    continue
+                if item is None:
+                    break
+                yield format_sse({'id': event_id, 'event': item[0], 'data': item[1]})
+                event_id += 1
+        finally:
+            # Also reached when the server cancels the stream of a disconnected client
+            if cancelled is not None:
+                cancelled.set()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def split_outlines(outlines_content):
+    """Split the blog post outlines document into individual outlines.
+
+    Only segments containing the '# Blog Outline' marker every outline starts
+    with are kept, so a preamble or closing note around the outlines is dropped.
+
+    Args:
+        outlines_content (str): Markdown content with outlines separated by '---' lines.
+
+    Returns:
+        list[str]: The outlines in document order.
+    """
+    outlines = []
+    current = []
+    for line in outlines_content.splitlines():
+        if line.strip() == '---':
+            outlines.append('\n'.join(current).strip())
+            current = []
+        else:
+            current.append(line)
+    outlines.append('\n'.join(current).strip())
+    return [outline for outline in outlines if OUTLINE_MARKER in outline]
+
+def read_crew_output(path):
+    """Read a crew output file, stripping the markdown code fences around it.
+
+    The file is read once, line by line; it is only rewritten, atomically, if
+    it contained fences, so later readers see the clean markdown as well.
+
+    Args:
+        path (Path): The crew output file.
+
+    Returns:
+        str: The cleaned markdown, or None if the file does not exist.
+    """
+    if not path.exists():
         return None
 
+    lines = []
+    fenced = False
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip() in ('```markdown', '```'):
+                fenced = True
+            else:
+                lines.append(line)
+    content = ''.join(lines)
+
+    if fenced:
+        tmp_path = path.with_name(f'.{path.name}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    return content
+
+def prepare_download(userId, filename):
+    """Render a DOCX file if needed and publish it to the storage backend.
+
+    The markdown sources are fetched from the storage backend first, so any
+    node can render and serve any user's files.
+
+    Args:
+        userId (str): Unique identifier for the user.
+        filename (str): Name of the DOCX file.
+
+    Returns:
+        tuple: The local path of the file, or None if it does not exist, and a
+        presigned URL to download it from, or None if the API serves it.
+    """
+    storage = get_storage()
+    storage.sync_down(userId, ('crew', 'blogs', 'doc'))
+    file_path = get_docx(userId, filename)
+    if file_path is None:
+        return None, None
+
+    storage.sync_up(userId, ('doc',))
+    return file_path, storage.download_url(userId, file_path.relative_to(user_dir(userId)).as_posix(), filename)
+
 @app.get('/download/{userId}/{filename}')
 async def download_file(userId: str, filename: str):
     """Endpoint to download converted DOCX files.
 
+    DOCX files are rendered from their markdown source on the first download
+    and re-rendered only when the markdown has changed. With an object store
+    backend, the response redirects to a presigned URL of the file in the
+    bucket; otherwise the file is streamed from this node's disk.
+
     Args:
         userId (str): Unique identifier for the user.
         filename (str): Name of the file to download.
 
     Returns:
-        FileResponse: The requested file for download.
+        FileResponse | RedirectResponse: The requested file for download, or a redirect to it.
     """
+    require_user_id(userId)
     try:
-        if not userId:
-            raise HTTPException(status_code=400, detail='User ID is required')
-
-        file_path = Path('outputs') / userId / 'doc' / filename
+        file_path, url = await run_in_threadpool(prepare_download, userId, filename)
 
         # Check if the file exists before attempting to download
-        if not file_path.exists():
-            print(f"File not found: {file_path}")
+        if file_path is None:
+            print(f"File not found: {filename}")
             raise HTTPException(status_code=404, detail=f'File not found: {filename}')
 
+        if url is not None:
+            print(f"File found, redirecting to the object store: {file_path}")
+            return RedirectResponse(url, status_code=307)
+
         print(f"File found, sending: {file_path}")
 
         return FileResponse(
@@ -144,6 +284,70 @@ async def download_file(userId: str, filename: str):
         print(f"Error in download_file: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def finalize_analysis(userId):
+    """Clean the analysis crew output and list its DOCX file.
+
+    Args:
+        userId (str): Unique identifier for the user.
+
+    Returns:
+        dict: The markdown content and the names of the downloadable DOCX files.
+    """
+    crew_dir = user_dir(userId) / 'crew'
+
+    # Clean the analysis markdown file and serve it from memory
+    markdown_content = {}
+    analysis = read_crew_output(crew_dir / '1_analysis.md')
+    if analysis is not None:
+        markdown_content['analysis'] = analysis
+
+    # DOCX files are rendered on first download
+    docx_files = available_docx_files(userId, [
+        ('analysis.docx', 'analysis')
+    ])
+
+    # Optionally render it ahead of the download
+    if os.getenv("DOCX_PRERENDER", "false").lower() == "true":
+        prerender_docx(userId, list(docx_files.values()), {
+            filename: markdown_content[key] for key, filename in docx_files.items()
+        })
+
+    return {
+        'docxFiles': docx_files,
+        'markdown': markdown_content
+    }
+
+def analysis_job(userId, institution_name, domain_url, bypass_cache=False, on_event=None):
+    """Run the analysis crew and collect its outputs.
+
+    Args:
+        userId (str): Unique identifier for the user.
+        institution_name (str): Name of the institution.
+        domain_url (str): The domain URL to analyze.
+        bypass_cache (bool): Whether to rerun every crew task instead of replaying cached outputs.
+        on_event (callable, optional): Callback receiving progress events.
+
+    Returns:
+        dict: The analysis response content.
+    """
+    # Only one job at a time writes a user's crew outputs, whichever worker runs it
+    with user_lock(userId):
+        run_analysis_crew(userId, institution_name, domain_url, user_dir(userId), on_event=on_event, bypass_cache=bypass_cache)
+        print("Analysis crew run complete")
+
+        if on_event:
+            on_event('stage', {'stage': 'finalizing'})
+
+        result = {
+            'status': 'success',
+            'message': 'Analysis completed successfully',
+            'userId': userId,
+            **finalize_analysis(userId)
+        }
+        # Publish the outputs so any node can serve them
+        get_storage().sync_up(userId)
+        return result
+
 @app.post("/run/analysis")
 def run_analysis(data: UserData):
     """Run the analysis process for the given user data.
@@ -163,9 +367,8 @@ def run_analysis(data: UserData):
 
         create_user_directory(userId)
 
-        output_dir = Path('outputs') / userId
-
         # # Initialize AgentOps
+        # import agentops
         # agentops.init(
         #     api_key=os.getenv("AGENTOPS_API_KEY"),
         #     auto_start_session=False,
@@ -173,52 +376,11 @@ def run_analysis(data: UserData):
         # )
         # session = agentops.start_session(tags=["production"])
 
-        # Start the analysis process in a separate thread
-        result = Thread(target=run_analysis_crew, args=(userId, institution_name, domain_url, output_dir))
-        result.start()
-        result.join()
-
-        print("Analysis crew run complete")
-
         # # Store the session for later use
         # app.state.sessions = getattr(app.state, 'sessions', {})
         # app.state.sessions[userId] = session
 
-        # Clean the analysis markdown file
-        analysis_path = output_dir / 'crew' / '1_analysis.md'
-        if analysis_path.exists():
-            with open(analysis_path, 'r', encoding='utf-8') as f:
-                analysis_content = f.readlines()
-            analysis_content = [line for line in analysis_content if line.strip() != '```markdown' and line.strip() != '```']
-            with open(analysis_path, 'w', encoding='utf-8') as f:
-                f.writelines(analysis_content)
-
-        # Serve the analysis markdown file
-        markdown_content = {}
-        if analysis_path.exists():
-            with open(analysis_path, 'r', encoding='utf-8') as f:
-                markdown_content['analysis'] = f.read()
-
-        # Convert the analysis markdown file to a DOCX file
-        docx_files = {}
-        for file_info in [
-            ('1_analysis.md', 'analysis.docx', 'analysis')
-        ]:
-            md_file = output_dir / 'crew' / file_info[0]
-            if md_file.exists():
-                print(f"Converting {md_file} to {file_info[1]}")
-                if convert_markdown_to_docx(md_file, file_info[1], userId):
-                    docx_files[file_info[2]] = file_info[1]
-            else:
-                print(f"Warning: {md_file} not found")
-
-        return JSONResponse(content={
-            'status': 'success',
-            'message': 'Analysis completed successfully',
-            'userId': userId,
-            'docxFiles': docx_files,
-            'markdown': markdown_content
-        })
+        return JSONResponse(content=analysis_job(userId, institution_name, domain_url, data.bypass_cache))
 
     except Exception as e:
         print(f"Error in /run/analysis: {str(e)}")
@@ -234,11 +396,10 @@ def get_keywords(userId: str):
     Returns:
         JSONResponse: List of available keywords.
     """
+    require_user_id(userId)
     try:
-        if not userId:
-            raise HTTPException(status_code=400, detail='User ID is required')
-
         # Fetch available keywords using the function from main.py
+        get_storage().sync_down(userId, ('data',))
         keywords_result = get_available_keywords(userId)
 
         return JSONResponse(content=keywords_result)
@@ -257,18 +418,88 @@ def save_keywords(userId: str, data: KeywordsData):
     Returns:
         JSONResponse: Status of the save operation.
     """
+    require_user_id(userId)
     try:
         keywords = data.keywords
 
-        if not userId:
-            raise HTTPException(status_code=400, detail='User ID is required')
-
+        storage = get_storage()
+        storage.sync_down(userId, ('data',))
         save_keyword_details(userId, keywords)
+        storage.sync_up(userId, ('data',))
         return JSONResponse(content={'status': 'success'})
     except Exception as e:
         print(f"Error in save_keywords: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def finalize_seo(userId):
+    """Clean the SEO crew outputs and list their DOCX files.
+
+    Args:
+        userId (str): Unique identifier for the user.
+
+    Returns:
+        dict: The markdown content and the names of the downloadable DOCX files.
+    """
+    crew_dir = user_dir(userId) / 'crew'
+
+    # Clean the SEO markdown files and serve them from memory
+    markdown_content = {}
+    markdown_files = {
+        'ad': crew_dir / '2_ad_copies.md',
+        'outlines': crew_dir / '3_blog_post_outlines.md'
+    }
+    for key, path in markdown_files.items():
+        content = read_crew_output(path)
+        if content is not None:
+            markdown_content[key] = content
+
+    # DOCX files are rendered on first download
+    docx_files = available_docx_files(userId, [
+        ('ad_copies.docx', 'ad'),
+        ('blog_post_outlines.docx', 'outlines')
+    ])
+
+    # Optionally render them ahead of the download, in parallel
+    if os.getenv("DOCX_PRERENDER", "false").lower() == "true":
+        prerender_docx(userId, list(docx_files.values()), {
+            filename: markdown_content[key] for key, filename in docx_files.items()
+        })
+
+    return {
+        'markdown': markdown_content,
+        'docxFiles': docx_files
+    }
+
+def seo_job(userId, institution_name, domain_url, bypass_cache=False, on_event=None):
+    """Run the SEO crew and collect its outputs.
+
+    Args:
+        userId (str): Unique identifier for the user.
+        institution_name (str): Name of the institution.
+        domain_url (str): The domain URL to analyze.
+        bypass_cache (bool): Whether to rerun every crew task instead of replaying cached outputs.
+        on_event (callable, optional): Callback receiving progress events.
+
+    Returns:
+        dict: The SEO response content.
+    """
+    # Only one job at a time writes a user's crew outputs, whichever worker runs it
+    with user_lock(userId):
+        # The analysis and the keyword selection may have been saved by another node
+        get_storage().sync_down(userId)
+        run_seo_crew(userId, institution_name, domain_url, on_event=on_event, bypass_cache=bypass_cache)
+
+        if on_event:
+            on_event('stage', {'stage': 'finalizing'})
+
+        result = {
+            'status': 'success',
+            **finalize_seo(userId)
+        }
+        # Publish the outputs so any node can serve them
+        get_storage().sync_up(userId)
+        return result
+
 @app.post("/run/seo/{userId}")
 def run_seo(userId: str, data: UserData):
     """Run the SEO process for the given user data.
@@ -280,22 +511,14 @@ def run_seo(userId: str, data: UserData):
     Returns:
         JSONResponse: Result of the SEO process.
     """
+    require_user_id(userId)
     try:
         institution_name = data.institution_name
         domain_url = data.domain_url
 
-        if not userId:
-            raise HTTPException(status_code=400, detail='User ID is required')
-
         # # Get the existing session if available
         # session = getattr(app.state, 'sessions', {}).get(userId)
 
-
-        # Start the SEO process in a separate thread
-        result = Thread(target=run_seo_crew, args=(userId, institution_name, domain_url))
-        result.start()
-        result.join()
-
         # # Clean up the agentops session
         # if session:
         #     print("❗Cleaning up agentops session")
@@ -306,56 +529,98 @@ def run_seo(userId: str, data: UserData):
         #         app.state.sessions.pop(userId, None)
         #         print("✅ Session popped from app.state.sessions")
 
-        crew_dir = Path('outputs') / userId / 'crew'
-        # List of markdown files to clean
-        markdown_files = [
-            ('2_ad_copies.md', 'ad'),
-            ('3_blog_post_outlines.md', 'outlines')
-        ]
-        for file_name, _ in markdown_files:
-            file_path = crew_dir / file_name
-            if file_path.exists():
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.readlines()
-                content = [line for line in content if line.strip() != '```markdown' and line.strip() != '```']
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.writelines(content)
-
-        # Serve the SEO markdown files
-        markdown_content = {}
-        markdown_files = {
-            'ad': crew_dir / '2_ad_copies.md',
-            'outlines': crew_dir / '3_blog_post_outlines.md'
-        }
-        for key, path in markdown_files.items():
-            if path.exists():
-                with open(path, 'r', encoding='utf-8') as f:
-                    markdown_content[key] = f.read()
-
-        # Convert the SEO markdown files to DOCX files
-        docx_files = {}
-        file_info = [
-            ('2_ad_copies.md', 'ad_copies.docx', 'ad'),
-            ('3_blog_post_outlines.md', 'blog_post_outlines.docx', 'outlines')
-        ]
-        for file_info in file_info:
-            md_file = crew_dir / file_info[0]
-            if md_file.exists():
-                print(f"Converting {md_file} to {file_info[1]}")
-                if convert_markdown_to_docx(md_file, file_info[1], userId):
-                    docx_files[file_info[2]] = file_info[1]
-            else:
-                print(f"Warning: {md_file} not found")
-
-        return JSONResponse(content={
-            'status': 'success',
-            'markdown': markdown_content,
-            'docxFiles': docx_files
-        })
+        return JSONResponse(content=seo_job(userId, institution_name, domain_url, data.bypass_cache))
     except Exception as e:
         print(f"Error in /run/seo: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/jobs/analysis", status_code=202)
+def submit_analysis_job(data: UserData):
+    """Queue the analysis process and return its job ID immediately.
+
+    Args:
+        data (UserData): User data containing institution name and domain URL.
+
+    Returns:
+        JSONResponse: The job ID and the user ID the outputs will be stored under.
+    """
+    userId = str(uuid.uuid4())
+    create_user_directory(userId)
+
+    try:
+        job = job_manager.submit('analysis', userId, analysis_job, userId, data.institution_name, data.domain_url, data.bypass_cache)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return JSONResponse(status_code=202, content={
+        'status': 'success',
+        'jobId': job.id,
+        'userId': userId,
+        'queueDepth': job_manager.depth
+    })
+
+@app.post("/jobs/seo/{userId}", status_code=202)
+def submit_seo_job(userId: str, data: UserData):
+    """Queue the SEO process and return its job ID immediately.
+
+    Args:
+        userId (str): Unique identifier for the user.
+        data (UserData): User data containing institution name and domain URL.
+
+    Returns:
+        JSONResponse: The job ID.
+    """
+    require_user_id(userId)
+
+    try:
+        job = job_manager.submit('seo', userId, seo_job, userId, data.institution_name, data.domain_url, data.bypass_cache)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return JSONResponse(status_code=202, content={
+        'status': 'success',
+        'jobId': job.id,
+        'userId': userId,
+        'queueDepth': job_manager.depth
+    })
+
+@app.get("/jobs/{job_id}")
+def get_job_status(job_id: str):
+    """Return the status of a queued job.
+
+    Args:
+        job_id (str): The job's identifier.
+
+    Returns:
+        JSONResponse: The job's status and timestamps.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f'Job not found: {job_id}')
+
+    return JSONResponse(content=job.to_dict())
+
+@app.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    """Return the result of a finished job.
+
+    Args:
+        job_id (str): The job's identifier.
+
+    Returns:
+        JSONResponse: The job's result, or its status with 202 if it has not finished yet.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f'Job not found: {job_id}')
+
+    if not job.done:
+        return JSONResponse(status_code=202, content=job.to_dict())
+    if job.status == 'failed':
+        raise HTTPException(status_code=500, detail=job.error)
+
+    return JSONResponse(content=job.result)
+
 @app.post("/generate-blog/{user_id}")
 def generate_blog_endpoint(user_id: str, data: OutlineData):
     """Generate a blog post based on the provided outline.
@@ -367,6 +632,7 @@ def generate_blog_endpoint(user_id: str, data: OutlineData):
     Returns:
         JSONResponse: Status of the blog generation process.
     """
+    require_user_id(user_id)
     try:
         # Decode and sanitize outline
         outline = unquote(data.outline).strip()
@@ -376,8 +642,7 @@ def generate_blog_endpoint(user_id: str, data: OutlineData):
             raise HTTPException(status_code=400, detail="Empty outline")
 
         # Create user-specific directories if they don't exist
-        user_dir = Path('outputs') / str(user_id)
-        blogs_dir = user_dir / 'blogs'
+        blogs_dir = user_dir(user_id) / 'blogs'
         blogs_dir.mkdir(parents=True, exist_ok=True)
 
         print(f"Generating blog for user {user_id} with outline: {outline}")
@@ -386,16 +651,16 @@ def generate_blog_endpoint(user_id: str, data: OutlineData):
         result = generate_blog(outline, user_id)
 
         if result['status'] == 'success':
+            get_storage().sync_up(user_id, ('blogs',))
             markdown_content = ""
             blog_path = blogs_dir / 'blog_post.md'
             if blog_path.exists():
                 with open(blog_path, 'r', encoding='utf-8') as f:
                     markdown_content = f.read()
 
+            # The DOCX file is rendered on first download
             output_filename = 'blog_post.docx'
             if blog_path.exists():
-                convert_markdown_to_docx(blog_path, output_filename, user_id)
-
                 return JSONResponse(content={
                     'status': 'success',
                     'message': 'Blog post generated successfully',
@@ -410,6 +675,146 @@ def generate_blog_endpoint(user_id: str, data: OutlineData):
         print(f"Error in generate_blog_endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/generate-blog/{user_id}/stream")
+async def generate_blog_stream_endpoint(user_id: str, data: OutlineData, request: Request):
+    """Generate a blog post and stream it as server-sent events while it is written.
+
+    Sends a 'chunk' event for each piece of generated text, then a 'done' event
+    with the DOCX file name, or an 'error' event if generation failed. If the
+    client disconnects, generation stops instead of running to the end.
+
+    Args:
+        user_id (str): Unique identifier for the user.
+        data (OutlineData): Data containing the outline for the blog post.
+        request (Request): The incoming request, watched for a client disconnect.
+
+    Returns:
+        StreamingResponse: The text/event-stream response.
+    """
+    require_user_id(user_id)
+    # Decode and sanitize outline
+    outline = unquote(data.outline).strip()
+
+    if not outline:
+        raise HTTPException(status_code=400, detail="Empty outline")
+
+    blogs_dir = user_dir(user_id) / 'blogs'
+    blogs_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f"Streaming blog for user {user_id} with outline: {outline}")
+
+    events = queue.Queue()
+    cancelled = Event()
+
+    def write_blog():
+        try:
+            result = generate_blog(
+                outline,
+                user_id,
+                stream=True,
+                on_chunk=lambda text: events.put(('chunk', {'text': text})),
+                cancelled=cancelled
+            )
+
+            blog_path = blogs_dir / 'blog_post.md'
+            if result['status'] == 'cancelled':
+                print(f"Blog generation for user {user_id} cancelled")
+            elif result['status'] != 'success':
+                events.put(('error', {'message': result.get('message', 'Failed to generate blog post')}))
+            elif not blog_path.exists():
+                events.put(('error', {'message': 'Blog file not generated'}))
+            else:
+                get_storage().sync_up(user_id, ('blogs',))
+                events.put(('done', {'status': 'success', 'docxFile': 'blog_post.docx'}))
+        except Exception as e:
+            print(f"Error in generate_blog_stream_endpoint: {str(e)}")
+            events.put(('error', {'message': str(e)}))
+        finally:
+            events.put(None)
+
+    Thread(target=write_blog, daemon=True).start()
+
+    return queue_event_response(events, request, cancelled)
+
+@app.post("/generate-blog/{user_id}/batch")
+async def generate_blog_batch_endpoint(user_id: str, request: Request):
+    """Generate a blog post for every outline in the user's outlines file.
+
+    The outlines are generated concurrently, up to BLOG_BATCH_CONCURRENCY at a
+    time. Each blog is saved to its own markdown and DOCX file, and a server-sent
+    'outline' event reports each one as soon as it finishes, followed by a
+    final 'done' event. Outlines not yet written when the client disconnects are skipped.
+
+    Args:
+        user_id (str): Unique identifier for the user.
+        request (Request): The incoming request, watched for a client disconnect.
+
+    Returns:
+        StreamingResponse: The text/event-stream response.
+    """
+    require_user_id(user_id)
+    await run_in_threadpool(get_storage().sync_down, user_id, ('crew',))
+    outlines_path = user_dir(user_id) / 'crew' / '3_blog_post_outlines.md'
+    if not outlines_path.exists():
+        raise HTTPException(status_code=404, detail='Blog post outlines not found')
+
+    with open(outlines_path, 'r', encoding='utf-8') as f:
+        outlines = split_outlines(f.read())
+
+    if not outlines:
+        raise HTTPException(status_code=400, detail='No outlines found')
+
+    blogs_dir = user_dir(user_id) / 'blogs'
+    blogs_dir.mkdir(parents=True, exist_ok=True)
+    concurrency = int(os.getenv("BLOG_BATCH_CONCURRENCY", 3))
+
+    print(f"Generating {len(outlines)} blogs for user {user_id}")
+
+    events = queue.Queue()
+    cancelled = Event()
+
+    def write_blog(index, outline):
+        filename = f'blog_post_{index}.md'
+        result = generate_blog(outline, user_id, filename=filename, cancelled=cancelled)
+        if result['status'] != 'success':
+            return {'index': index, 'status': 'error', 'message': result.get('message', 'Failed to generate blog post')}
+
+        return {
+            'index': index,
+            'status': 'success',
+            'markdown': result['content'],
+            'docxFile': f'blog_post_{index}.docx'
+        }
+
+    def write_blogs():
+        succeeded = 0
+        try:
+            events.put(('started', {'total': len(outlines)}))
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+                futures = {
+                    executor.submit(write_blog, index, outline): index
+                    for index, outline in enumerate(outlines, start=1)
+                }
+                for future in as_completed(futures):
+                    try:
+                        outcome = future.result()
+                    except Exception as e:
+                        outcome = {'index': futures[future], 'status': 'error', 'message': str(e)}
+                    if outcome['status'] == 'success':
+                        succeeded += 1
+                    events.put(('outline', outcome))
+            get_storage().sync_up(user_id, ('blogs',))
+            events.put(('done', {'total': len(outlines), 'succeeded': succeeded}))
+        except Exception as e:
+            print(f"Error in generate_blog_batch_endpoint: {str(e)}")
+            events.put(('error', {'message': str(e)}))
+        finally:
+            events.put(None)
+
+    Thread(target=write_blogs, daemon=True).start()
+
+    return queue_event_response(events, request, cancelled)
+
 @app.delete("/cleanup/{user_id}")
 def cleanup_user_data(user_id: str):
     """Clean up all data associated with the specified user.
@@ -420,29 +825,106 @@ def cleanup_user_data(user_id: str):
     Returns:
         JSONResponse: Status of the cleanup operation.
     """
+    require_user_id(user_id)
     try:
         print(f"Cleaning up user data for {user_id}")
-        user_dir = Path('outputs') / str(user_id)
-        if user_dir.exists():
-            try:
-                shutil.rmtree(user_dir)
-                print(f"Successfully deleted directory: {user_dir}")
-            except PermissionError as pe:
-                print(f"Permission error while deleting: {pe}")
-                os.system(f'rm -rf "{user_dir}"')
-            except Exception as e:
-                print(f"Error while deleting directory: {e}")
-                raise
+        outputs_dir = user_dir(user_id)
+        # Wait for a running crew job of the user to finish writing rather than delete under it
+        with user_lock(user_id, timeout=float(os.getenv("CLEANUP_LOCK_TIMEOUT", 30))):
+            if outputs_dir.exists():
+                try:
+                    shutil.rmtree(outputs_dir)
+                    print(f"Successfully deleted directory: {outputs_dir}")
+                except PermissionError as pe:
+                    print(f"Permission error while deleting: {pe}")
+                    os.system(f'rm -rf "{outputs_dir}"')
+                except Exception as e:
+                    print(f"Error while deleting directory: {e}")
+                    raise
+            get_storage().delete_user(user_id)
 
         print(f"User data cleaned up successfully for {user_id}")
         return JSONResponse(content={
             'status': 'success',
             'message': 'User data cleaned up successfully'
         })
+    except TimeoutError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         print(f"Error in cleanup_user_data: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """Stream a job's progress as server-sent events.
+
+    Sends the status changes, task start and finish events, tool calls and agent
+    output of the crew as they happen, followed by the result or error. A client
+    reconnecting with a Last-Event-ID header resumes after that event.
+
+    Args:
+        job_id (str): The job's identifier.
+        request (Request): The incoming request.
+
+    Returns:
+        StreamingResponse: The text/event-stream response.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f'Job not found: {job_id}')
+
+    last_event_id = request.headers.get('last-event-id')
+    cursor = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+
+    async def event_stream():
+        nonlocal cursor
+        while True:
+            events, closed = await run_in_threadpool(job.wait_for_events, cursor)
+            for event in events:
+                yield format_sse(event)
+            cursor += len(events)
+
+            if closed and not events:
+                break
+            if not events:
+                # Keep idle connections open through proxies
+                yield ": keep-alive\n\n"
+            if await request.is_disconnected():
+                break
+
+    return StreamingResponse(
+        event_stream(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.get("/metrics/conversion")
+def get_conversion_metrics():
+    """Return the DOCX conversion queue depth and timing metrics.
+
+    Returns:
+        JSONResponse: The conversion service metrics.
+    """
+    return JSONResponse(content=conversion_service.metrics())
+
+@app.on_event("startup")
+def warm_up_clients():
+    """Create the shared Gemini clients and start the DOCX conversion workers in the background."""
+    Thread(target=warm_up_genai, daemon=True).start()
+    Thread(target=conversion_service.warm_up, daemon=True).start()
+
+@app.on_event("startup")
+def start_jobs():
+    """Start taking jobs from the queue shared by the API's worker processes."""
+    job_manager.start()
+
+@app.on_event("shutdown")
+def shutdown_jobs():
+    """Wait for running jobs to finish and stop the DOCX conversion and SEO warm-up workers."""
+    job_manager.shutdown()
+    conversion_service.shutdown()
+    seo_warmups.shutdown()
+
 @app.get("/")
 def index():
     """Index endpoint to check API status.
@@ -456,14 +938,23 @@ def index():
     })
 
 if __name__ == '__main__':
-    import uvicorn
+    import sys
     HOST = os.getenv("HOST", "0.0.0.0")
     PORT = int(os.getenv("PORT", 5000))
     DEBUG = os.getenv("FLASK_ENV") == "development"
+    # Worker processes share user outputs, locks and job state through STORAGE_ROOT
+    WORKERS = int(os.getenv("API_WORKERS", 1))
+    args = ['--app-dir', os.path.dirname(os.path.abspath(__file__)), '--host', HOST, '--port', str(PORT), '--log-level', 'info']
 
     if DEBUG:
         print(f'Starting development server on {HOST}:{PORT}')
-        uvicorn.run(app, host=HOST, port=PORT, log_level="info")
+    elif WORKERS > 1:
+        print(f'Starting production server on {HOST}:{PORT} with {WORKERS} workers')
+        # Each worker process imports the app itself
+        args += ['--workers', str(WORKERS)]
     else:
         print(f'Starting production server on {HOST}:{PORT}')
-        uvicorn.run(app, host=HOST, port=PORT, log_level="info")
+    # Serve from uvicorn's own entry point rather than with this module as __main__, which
+    # the DOCX conversion worker processes would otherwise re-import with all its dependencies
+    sys.stdout.flush()
+    os.execv(sys.executable, [sys.executable, '-m', 'uvicorn', 'app:app', *args])
@@ -0,0 +1,94 @@
+"""Benchmark the precomputed analysis tables against raw JSON for the data analyst.
+
+Builds sample rankings (competitors sharing part of their keywords with the
+user), then prints the tokens the analysis task reads and writes with the raw
+JSON files and with the precomputed tables, the time spent precomputing, and
+the LLM time saved at an assumed decoding speed.
+
+Tokens are counted with litellm's tokenizer for the analyst model, which
+approximates the provider's own count.
+
+Usage (from the backend directory):
+    python benchmarks/bench_analysis_tables.py [--competitors 5] [--keywords 10] [--tokens-per-second 50]
+"""
+from pathlib import Path
+import argparse
+import random
+import time
+import json
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import litellm
+import yaml
+from analysis_tables import build_analysis_tables
+
+TOPICS = ['school franchise', 'cbse school', 'preschool franchise', 'education business',
+          'school investment', 'franchise india', 'k12 school', 'start a school']
+
+
+def sample_rankings(domain, keywords, rng):
+    """Return fake rankings in the SpyFu tool's format."""
+    return {
+        'resultCount': keywords,
+        'results': [
+            {
+                'keyword': f'{rng.choice(TOPICS)} {rng.choice(["cost", "near me", "india", "profit", "apply"])}',
+                'searchVolume': rng.randrange(50, 20000),
+                'rankingDifficulty': rng.randrange(1, 90),
+                'totalMonthlyClicks': rng.randrange(10, 5000),
+                'exactCostPerClick': round(rng.uniform(0.1, 40), 2),
+                'paidCompetitors': rng.randrange(0, 30)
+            }
+            for _ in range(keywords)
+        ]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--competitors', type=int, default=5)
+    parser.add_argument('--keywords', type=int, default=10)
+    parser.add_argument('--tokens-per-second', type=float, default=50, help='Assumed LLM decoding speed')
+    parser.add_argument('--baseline-prompt', type=Path, help='tasks.yaml of the raw JSON version, for its prompt tokens')
+    parser.add_argument('--model', default='claude-3-5-sonnet-20241022', help='Model whose tokenizer is used')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    competitors = {
+        f'competitor{i}.example.in': sample_rankings(f'competitor{i}.example.in', args.keywords, rng)
+        for i in range(args.competitors)
+    }
+    user = sample_rankings('school.example.in', args.keywords, rng)
+
+    def tokens(text):
+        return litellm.token_counter(model=args.model, text=text)
+
+    start = time.perf_counter()
+    tables = build_analysis_tables(competitors, user)
+    precompute = time.perf_counter() - start
+
+    task = yaml.safe_load(open(Path(__file__).resolve().parent.parent / 'config' / 'tasks.yaml'))['analyze_keyword_rankings_data']
+    prompt = tokens(task['description'] + task['expected_output'])
+    baseline_prompt = prompt
+    if args.baseline_prompt:
+        baseline = yaml.safe_load(open(args.baseline_prompt))['analyze_keyword_rankings_data']
+        baseline_prompt = tokens(baseline['description'] + baseline['expected_output'])
+
+    # The raw files are what the FileReadTools returned; the tables are what the analyst used to retype
+    raw_input = tokens(json.dumps(competitors, indent=2)) + tokens(json.dumps(user, indent=2)) + baseline_prompt
+    table_input = tokens(tables['briefing']) + prompt
+    raw_output = tokens(tables['report'])
+
+    print(f"{'':>22} {'raw JSON':>10} {'tables':>10}")
+    print(f"{'input tokens':>22} {raw_input:>10} {table_input:>10}")
+    print(f"{'table output tokens':>22} {raw_output:>10} {0:>10}")
+    print(f"{'precompute (ms)':>22} {0:>10.1f} {precompute * 1000:>10.1f}")
+    saved = raw_output / args.tokens_per_second - precompute
+    print(f"\nLLM time saved at {args.tokens_per_second:g} tokens/s: {saved:.1f} s per analysis "
+          f"(narrative tokens are the same in both modes and not counted)")
+
+
+if __name__ == '__main__':
+    main()
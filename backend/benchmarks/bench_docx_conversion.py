@@ -0,0 +1,98 @@
+"""Compare markdown-to-DOCX conversion time and peak RSS of the native converter and Spire.Doc.
+
+Each conversion runs in a fresh subprocess so that the peak RSS includes
+importing the converter library.
+
+Usage (from the backend directory):
+    python benchmarks/bench_docx_conversion.py [markdown files...]
+
+Spire.Doc is not in requirements.txt, so by default its rows print
+'unavailable'. To compare against it, first run:
+    pip install spire.doc
+
+Without arguments, the crew and blog outputs under STORAGE_ROOT (outputs/ by
+default) are used.
+"""
+from pathlib import Path
+import subprocess
+import argparse
+import resource
+import tempfile
+import json
+import time
+import sys
+import os
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+STORAGE_ROOT = Path(os.getenv('STORAGE_ROOT', BACKEND_DIR / 'outputs'))
+
+
+def convert(converter, markdown_file, output_path):
+    """Convert one file with the named converter and print timing and peak RSS as JSON."""
+    start = time.perf_counter()
+    if converter == 'native':
+        sys.path.insert(0, str(BACKEND_DIR))
+        from docx_converter import convert_markdown_file
+        convert_markdown_file(markdown_file, output_path)
+    else:
+        from spire.doc import Document, FileFormat
+        doc = Document()
+        doc.LoadFromFile(str(markdown_file))
+        doc.SaveToFile(str(output_path), FileFormat.Docx2016)
+        doc.Dispose()
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss is reported in kilobytes on Linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({'seconds': elapsed, 'peak_rss_mb': peak_rss}))
+
+
+def measure(converter, markdown_file):
+    """Run one conversion in a subprocess.
+
+    Returns:
+        dict: The conversion time and peak RSS, or None if the converter is unavailable.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        result = subprocess.run(
+            [sys.executable, __file__, '--worker', converter, str(markdown_file), str(Path(tmp) / 'out.docx')],
+            capture_output=True,
+            text=True
+        )
+    if result.returncode != 0:
+        return None
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('files', nargs='*', type=Path)
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        convert(args.worker, args.files[0], args.files[1])
+        return
+
+    files = args.files or sorted(
+        list(STORAGE_ROOT.glob('*/crew/*.md')) +
+        list(STORAGE_ROOT.glob('*/blogs/blog_post*.md'))
+    )
+    if not files:
+        parser.error(f'No markdown files given and none found under {STORAGE_ROOT}')
+
+    print(f"{'file':<40} {'converter':>9} {'time (ms)':>10} {'peak RSS (MB)':>14}")
+    for markdown_file in files:
+        for converter in ('native', 'spire'):
+            outcome = measure(converter, markdown_file)
+            if outcome is None:
+                print(f"{markdown_file.name:<40} {converter:>9} {'unavailable':>10}")
+                continue
+            print(
+                f"{markdown_file.name:<40} {converter:>9} "
+                f"{outcome['seconds'] * 1000:>10.1f} {outcome['peak_rss_mb']:>14.1f}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Measure per-request Gemini client setup overhead against a local stub endpoint.
+
+Compares building a new genai.Client and Google Search Tool for every request
+(the previous behaviour of generate_blog) with the shared client pool.
+
+Usage (from the backend directory):
+    python benchmarks/bench_genai_client.py [--requests 50]
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from pathlib import Path
+import argparse
+import json
+import time
+import sys
+import os
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class GeminiStubHandler(BaseHTTPRequestHandler):
+    """Answers every generateContent call with a fixed one-part response."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        data = json.dumps({
+            'candidates': [{
+                'content': {'role': 'model', 'parts': [{'text': 'ok'}]},
+                'finishReason': 'STOP'
+            }]
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def time_requests(get_client, get_tool, count):
+    """Send requests through the given client factories.
+
+    Returns:
+        tuple: Mean setup time and mean total time per request, in milliseconds.
+    """
+    from google.genai.types import GenerateContentConfig
+
+    setup = total = 0.0
+    for _ in range(count):
+        start = time.perf_counter()
+        client = get_client()
+        tool = get_tool()
+        ready = time.perf_counter()
+        client.models.generate_content(
+            model='gemini-2.0-flash-exp',
+            contents='ping',
+            config=GenerateContentConfig(tools=[tool], response_modalities=["TEXT"])
+        )
+        end = time.perf_counter()
+        setup += ready - start
+        total += end - start
+    return setup / count * 1000, total / count * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), GeminiStubHandler)
+    server.daemon_threads = True
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ['GEMINI_BASE_URL'] = f'http://127.0.0.1:{server.server_address[1]}/'
+    os.environ.setdefault('GEMINI_API_KEY', 'bench')
+
+    from google.genai.types import Tool, GoogleSearch
+    import blog_writer
+
+    modes = {
+        'per request': (blog_writer._create_client, lambda: Tool(google_search=GoogleSearch())),
+        'shared pool': (blog_writer.get_genai_client, blog_writer.get_google_search_tool),
+    }
+    blog_writer.warm_up_genai()
+
+    print(f"{'mode':>12} {'setup (ms)':>11} {'request (ms)':>13}")
+    for name, (get_client, get_tool) in modes.items():
+        setup, total = time_requests(get_client, get_tool, args.requests)
+        print(f"{name:>12} {setup:>11.3f} {total:>13.3f}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark the shared keyword metrics store against per-user fetching.
+
+Simulates a growing number of franchise schools that share the same
+competitors and prints, per mode, the number of SpyFu requests, the bytes
+of shared storage (response cache and keyword store) and the bytes of the
+users' data directories after all users ran.
+
+Usage (from the backend directory):
+    python benchmarks/bench_keyword_store.py [--users 1 5 20] [--competitors 5]
+"""
+from pathlib import Path
+import argparse
+import tempfile
+import sys
+import os
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("SPYFU_API_ID", "bench")
+os.environ.setdefault("SPYFU_SECRET_KEY", "bench")
+
+from spyfu_stub import SpyfuStubServer, make_tls_contexts, stub_connection_pool
+from main import fetch_data_from_spyfu
+from tools import spyfu_tool
+
+MODES = {
+    'no sharing': {'SPYFU_CACHE_ENABLED': 'false', 'KEYWORD_STORE_ENABLED': 'false'},
+    'response cache': {'SPYFU_CACHE_ENABLED': 'true', 'KEYWORD_STORE_ENABLED': 'false'},
+    'keyword store': {'SPYFU_CACHE_ENABLED': 'true', 'KEYWORD_STORE_ENABLED': 'true'},
+}
+
+
+def directory_size(path):
+    """Return the total size in bytes of the files under a directory."""
+    return sum(f.stat().st_size for f in Path(path).rglob('*') if f.is_file())
+
+
+def run_users(server, users, mode, tmp):
+    """Fetch data for a number of users in one mode; return requests, shared and per-user bytes."""
+    os.environ.update(MODES[mode])
+    os.environ['SPYFU_CACHE_DIR'] = str(Path(tmp) / 'cache' / 'spyfu')
+    os.environ['KEYWORD_STORE_PATH'] = str(Path(tmp) / 'cache' / 'keyword_metrics.db')
+    spyfu_tool._response_cache = None
+    spyfu_tool._keyword_store = None
+    server.reset_counters()
+
+    for user in range(users):
+        output_dir = Path(tmp) / 'outputs' / f'user{user}'
+        (output_dir / 'data').mkdir(parents=True)
+        fetch_data_from_spyfu(f'school{user}.example.in', output_dir)
+
+    store = spyfu_tool.get_keyword_store()
+    if store is not None:
+        # Fold the write-ahead log into the database so only stored data is measured
+        store._connect().execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    return server.request_count, directory_size(Path(tmp) / 'cache'), directory_size(Path(tmp) / 'outputs')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--competitors', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server_context, client_context = make_tls_contexts(tmp)
+    server = SpyfuStubServer(latency=0, competitor_count=args.competitors, ssl_context=server_context).start()
+    spyfu_tool._connection_pool = stub_connection_pool(server, client_context)
+
+    results = []
+    for users in args.users:
+        for mode in MODES:
+            with tempfile.TemporaryDirectory() as tmp:
+                results.append((users, mode, *run_users(server, users, mode, tmp)))
+
+    print(f"\n{'users':>5} {'mode':>15} {'requests':>9} {'shared bytes':>13} {'user bytes':>11}")
+    for users, mode, requests, size, user_size in results:
+        print(f"{users:>5} {mode:>15} {requests:>9} {size:>13} {user_size:>11}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark the shared Serper search cache.
+
+Runs a set of franchise search queries, and variants of them differing in
+case, punctuation and spacing as different schools' agents would ask,
+through CachedSerperDevTool. The live
+search is replaced by a fixed delay, so the benchmark needs no API key.
+Prints live searches made and the time per search served from the
+in-process memo, the on-disk cache and the replay recordings.
+
+Usage (from the backend directory):
+    python benchmarks/bench_serper_cache.py [--latency 0.8] [--repeat 1000]
+"""
+from pathlib import Path
+import argparse
+import tempfile
+import time
+import sys
+import os
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from crewai_tools import SerperDevTool
+from tools import serper_tool
+from tools.serper_tool import CachedSerperDevTool
+
+QUERIES = [
+    ('school franchise india', 'School Franchise, India'),
+    ('best cbse school franchise', 'Best CBSE school franchise?'),
+    ('preschool franchise cost', 'Preschool  franchise cost'),
+    ('how to open a school in india', 'How to open a school in India?'),
+    ('school franchise competitors ads', 'school franchise: competitors ads'),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.8, help='Simulated live search time (s)')
+    parser.add_argument('--repeat', type=int, default=1000, help='Cached lookups timed per layer')
+    args = parser.parse_args()
+
+    live = []
+
+    def live_search(self, **kwargs):
+        time.sleep(args.latency)
+        live.append(kwargs['search_query'])
+        return f"\nSearch results: Title: {kwargs['search_query']}\n"
+
+    SerperDevTool._run = live_search
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['SERPER_CACHE_DIR'] = str(Path(tmp) / 'serper')
+        os.environ['SERPER_RECORDINGS_PATH'] = str(Path(tmp) / 'recordings.jsonl')
+        os.environ['SERPER_MODE'] = 'record'
+        tool = CachedSerperDevTool()
+
+        start = time.perf_counter()
+        for query, variant in QUERIES:
+            tool.run(search_query=query)
+            tool.run(search_query=variant)
+        first = time.perf_counter() - start
+        print(f"{len(QUERIES) * 2} searches ({len(QUERIES)} variants): {len(live)} live, {first:.2f}s")
+
+        def time_lookups():
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                for _, variant in QUERIES:
+                    tool._run(search_query=variant)
+            return (time.perf_counter() - start) / (args.repeat * len(QUERIES)) * 1e6
+
+        print(f"{'memo hit':>14}: {time_lookups():>8.1f} us per search")
+        serper_tool._memo.clear()
+        start = time.perf_counter()
+        for _, variant in QUERIES:
+            tool._run(search_query=variant)
+        print(f"{'disk cache hit':>14}: {(time.perf_counter() - start) / len(QUERIES) * 1e6:>8.1f} us per search")
+        os.environ['SERPER_MODE'] = 'replay'
+        print(f"{'replay':>14}: {time_lookups():>8.1f} us per search")
+        print(f"live searches in total: {len(live)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark fetch_data_from_spyfu against a local SpyFu stub.
+
+Prints wall-clock time of the sequential (one worker) and concurrent fetch
+modes for an increasing number of competitors.
+
+Usage (from the backend directory):
+    python benchmarks/bench_spyfu_fetch.py [--latency 0.05] [--workers 5]
+"""
+from pathlib import Path
+import argparse
+import tempfile
+import time
+import sys
+import os
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("SPYFU_API_ID", "bench")
+os.environ.setdefault("SPYFU_SECRET_KEY", "bench")
+os.environ.setdefault("SPYFU_CACHE_ENABLED", "false")
+os.environ.setdefault("KEYWORD_STORE_ENABLED", "false")
+
+from spyfu_stub import SpyfuStubServer, make_tls_contexts, stub_connection_pool
+from main import fetch_data_from_spyfu
+from tools import spyfu_tool
+
+
+def time_fetch(server, max_workers):
+    """Run one fetch against the stub and return the elapsed seconds."""
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp)
+        (output_dir / 'data').mkdir()
+        start = time.perf_counter()
+        fetch_data_from_spyfu('school.example.in', output_dir, max_workers=max_workers)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.05, help='Stub latency per request (s)')
+    parser.add_argument('--workers', type=int, default=5, help='Worker cap for the concurrent mode')
+    parser.add_argument('--competitors', type=int, nargs='+', default=[1, 2, 5, 10, 20])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server_context, client_context = make_tls_contexts(tmp)
+    server = SpyfuStubServer(latency=args.latency, ssl_context=server_context).start()
+    spyfu_tool._connection_pool = stub_connection_pool(server, client_context)
+
+    print(f"{'competitors':>11} {'sequential (s)':>15} {'concurrent (s)':>15} {'speedup':>8}")
+    for count in args.competitors:
+        server.competitor_count = count
+        sequential = time_fetch(server, max_workers=1)
+        concurrent = time_fetch(server, max_workers=args.workers)
+        print(f"{count:>11} {sequential:>15.3f} {concurrent:>15.3f} {sequential / concurrent:>7.1f}x")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Count TLS handshakes per analysis run against a local SpyFu stub.
+
+Compares a pool that never reuses connections (the previous behaviour of one
+HTTPSConnection per request) with the shared keep-alive pool.
+
+Usage (from the backend directory):
+    python benchmarks/bench_spyfu_handshakes.py [--competitors 5] [--runs 3]
+"""
+from pathlib import Path
+import argparse
+import tempfile
+import time
+import sys
+import os
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("SPYFU_API_ID", "bench")
+os.environ.setdefault("SPYFU_SECRET_KEY", "bench")
+os.environ.setdefault("SPYFU_CACHE_ENABLED", "false")
+os.environ.setdefault("KEYWORD_STORE_ENABLED", "false")
+
+from spyfu_stub import SpyfuStubServer, make_tls_contexts, stub_connection_pool
+from main import fetch_data_from_spyfu
+from tools import spyfu_tool
+
+
+def run_analysis_fetches(server, pool, runs):
+    """Run the SpyFu fetch stage several times and collect request counters.
+
+    Returns:
+        tuple: Requests, handshakes and elapsed seconds per run.
+    """
+    spyfu_tool._connection_pool = pool
+    server.reset_counters()
+    start = time.perf_counter()
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            output_dir = Path(tmp)
+            (output_dir / 'data').mkdir()
+            fetch_data_from_spyfu('school.example.in', output_dir)
+    elapsed = time.perf_counter() - start
+    pool.close()
+    return server.request_count / runs, server.connection_count / runs, elapsed / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.02, help='Stub latency per request (s)')
+    parser.add_argument('--competitors', type=int, default=5)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server_context, client_context = make_tls_contexts(tmp)
+    server = SpyfuStubServer(
+        latency=args.latency,
+        competitor_count=args.competitors,
+        ssl_context=server_context
+    ).start()
+
+    modes = {
+        'no reuse': stub_connection_pool(server, client_context, idle_timeout=0),
+        'keep-alive pool': stub_connection_pool(server, client_context),
+    }
+
+    print(f"{'mode':>16} {'requests/run':>13} {'handshakes/run':>15} {'time/run (s)':>13}")
+    for name, pool in modes.items():
+        requests, handshakes, elapsed = run_analysis_fetches(server, pool, args.runs)
+        print(f"{name:>16} {requests:>13.1f} {handshakes:>15.1f} {elapsed:>13.3f}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark the API's cold start.
+
+Imports the FastAPI app in fresh interpreters and prints the import time,
+the peak memory of the process and the modules that took longest to import.
+
+Usage (from the backend directory):
+    python benchmarks/bench_startup.py [--runs 5] [--top 10]
+"""
+from pathlib import Path
+import subprocess
+import argparse
+import resource
+import time
+import sys
+import os
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def import_app(importtime: bool = False):
+    """Import the app in a new interpreter and return its wall time, peak memory and stderr."""
+    env = dict(os.environ, ALLOWED_ORIGINS=os.getenv('ALLOWED_ORIGINS', 'http://localhost:3000'))
+    command = [sys.executable, '-W', 'ignore'] + (['-X', 'importtime'] if importtime else []) + ['-c', 'import app']
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    seconds = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    # ru_maxrss of the children is the peak of the largest child so far, in KB on Linux
+    return seconds, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, result.stderr
+
+
+def top_imports(importtime_output: str, top: int):
+    """Return the top-level packages that took longest to import, from -X importtime output."""
+    packages = {}
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Only modules imported directly by app or a top-level package, not their submodules
+        if len(name) - len(name.lstrip()) <= 3:
+            package = name.strip().split('.')[0]
+            packages[package] = packages.get(package, 0) + int(cumulative)
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='Number of cold imports to time')
+    parser.add_argument('--top', type=int, default=10, help='Number of slowest imports to list')
+    args = parser.parse_args()
+
+    timings = [import_app()[0] for _ in range(args.runs)]
+    _, peak_mb, importtime_output = import_app(importtime=True)
+    print(f"import app: {min(timings):.2f}s best, {sum(timings) / len(timings):.2f}s mean of {args.runs}")
+    print(f"peak memory: {peak_mb:.0f} MB")
+    print("slowest imports:")
+    for package, microseconds in top_imports(importtime_output, args.top):
+        print(f"  {package:<24} {microseconds / 1e6:>6.2f}s")
+
+
+if __name__ == '__main__':
+    main()
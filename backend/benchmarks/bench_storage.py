@@ -0,0 +1,140 @@
+"""Benchmark the S3 storage backend against the local S3 stand-in.
+
+Uploads and downloads a large file through S3Client, streamed and, for
+comparison, buffered in memory, and prints the time and the peak memory
+allocated by each. Then downloads a DOCX file through the API with the S3
+backend, on a node that has none of the user's files: the API fetches the
+markdown from the bucket, renders the DOCX, uploads it and redirects to a
+presigned URL, which is then followed.
+
+Usage (from the backend directory):
+    python benchmarks/bench_storage.py [--size 64]
+"""
+from pathlib import Path
+from threading import Thread
+import urllib.request
+import tracemalloc
+import argparse
+import tempfile
+import shutil
+import time
+import sys
+import os
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from s3_standin import start_standin
+from tools.s3_client import S3Client
+
+ANALYSIS_MARKDOWN = "# Keyword analysis\n\n" + "\n".join(
+    f"## Competitor {index}\n\n- Ranks for {index * 7} keywords\n- **Top keyword:** school franchise {index}\n"
+    for index in range(1, 40)
+)
+
+
+def measure(fn):
+    """Run a function and return its result, seconds taken and peak traced memory in MB."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def bench_transfers(client: S3Client, tmp: Path, size_mb: int):
+    """Time streamed and buffered uploads and downloads of one large file."""
+    source = tmp / 'large.bin'
+    with open(source, 'wb') as f:
+        for _ in range(size_mb):
+            f.write(os.urandom(1024 * 1024))
+    length = source.stat().st_size
+
+    def streamed_upload():
+        with open(source, 'rb') as f:
+            return client.put_object('bench/large.bin', f, length)
+
+    def buffered_upload():
+        with open(source, 'rb') as f:
+            body = f.read()
+        return client.put_object('bench/large.bin', body, length)
+
+    def streamed_download():
+        return client.download_file('bench/large.bin', tmp / 'downloaded.bin')
+
+    def buffered_download():
+        with client.get_object('bench/large.bin') as res:
+            return res.read()
+
+    print(f"{size_mb} MB object         {'time':>8} {'MB/s':>8} {'peak memory':>12}")
+    for name, fn in (
+        ('streamed upload', streamed_upload),
+        ('buffered upload', buffered_upload),
+        ('streamed download', streamed_download),
+        ('buffered download', buffered_download),
+    ):
+        _, seconds, peak = measure(fn)
+        print(f"{name:<22} {seconds:>7.2f}s {size_mb / seconds:>8.0f} {peak:>9.1f} MB")
+    assert (tmp / 'downloaded.bin').read_bytes() == source.read_bytes()
+
+
+def bench_download_redirect(tmp: Path, port: int):
+    """Download a DOCX file through the API on a node without the user's files."""
+    os.environ.update({
+        'STORAGE_BACKEND': 's3',
+        'STORAGE_ROOT': str(tmp / 'node'),
+        'S3_ENDPOINT_URL': f'http://127.0.0.1:{port}',
+        'S3_BUCKET': 'outputs',
+        'S3_ACCESS_KEY_ID': 'standin',
+        'S3_SECRET_ACCESS_KEY': 'standin-secret',
+        'ALLOWED_ORIGINS': 'http://localhost:3000',
+    })
+    from fastapi.testclient import TestClient
+    from storage import get_storage, user_dir
+    import app as api
+
+    user_id = 'bench-user'
+    crew_dir = user_dir(user_id) / 'crew'
+    crew_dir.mkdir(parents=True)
+    (crew_dir / '1_analysis.md').write_text(ANALYSIS_MARKDOWN, encoding='utf-8')
+    get_storage().sync_up(user_id)
+
+    with TestClient(api.app) as client:
+        print(f"\nDOCX download on a node without the user's files{'':>4} {'API':>7} {'file':>7}")
+        for label in ('first download (renders)', 'repeat download', 'another fresh node'):
+            # A fresh node has none of the user's files
+            if label != 'repeat download':
+                shutil.rmtree(user_dir(user_id))
+            start = time.perf_counter()
+            response = client.get(f'/download/{user_id}/analysis.docx', follow_redirects=False)
+            api_seconds = time.perf_counter() - start
+            assert response.status_code == 307, response.text
+            start = time.perf_counter()
+            docx = urllib.request.urlopen(response.headers['location']).read()
+            file_seconds = time.perf_counter() - start
+            assert docx[:2] == b'PK'
+            print(f"{label:<52} {api_seconds * 1000:>5.0f}ms {file_seconds * 1000:>5.0f}ms")
+        print(f"redirect: {response.headers['location'][:90]}...")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=64, help='Size of the large object (MB)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        server = start_standin(tmp / 'bucket')
+        Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_port
+
+        client = S3Client(f'http://127.0.0.1:{port}', 'outputs', 'standin', 'standin-secret')
+        bench_transfers(client, tmp, args.size)
+        bench_download_redirect(tmp, port)
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
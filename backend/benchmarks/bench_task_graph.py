@@ -0,0 +1,77 @@
+"""Benchmark the analysis pipeline with its steps run one at a time and concurrently.
+
+Runs the analysis pipeline against a local SpyFu stub with the crew kickoff
+replaced by a fixed delay standing in for the LLM calls, and prints the wall
+time, the sum of the step times and the critical path of both modes.
+
+Usage (from the backend directory):
+    python benchmarks/bench_task_graph.py [--latency 0.05] [--competitors 5] [--crew-seconds 2]
+"""
+from pathlib import Path
+import argparse
+import tempfile
+import time
+import sys
+import os
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("SPYFU_API_ID", "bench")
+os.environ.setdefault("SPYFU_SECRET_KEY", "bench")
+os.environ.setdefault("SPYFU_CACHE_ENABLED", "false")
+os.environ.setdefault("KEYWORD_STORE_ENABLED", "false")
+
+from spyfu_stub import SpyfuStubServer, make_tls_contexts, stub_connection_pool
+from main import analysis_pipeline
+from tools import spyfu_tool
+
+
+def run_pipeline(parallel, crew_seconds, tmp):
+    """Run the pipeline once and return its timing summary."""
+    os.environ['PIPELINE_PARALLEL'] = 'true' if parallel else 'false'
+    output_dir = Path(tmp) / ('parallel' if parallel else 'sequential')
+    (output_dir / 'data').mkdir(parents=True)
+    (output_dir / 'crew').mkdir()
+
+    def crew():
+        time.sleep(crew_seconds)
+        (output_dir / 'crew' / '1_analysis_narrative.md').write_text('## 3. Comparative Analysis\n', encoding='utf-8')
+
+    graph = analysis_pipeline(output_dir.name, 'Bench School', 'school.example.in', output_dir)
+    graph.add('crew', crew, depends_on=['spyfu_fetch', 'crew_setup'])
+    graph.run()
+    return graph.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.05, help='Stub latency per request (s)')
+    parser.add_argument('--competitors', type=int, default=5)
+    parser.add_argument('--crew-seconds', type=float, default=2, help='Simulated crew kickoff time (s)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server_context, client_context = make_tls_contexts(tmp)
+    server = SpyfuStubServer(latency=args.latency, competitor_count=args.competitors, ssl_context=server_context).start()
+    spyfu_tool._connection_pool = stub_connection_pool(server, client_context)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # Warm up imports and connections so both modes start from the same state
+        run_pipeline(False, 0, Path(tmp) / 'warmup')
+        for parallel in (False, True):
+            results['parallel' if parallel else 'sequential'] = run_pipeline(parallel, args.crew_seconds, tmp)
+
+    print(f"\n{'mode':>10} {'wall (s)':>9} {'steps (s)':>10} {'critical path (s)':>18}  path")
+    for mode, summary in results.items():
+        print(f"{mode:>10} {summary['wall']:>9.3f} {summary['sequential']:>10.3f} "
+              f"{summary['critical_path_seconds']:>18.3f}  {' -> '.join(summary['critical_path'])}")
+    for mode, summary in results.items():
+        print(f"\n{mode}:")
+        for name, step in summary['steps'].items():
+            print(f"  {name:>12} start {step['start']:.3f}s, {step['duration']:.3f}s")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
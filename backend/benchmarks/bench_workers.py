@@ -0,0 +1,182 @@
+"""Load test the API with several worker processes.
+
+Starts the API under uvicorn with 1, 2 and 4 worker processes, sharing a
+temporary STORAGE_ROOT, and submits SEO jobs for a handful of users from
+concurrent clients. Each client follows its job's server-sent events until
+the result arrives, so a job is often run by one worker and reported by
+another. The SEO crew is replaced by a stub that waits as long as an LLM
+call, burns some CPU and writes the crew outputs; it fails the job if two
+runs for the same user ever overlap.
+
+Prints the throughput and latency for each worker count.
+
+Usage (from the backend directory):
+    python benchmarks/bench_workers.py [--workers 1 2 4] [--jobs 32] [--users 8]
+"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import urllib.request
+import urllib.error
+import subprocess
+import statistics
+import argparse
+import tempfile
+import socket
+import json
+import time
+import sys
+import os
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def stub_app():
+    """Return the API with its SEO crew replaced by a stub; used as the uvicorn app factory."""
+    sys.path.insert(0, str(BACKEND_DIR))
+    import app as api
+    from storage import user_dir
+
+    latency = float(os.getenv("BENCH_CREW_LATENCY", 0.5))
+    cpu = float(os.getenv("BENCH_CREW_CPU", 0.05))
+
+    def run_seo_crew(userId, school_name, domain_url, on_event=None, bypass_cache=False):
+        crew_dir = user_dir(userId) / 'crew'
+        crew_dir.mkdir(parents=True, exist_ok=True)
+        # Fails if another run for the user is writing its outputs
+        marker = os.open(crew_dir / '.running', os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        try:
+            for name in ('generate_ad_copies', 'generate_blog_post_outlines'):
+                if on_event:
+                    on_event('task_started', {'task': name})
+                time.sleep(latency / 2)
+                deadline = time.process_time() + cpu / 2
+                while time.process_time() < deadline:
+                    pass
+                if on_event:
+                    on_event('task_completed', {'task': name})
+            (crew_dir / '2_ad_copies.md').write_text(f'# Ad copies for {school_name}\n', encoding='utf-8')
+            (crew_dir / '3_blog_post_outlines.md').write_text(f'# Outline for {school_name}\n', encoding='utf-8')
+        finally:
+            os.close(marker)
+            os.unlink(crew_dir / '.running')
+
+    api.run_seo_crew = run_seo_crew
+    return api.app
+
+
+def free_port() -> int:
+    """Return a TCP port nobody is listening on."""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers: int, port: int, storage_root: str, args):
+    """Start the stubbed API with a number of worker processes and wait until it answers."""
+    env = dict(
+        os.environ,
+        ALLOWED_ORIGINS='http://localhost:3000',
+        API_WORKERS=str(workers),
+        STORAGE_ROOT=storage_root,
+        JOB_MAX_WORKERS=str(args.job_workers),
+        SEO_SPECULATIVE='false',
+        BENCH_CREW_LATENCY=str(args.latency),
+        BENCH_CREW_CPU=str(args.cpu),
+    )
+    server = subprocess.Popen(
+        [sys.executable, '-W', 'ignore', '-m', 'uvicorn', 'bench_workers:stub_app', '--factory',
+         '--app-dir', str(Path(__file__).resolve().parent), '--port', str(port),
+         '--workers', str(workers), '--log-level', 'warning'],
+        cwd=BACKEND_DIR, env=env
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=1).read()
+            # Give the remaining workers time to start accepting too
+            time.sleep(1.0 * workers)
+            return server
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError('The API did not start')
+
+
+def run_job(base_url: str, user_id: str):
+    """Submit an SEO job and follow its events until the result arrives.
+
+    Returns:
+        tuple: Seconds from submission to result, and the error message or None.
+    """
+    body = json.dumps({'institution_name': f'School {user_id}', 'domain_url': 'https://example.com'}).encode('utf-8')
+    start = time.perf_counter()
+    while True:
+        request = urllib.request.Request(
+            f'{base_url}/jobs/seo/{user_id}', data=body, headers={'Content-Type': 'application/json'}
+        )
+        try:
+            job_id = json.loads(urllib.request.urlopen(request).read())['jobId']
+            break
+        except urllib.error.HTTPError as e:
+            # The worker's queue is full; try again shortly
+            if e.code != 503:
+                raise
+            time.sleep(0.1)
+
+    event = None
+    with urllib.request.urlopen(f'{base_url}/jobs/{job_id}/events', timeout=120) as stream:
+        for line in stream:
+            line = line.decode('utf-8').strip()
+            if line.startswith('event: '):
+                event = line[len('event: '):]
+            elif line.startswith('data: ') and event in ('result', 'error'):
+                data = json.loads(line[len('data: '):])
+                if event == 'error':
+                    return time.perf_counter() - start, data['message']
+                if 'outlines' not in data.get('markdown', {}):
+                    return time.perf_counter() - start, 'Result without the crew outputs'
+                return time.perf_counter() - start, None
+    return time.perf_counter() - start, 'Event stream ended without a result'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='Worker process counts to test')
+    parser.add_argument('--jobs', type=int, default=32, help='Number of jobs per run')
+    parser.add_argument('--users', type=int, default=8, help='Number of users the jobs are spread over')
+    parser.add_argument('--clients', type=int, default=16, help='Number of concurrent clients')
+    parser.add_argument('--job-workers', type=int, default=2, help='JOB_MAX_WORKERS of each worker process')
+    parser.add_argument('--latency', type=float, default=0.5, help='Simulated LLM time per crew run (s)')
+    parser.add_argument('--cpu', type=float, default=0.05, help='Simulated CPU time per crew run (s)')
+    args = parser.parse_args()
+
+    print(f"{args.jobs} SEO jobs for {args.users} users from {args.clients} clients, "
+          f"{args.job_workers} job threads per worker, crew {args.latency}s wait + {args.cpu}s CPU")
+    print(f"{'workers':>8} {'jobs/s':>8} {'p50':>7} {'p95':>7} {'failed':>7}")
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as storage_root:
+            port = free_port()
+            server = start_server(workers, port, storage_root, args)
+            try:
+                users = [f'user{index}' for index in range(args.users)]
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=args.clients) as executor:
+                    outcomes = list(executor.map(
+                        lambda index: run_job(f'http://127.0.0.1:{port}', users[index % len(users)]),
+                        range(args.jobs)
+                    ))
+                elapsed = time.perf_counter() - start
+            finally:
+                server.terminate()
+                server.wait()
+
+        latencies = sorted(seconds for seconds, _ in outcomes)
+        errors = [error for _, error in outcomes if error]
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"{workers:>8} {args.jobs / elapsed:>8.2f} {statistics.median(latencies):>6.2f}s {p95:>6.2f}s {len(errors):>7}")
+        for error in sorted(set(errors)):
+            print(f"{'':>8} error: {error}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+"""A local stand-in for an S3-compatible object store, like a minimal MinIO.
+
+Serves path-style PutObject, GetObject, HeadObject, DeleteObject and
+ListObjectsV2 requests from a directory, checks their Signature Version 4
+signatures, including presigned URLs, and streams object bodies in blocks.
+It is meant for trying the S3 storage backend without a real bucket:
+
+    python benchmarks/s3_standin.py --dir /tmp/s3 --port 9000
+    STORAGE_BACKEND=s3 S3_ENDPOINT_URL=http://localhost:9000 S3_BUCKET=outputs \\
+        S3_ACCESS_KEY_ID=standin S3_SECRET_ACCESS_KEY=standin-secret python app.py
+
+Usage (from the backend directory):
+    python benchmarks/s3_standin.py [--dir DIR] [--port 9000] [--access-key standin] [--secret-key standin-secret]
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl, unquote
+from xml.sax.saxutils import escape
+from pathlib import Path
+import argparse
+import datetime
+import tempfile
+import hashlib
+import hmac
+import json
+import sys
+import os
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.s3_client import canonical_query, signature, UNSIGNED_PAYLOAD
+
+CHUNK_SIZE = 64 * 1024
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Handles the S3 requests of the storage backend."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        """Stay quiet; the stand-in is used by benchmarks."""
+
+    def _send(self, status: int, body: bytes = b'', headers: dict = None):
+        """Send a complete response."""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _error(self, status: int, code: str):
+        """Send an S3 error response and close the connection, since a request body may be left unread."""
+        self.close_connection = True
+        self._send(status, f'<Error><Code>{code}</Code></Error>'.encode('utf-8'), {
+            'Content-Type': 'application/xml',
+            'Connection': 'close'
+        })
+
+    def _parse(self):
+        """Return the bucket, key and query parameters of the request."""
+        url = urlsplit(self.path)
+        bucket, _, key = url.path.lstrip('/').partition('/')
+        return unquote(bucket), unquote(key), dict(parse_qsl(url.query, keep_blank_values=True))
+
+    def _authorized(self, query: dict) -> bool:
+        """Check the request's Signature Version 4 signature, from its headers or a presigned URL."""
+        server = self.server
+        path = urlsplit(self.path).path
+        if 'X-Amz-Signature' in query:
+            params = {name: value for name, value in query.items() if name != 'X-Amz-Signature'}
+            amz_date = params['X-Amz-Date']
+            signed_at = datetime.datetime.strptime(amz_date, '%Y%m%dT%H%M%SZ').replace(tzinfo=datetime.timezone.utc)
+            if datetime.datetime.now(datetime.timezone.utc) > signed_at + datetime.timedelta(seconds=int(params['X-Amz-Expires'])):
+                return False
+            credential = params['X-Amz-Credential']
+            names = params['X-Amz-SignedHeaders'].split(';')
+            payload_hash = UNSIGNED_PAYLOAD
+            expected = query['X-Amz-Signature']
+        else:
+            authorization = self.headers.get('Authorization', '')
+            if not authorization.startswith('AWS4-HMAC-SHA256 '):
+                return False
+            fields = dict(part.strip().split('=', 1) for part in authorization[len('AWS4-HMAC-SHA256 '):].split(','))
+            params = query
+            credential = fields['Credential']
+            amz_date = self.headers['x-amz-date']
+            names = fields['SignedHeaders'].split(';')
+            payload_hash = self.headers['x-amz-content-sha256']
+            expected = fields['Signature']
+
+        access_key, _, region = credential.split('/')[:3]
+        if access_key != server.access_key:
+            return False
+        canonical_request = '\n'.join([
+            self.command,
+            path,
+            canonical_query(params),
+            ''.join(f"{name}:{self.headers.get(name, '').strip()}\n" for name in names),
+            ';'.join(names),
+            payload_hash
+        ])
+        return hmac.compare_digest(signature(server.secret_key, region, amz_date, canonical_request), expected)
+
+    def _object_path(self, bucket: str, key: str) -> Path:
+        """Return the file holding an object."""
+        return self.server.root / bucket / key
+
+    def _meta_path(self, bucket: str, key: str) -> Path:
+        """Return the file holding an object's ETag and metadata."""
+        return self.server.root / '.meta' / bucket / f'{key}.json'
+
+    def _handle(self):
+        """Dispatch the request after checking its signature."""
+        bucket, key, query = self._parse()
+        if not self._authorized(query):
+            return self._error(403, 'SignatureDoesNotMatch')
+        if '..' in key.split('/'):
+            return self._error(400, 'InvalidKey')
+        if not key:
+            if self.command == 'GET' and query.get('list-type') == '2':
+                return self._list(bucket, query)
+            return self._error(400, 'InvalidRequest')
+        if self.command == 'PUT':
+            return self._put(bucket, key)
+        if self.command in ('GET', 'HEAD'):
+            return self._get(bucket, key, query)
+        if self.command == 'DELETE':
+            for path in (self._object_path(bucket, key), self._meta_path(bucket, key)):
+                if path.exists():
+                    path.unlink()
+            return self._send(204)
+        return self._error(405, 'MethodNotAllowed')
+
+    do_GET = do_HEAD = do_PUT = do_DELETE = _handle
+
+    def _put(self, bucket: str, key: str):
+        """Store an object, reading its body in blocks."""
+        remaining = int(self.headers['Content-Length'])
+        path = self._object_path(bucket, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.md5()
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.', suffix='.part')
+        with os.fdopen(fd, 'wb') as f:
+            while remaining:
+                block = self.rfile.read(min(CHUNK_SIZE, remaining))
+                if not block:
+                    break
+                digest.update(block)
+                f.write(block)
+                remaining -= len(block)
+        os.replace(tmp_path, path)
+
+        meta = {
+            'etag': digest.hexdigest(),
+            'content_type': self.headers.get('Content-Type', 'application/octet-stream'),
+            'metadata': {name: value for name, value in self.headers.items() if name.lower().startswith('x-amz-meta-')}
+        }
+        meta_path = self._meta_path(bucket, key)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        meta_path.write_text(json.dumps(meta), encoding='utf-8')
+        self._send(200, headers={'ETag': f'"{meta["etag"]}"'})
+
+    def _get(self, bucket: str, key: str, query: dict):
+        """Send an object's headers and, for GET, its body in blocks."""
+        path = self._object_path(bucket, key)
+        meta_path = self._meta_path(bucket, key)
+        if not path.is_file() or not meta_path.exists():
+            return self._error(404, 'NoSuchKey')
+        meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        self.send_response(200)
+        self.send_header('Content-Length', str(path.stat().st_size))
+        self.send_header('Content-Type', meta['content_type'])
+        self.send_header('ETag', f'"{meta["etag"]}"')
+        for name, value in meta['metadata'].items():
+            self.send_header(name, value)
+        if 'response-content-disposition' in query:
+            self.send_header('Content-Disposition', query['response-content-disposition'])
+        self.end_headers()
+        if self.command == 'GET':
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    self.wfile.write(block)
+
+    def _list(self, bucket: str, query: dict):
+        """List the objects under a prefix, a page of keys at a time."""
+        bucket_dir = self.server.root / bucket
+        prefix = query.get('prefix', '')
+        keys = sorted(
+            path.relative_to(bucket_dir).as_posix() for path in bucket_dir.rglob('*')
+            if path.is_file() and not path.name.startswith('.')
+        ) if bucket_dir.exists() else []
+        keys = [key for key in keys if key.startswith(prefix) and key > query.get('continuation-token', '')]
+        page = keys[:int(query.get('max-keys', 1000))]
+        contents = ''.join(
+            f'<Contents><Key>{escape(key)}</Key><ETag>"{json.loads(self._meta_path(bucket, key).read_text())["etag"]}"</ETag>'
+            f'<Size>{self._object_path(bucket, key).stat().st_size}</Size></Contents>'
+            for key in page
+        )
+        truncated = len(page) < len(keys)
+        body = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+            f'<Name>{escape(bucket)}</Name><Prefix>{escape(prefix)}</Prefix><KeyCount>{len(page)}</KeyCount>'
+            f'<IsTruncated>{str(truncated).lower()}</IsTruncated>{contents}'
+            + (f'<NextContinuationToken>{escape(page[-1])}</NextContinuationToken>' if truncated else '')
+            + '</ListBucketResult>'
+        )
+        self._send(200, body.encode('utf-8'), {'Content-Type': 'application/xml'})
+
+
+def start_standin(root, port: int = 0, access_key: str = 'standin', secret_key: str = 'standin-secret'):
+    """Create the stand-in server; call serve_forever() on it, e.g. in a thread.
+
+    Args:
+        root (str | Path): Directory the objects are stored in.
+        port (int): Port to listen on; 0 picks a free one.
+        access_key (str): The access key ID clients must use.
+        secret_key (str): The secret access key clients must sign with.
+
+    Returns:
+        ThreadingHTTPServer: The server, listening on 127.0.0.1.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), StandInHandler)
+    server.daemon_threads = True
+    server.root = Path(root)
+    server.access_key = access_key
+    server.secret_key = secret_key
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dir', default=None, help='Directory to store objects in (a temporary one by default)')
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('--access-key', default='standin')
+    parser.add_argument('--secret-key', default='standin-secret')
+    args = parser.parse_args()
+
+    root = args.dir or tempfile.mkdtemp(prefix='s3-standin-')
+    server = start_standin(root, args.port, args.access_key, args.secret_key)
+    print(f"S3 stand-in serving {root} on http://127.0.0.1:{server.server_port}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""Local stand-in for the SpyFu API used by the benchmarks.
+
+Serves canned responses for the two endpoints SpyfuTool calls over TLS, with
+a fixed artificial latency per request so that round-trip and handshake costs
+can be compared.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from threading import Thread, Lock
+from pathlib import Path
+import subprocess
+import json
+import time
+import ssl
+
+
+class SpyfuStubHandler(BaseHTTPRequestHandler):
+    """Request handler returning fake competitor and keyword data."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+
+        time.sleep(server.latency)
+
+        parsed = urlparse(self.path)
+        params = parse_qs(parsed.query)
+
+        if parsed.path.endswith('/getTopCompetitors'):
+            body = {
+                'resultCount': server.competitor_count,
+                'results': [
+                    {'domain': f'competitor{i}.example.in', 'commonTerms': 10 - i}
+                    for i in range(server.competitor_count)
+                ]
+            }
+        elif parsed.path.endswith('/getMostSuccessful'):
+            domain = params.get('query', [''])[0]
+            body = {
+                'resultCount': 10,
+                'results': [
+                    {
+                        'keyword': f'{domain} keyword {i}',
+                        'searchVolume': 1000 - i * 10,
+                        'rankingDifficulty': 20 + i,
+                        'totalMonthlyClicks': 500 - i * 5,
+                        'exactCostPerClick': round(0.5 + i * 0.1, 2),
+                        'paidCompetitors': i,
+                    }
+                    for i in range(10)
+                ]
+            }
+        else:
+            self.send_error(404)
+            return
+
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SpyfuStubServer(ThreadingHTTPServer):
+    """Threaded stub server that counts requests and accepted connections.
+
+    When an SSL context is given every accepted connection is a TLS handshake,
+    so connection_count doubles as the handshake count.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latency=0.05, competitor_count=5, ssl_context=None):
+        super().__init__(('127.0.0.1', 0), SpyfuStubHandler)
+        if ssl_context is not None:
+            self.socket = ssl_context.wrap_socket(self.socket, server_side=True)
+        self.latency = latency
+        self.competitor_count = competitor_count
+        self.lock = Lock()
+        self.request_count = 0
+        self.connection_count = 0
+
+    def get_request(self):
+        request = super().get_request()
+        with self.lock:
+            self.connection_count += 1
+        return request
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def reset_counters(self):
+        with self.lock:
+            self.request_count = 0
+            self.connection_count = 0
+
+    def start(self):
+        Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def make_tls_contexts(directory):
+    """Create a throwaway self-signed certificate and matching SSL contexts.
+
+    Args:
+        directory (str): Directory to write the certificate and key to.
+
+    Returns:
+        tuple: The server-side and client-side SSL contexts.
+    """
+    cert_file = Path(directory) / 'stub.crt'
+    key_file = Path(directory) / 'stub.key'
+    subprocess.run(
+        [
+            'openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes',
+            '-subj', '/CN=127.0.0.1', '-days', '1',
+            '-keyout', str(key_file), '-out', str(cert_file)
+        ],
+        check=True,
+        capture_output=True
+    )
+
+    server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    server_context.load_cert_chain(cert_file, key_file)
+
+    client_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    client_context.load_verify_locations(cert_file)
+    client_context.check_hostname = False
+    return server_context, client_context
+
+
+def stub_connection_pool(server, client_context, **kwargs):
+    """Create a SpyFu connection pool pointed at a running stub server.
+
+    Args:
+        server (SpyfuStubServer): The running stub server.
+        client_context (ssl.SSLContext): Client context trusting the stub certificate.
+        **kwargs: Extra HTTPSConnectionPool arguments.
+
+    Returns:
+        HTTPSConnectionPool: The connection pool.
+    """
+    from tools.connection_pool import HTTPSConnectionPool
+    return HTTPSConnectionPool('127.0.0.1', server.port, context=client_context, **kwargs)
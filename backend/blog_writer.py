@@ -1,5 +1,10 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from storage import user_dir
 from pathlib import Path
+import itertools
 import json
+import time
 import os
 from dotenv import load_dotenv
 from google import genai
@@ -7,6 +12,78 @@ from google.genai.types import Tool, GenerateContentConfig, GoogleSearch
 
 load_dotenv()
 
+# Process-wide Gemini clients, created lazily and handed out round-robin
+_clients = []
+_client_counter = itertools.count()
+_client_lock = Lock()
+_google_search_tool = None
+
+# Institution-level research shared by every blog, keyed by the institution and its pages
+_research_cache = {}
+_research_in_flight = {}
+_research_lock = Lock()
+RESEARCH_INSTITUTION = 'Jaipuria Schools'
+RESEARCH_URLS = (
+    'https://www.jaipuriaschools.ac.in',
+    'https://www.jaipuriaschools.ac.in/why-jaipuria',
+    'https://www.jaipuriaschools.ac.in/open-a-jaipuria-school',
+)
+# Runs the institution research alongside each blog's outline search
+_research_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='blog-research')
+
+# Result of a generation stopped because the blog is no longer wanted
+CANCELLED = {'status': 'cancelled', 'message': 'Blog generation was cancelled'}
+
+def _create_client():
+    """Create a Gemini client, pointed at GEMINI_BASE_URL when it is set.
+
+    Returns:
+        genai.Client: The new client.
+    """
+    base_url = os.getenv("GEMINI_BASE_URL")
+    if base_url:
+        return genai.Client(api_key=os.getenv("GEMINI_API_KEY"), http_options={'base_url': base_url})
+    return genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+
+def get_genai_client():
+    """Return a shared Gemini client.
+
+    Up to GEMINI_CLIENT_POOL_SIZE clients (default 4) are created on demand and
+    reused round-robin instead of building a new client for every request.
+
+    Returns:
+        genai.Client: A shared client.
+    """
+    pool_size = max(1, int(os.getenv("GEMINI_CLIENT_POOL_SIZE", 4)))
+    index = next(_client_counter) % pool_size
+    with _client_lock:
+        while len(_clients) <= index:
+            _clients.append(_create_client())
+        return _clients[index]
+
+def get_google_search_tool():
+    """Return the shared Google Search tool.
+
+    Returns:
+        Tool: The Google Search tool.
+    """
+    global _google_search_tool
+    with _client_lock:
+        if _google_search_tool is None:
+            _google_search_tool = Tool(google_search=GoogleSearch())
+        return _google_search_tool
+
+def warm_up_genai():
+    """Create the whole Gemini client pool and the search tool ahead of the first request."""
+    try:
+        pool_size = max(1, int(os.getenv("GEMINI_CLIENT_POOL_SIZE", 4)))
+        for _ in range(pool_size):
+            get_genai_client()
+        get_google_search_tool()
+        print(f"Gemini client pool ready ({pool_size} clients)")
+    except Exception as e:
+        print(f"Error warming up Gemini clients: {str(e)}")
+
 def show_json(obj):
     """Display a JSON representation of the given object.
 
@@ -51,31 +128,128 @@ def show_parts(r: genai.types.GenerateContentResponse, path: str, filename: str)
     except Exception as e:
         print(f"Error writing parts to file: {str(e)}")
 
-def generate_blog(blog_outline, user_id):
+def show_stream_parts(text: str, r: genai.types.GenerateContentResponse, path: str, filename: str):
+    """Write a streamed response to a file, in the same form as show_parts.
+
+    Args:
+        text (str): The full text of the streamed response.
+        r (genai.types.GenerateContentResponse): The last chunk carrying candidates,
+            whose grounding metadata covers the whole response.
+        path (str): The directory path where the file will be saved.
+        filename (str): The name of the file to save the content.
+    """
+    try:
+        with open(path / filename, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+            # Write search metadata if available
+            grounding_metadata = r.candidates[0].grounding_metadata if r and r.candidates else None
+            if grounding_metadata and grounding_metadata.search_entry_point:
+                f.write("\n--- Search Results Used ---\n")
+                f.write(grounding_metadata.search_entry_point.rendered_content + '\n')
+
+    except Exception as e:
+        print(f"Error writing parts to file: {str(e)}")
+
+def get_institution_research(client, google_search_tool):
+    """Return the Google-Search-grounded research on Jaipuria Schools.
+
+    The research does not depend on the blog outline, so it is cached for
+    BLOG_RESEARCH_TTL seconds (default 6 hours), keyed by RESEARCH_INSTITUTION
+    and RESEARCH_URLS. Concurrent calls share a single in-flight request.
+
+    Args:
+        client (genai.Client): The Gemini client.
+        google_search_tool (Tool): The Google Search tool.
+
+    Returns:
+        str: The research text.
+    """
+    key = (RESEARCH_INSTITUTION, RESEARCH_URLS)
+    ttl = float(os.getenv("BLOG_RESEARCH_TTL", 6 * 3600))
+    with _research_lock:
+        cached = _research_cache.get(key)
+        if cached and time.time() - cached[0] < ttl:
+            return cached[1]
+
+        future = _research_in_flight.get(key)
+        is_owner = future is None
+        if is_owner:
+            future = Future()
+            _research_in_flight[key] = future
+
+    if not is_owner:
+        return future.result()
+
+    try:
+        websites = '\n            '.join(RESEARCH_URLS)
+        research_prompt = f"""
+            You are an expert SEO content writer for Jaipuria Schools.
+            Search about Jaipuria Schools, their history, their growth, their awards,
+            their recognition, their total schools, their unique offerings, and their expertise.
+
+            Websites to search:
+            {websites}
+        """
+
+        research_response = client.models.generate_content(
+            model='gemini-2.0-flash-exp',
+            contents=research_prompt,
+            config=GenerateContentConfig(
+                tools=[google_search_tool],
+                response_modalities=["TEXT"],
+                temperature=0.3,  # Lower temperature for factual search
+            )
+        )
+        research = research_response.text
+
+        with _research_lock:
+            _research_cache[key] = (time.time(), research)
+        future.set_result(research)
+        return research
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _research_lock:
+            _research_in_flight.pop(key, None)
+
+def generate_blog(blog_outline, user_id, stream=False, on_chunk=None, filename='blog_post.md',
+                  cancelled=None):
     """Generate a blog post from an outline using Gemini with Google Search.
 
     Args:
         blog_outline (str): The outline for the blog post.
         user_id (str): The unique identifier for the user.
+        stream (bool): Whether to stream the blog generation, writing each chunk
+            to the blog file as it arrives instead of waiting for the whole post.
+        on_chunk (callable, optional): Called with each text chunk in streaming mode.
+        filename (str): Name of the markdown file the blog is saved to. Other names
+            than the default also prefix the log files, so that several blogs can
+            be generated for the same user at once.
+        cancelled (threading.Event, optional): Set when the blog is no longer wanted,
+            e.g. because the client disconnected; generation stops at the next step
+            or streamed chunk, and a partly written blog file is removed.
 
     Returns:
         dict: A dictionary containing the status and message of the blog generation.
     """
+    if cancelled is not None and cancelled.is_set():
+        return dict(CANCELLED)
+
     try:
-        client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-        google_search_tool = Tool(google_search=GoogleSearch())
+        client = get_genai_client()
+        google_search_tool = get_google_search_tool()
+
+        # Research on the institution itself is shared across blogs; on a cache miss it runs
+        # at the same time as the outline search, so it adds no latency to the blog
+        research_future = _research_executor.submit(
+            get_institution_research, client, google_search_tool
+        )
 
-        # Prepare the search prompt for gathering information
+        # Prepare the outline-specific search prompt for gathering information
         search_prompt = f"""
             You are an expert SEO content writer for Jaipuria Schools.
-            Search about Jaipuria Schools, their history, their growth, their awards,
-            their recognition, their total schools, their unique offerings, and their expertise.
-
-            Websites to search:
-            https://www.jaipuriaschools.ac.in
-            https://www.jaipuriaschools.ac.in/why-jaipuria
-            https://www.jaipuriaschools.ac.in/open-a-jaipuria-school
-
             You are given a blog outline and you need to search for current information,
             statistics, and expert insights about:
             {blog_outline}
@@ -99,9 +273,11 @@ def generate_blog(blog_outline, user_id):
         )
 
         # Save search results
-        output_dir = Path('outputs') / str(user_id) / 'blogs'
+        output_dir = user_dir(user_id) / 'blogs'
         output_dir.mkdir(parents=True, exist_ok=True)
-        show_parts(search_response, output_dir, 'search_logs.md')
+        log_prefix = '' if filename == 'blog_post.md' else f'{Path(filename).stem}_'
+        show_parts(search_response, output_dir, f'{log_prefix}search_logs.md')
+        institution_research = research_future.result()
 
         # Prepare the blog prompt using the search results
         blog_prompt = f"""
@@ -138,29 +314,62 @@ def generate_blog(blog_outline, user_id):
         """
 
         prompt = blog_prompt.format(outline=blog_outline)
+        blog_contents = [
+            institution_research,  # Include shared institution research
+            search_response,  # Include search results
+            prompt            # Include blog prompt
+        ]
+        blog_config = GenerateContentConfig(
+            response_modalities=["TEXT"],
+            temperature=0.3,
+            candidate_count=1,
+            max_output_tokens=4000,
+        )
+        blog_path = output_dir / filename
 
-        # Generate the final blog content
-        blog_response = client.models.generate_content(
-            model='gemini-2.0-flash-exp',
-            contents=[
-                search_response,  # Include search results
-                prompt            # Include blog prompt
-            ],
-            config=GenerateContentConfig(
-                response_modalities=["TEXT"],
-                temperature=0.3,
-                candidate_count=1,
-                max_output_tokens=4000,
+        if cancelled is not None and cancelled.is_set():
+            return dict(CANCELLED)
+
+        if stream:
+            # Write each chunk to the blog file as soon as it arrives
+            chunks = []
+            last_chunk = None
+            with open(blog_path, 'w', encoding='utf-8') as f:
+                for chunk in client.models.generate_content_stream(
+                    model='gemini-2.0-flash-exp',
+                    contents=blog_contents,
+                    config=blog_config
+                ):
+                    if cancelled is not None and cancelled.is_set():
+                        break
+                    if chunk.candidates:
+                        last_chunk = chunk
+                    if not chunk.text:
+                        continue
+                    f.write(chunk.text)
+                    f.flush()
+                    chunks.append(chunk.text)
+                    if on_chunk:
+                        on_chunk(chunk.text)
+            if cancelled is not None and cancelled.is_set():
+                blog_path.unlink(missing_ok=True)
+                return dict(CANCELLED)
+            blog_content = ''.join(chunks)
+            show_stream_parts(blog_content, last_chunk, output_dir, f'{log_prefix}blog_logs.md')
+        else:
+            # Generate the final blog content
+            blog_response = client.models.generate_content(
+                model='gemini-2.0-flash-exp',
+                contents=blog_contents,
+                config=blog_config
             )
-        )
 
-        show_parts(blog_response, output_dir, 'blog_logs.md')
-        blog_content = blog_response.text
+            show_parts(blog_response, output_dir, f'{log_prefix}blog_logs.md')
+            blog_content = blog_response.text
 
-        # Save the final blog content
-        blog_path = output_dir / 'blog_post.md'
-        with open(blog_path, 'w', encoding='utf-8') as f:
-            f.write(blog_content)
+            # Save the final blog content
+            with open(blog_path, 'w', encoding='utf-8') as f:
+                f.write(blog_content)
 
         print(f"✓ Blog saved to: {blog_path}")
 
@@ -0,0 +1,174 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from docx_converter import convert_markdown_file, convert_markdown_text
+from threading import Lock
+import multiprocessing
+import time
+import os
+
+def _warm_worker():
+    """Worker initializer; importing this module has already loaded the converter."""
+    return os.getpid()
+
+def _worker_context():
+    """Return the multiprocessing context for the worker processes.
+
+    Returns:
+        multiprocessing.context.BaseContext: A forkserver context preloading the
+            converter, or a spawn context where forkserver is not available.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['docx_converter'])
+        return context
+    return multiprocessing.get_context('spawn')
+
+def _convert(markdown_file, output_path, markdown=None):
+    """Convert a markdown file in a worker process.
+
+    Args:
+        markdown_file (str): Path to the markdown file to convert.
+        output_path (str): Path of the DOCX file to write.
+        markdown (str, optional): Content of the markdown file, if the caller
+            already has it in memory; the file is then not read.
+
+    Returns:
+        float: Seconds spent converting.
+    """
+    start = time.perf_counter()
+    if markdown is not None:
+        convert_markdown_text(markdown, output_path)
+    else:
+        convert_markdown_file(markdown_file, output_path)
+    return time.perf_counter() - start
+
+class ConversionService:
+    """Converts markdown to DOCX on a pool of warm worker processes.
+
+    Conversion is CPU-bound, so running it in separate processes keeps it off
+    the server's threads and lets several documents convert in parallel. The
+    workers are long-lived, so the converter library is imported once per
+    worker rather than once per document.
+
+    Where available the workers are forked from a forkserver that has preloaded
+    docx_converter, so they neither inherit the server's threads and locks nor
+    pay for the import again. Like spawned workers they still re-import the
+    parent's __main__ module; app.py therefore hands `python app.py` over to
+    `python -m uvicorn`, whose __main__ multiprocessing does not re-import.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        """Initialize the service; worker processes start on first use.
+
+        Args:
+            max_workers (int): Number of worker processes.
+        """
+        self.max_workers = max_workers
+        self._executor = None
+        self._executor_lock = Lock()
+        self._metrics_lock = Lock()
+        self._metrics = {
+            'queued': 0,
+            'completed': 0,
+            'failed': 0,
+            'total_seconds': 0.0,
+            'max_seconds': 0.0,
+            'last_seconds': None
+        }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Return the worker pool, creating it if needed. Caller holds the executor lock."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=_worker_context(),
+                initializer=_warm_worker
+            )
+        return self._executor
+
+    def warm_up(self):
+        """Start the worker processes ahead of the first conversion."""
+        try:
+            with self._executor_lock:
+                executor = self._get_executor()
+            for future in [executor.submit(_warm_worker) for _ in range(self.max_workers)]:
+                future.result()
+        except Exception as e:
+            print(f"Error warming up conversion workers: {str(e)}")
+
+    def _record(self, future):
+        """Update the metrics when a conversion finishes."""
+        with self._metrics_lock:
+            self._metrics['queued'] -= 1
+            if future.exception() is not None:
+                self._metrics['failed'] += 1
+                return
+            seconds = future.result()
+            self._metrics['completed'] += 1
+            self._metrics['total_seconds'] += seconds
+            self._metrics['max_seconds'] = max(self._metrics['max_seconds'], seconds)
+            self._metrics['last_seconds'] = seconds
+
+    def submit(self, markdown_file, output_path, markdown=None):
+        """Queue a conversion.
+
+        Args:
+            markdown_file (str | Path): Path to the markdown file to convert.
+            output_path (str | Path): Path of the DOCX file to write.
+            markdown (str, optional): Content of the markdown file, if already in memory.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the seconds spent converting.
+        """
+        with self._executor_lock:
+            try:
+                future = self._get_executor().submit(_convert, str(markdown_file), str(output_path), markdown)
+            except BrokenProcessPool:
+                # A worker died; replace the pool and try again
+                self._executor = None
+                future = self._get_executor().submit(_convert, str(markdown_file), str(output_path), markdown)
+
+        with self._metrics_lock:
+            self._metrics['queued'] += 1
+        future.add_done_callback(self._record)
+        return future
+
+    def convert(self, markdown_file, output_path, markdown=None) -> float:
+        """Convert a file on the worker pool and wait for it to finish.
+
+        Args:
+            markdown_file (str | Path): Path to the markdown file to convert.
+            output_path (str | Path): Path of the DOCX file to write.
+            markdown (str, optional): Content of the markdown file, if already in memory.
+
+        Returns:
+            float: Seconds spent converting.
+        """
+        return self.submit(markdown_file, output_path, markdown).result()
+
+    def metrics(self) -> dict:
+        """Return the queue depth and conversion timing metrics.
+
+        Returns:
+            dict: Queued conversions, completed and failed counts, and timings in seconds.
+        """
+        with self._metrics_lock:
+            completed = self._metrics['completed']
+            return {
+                'workers': self.max_workers,
+                'queueDepth': self._metrics['queued'],
+                'completed': completed,
+                'failed': self._metrics['failed'],
+                'averageSeconds': self._metrics['total_seconds'] / completed if completed else None,
+                'maxSeconds': self._metrics['max_seconds'],
+                'lastSeconds': self._metrics['last_seconds']
+            }
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+conversion_service = ConversionService(max_workers=int(os.getenv("DOCX_CONVERSION_WORKERS", 2)))
@@ -0,0 +1,173 @@
+from crewai.tasks.task_output import TaskOutput
+from tools.response_cache import ResponseCache, CACHE_ROOT
+from pathlib import Path
+import threading
+import hashlib
+import json
+import os
+
+_task_output_cache = None
+_task_output_cache_lock = threading.Lock()
+
+def get_task_output_cache():
+    """Return the process-wide crew task output cache.
+
+    The cache is disabled by setting CREW_CACHE_ENABLED to "false".
+
+    Returns:
+        ResponseCache: The shared cache, or None if caching is disabled.
+    """
+    global _task_output_cache
+    if os.getenv("CREW_CACHE_ENABLED", "true").lower() == "false":
+        return None
+    with _task_output_cache_lock:
+        if _task_output_cache is None:
+            _task_output_cache = ResponseCache(
+                os.getenv("CREW_CACHE_DIR", CACHE_ROOT / "crew"),
+                ttl=float(os.getenv("CREW_CACHE_TTL", 7 * 24 * 3600)),
+                max_bytes=int(os.getenv("CREW_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+            )
+        return _task_output_cache
+
+def _file_hash(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file, or 'missing' if it does not exist."""
+    if not path.exists():
+        return 'missing'
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+class CrewTaskCache:
+    """Replays crew task outputs from a cache when their inputs have not changed.
+
+    A task's key covers its configuration, its agent's configuration and
+    model, the crew inputs other than the user ID, its tools, and the content
+    of every file its tools read. Files written by an earlier task of the same
+    crew are represented by that task's key, and so are context tasks, so a
+    change anywhere upstream invalidates everything downstream.
+    """
+
+    def __init__(self, cache: ResponseCache, bypass: bool = False):
+        """Initialize the task cache.
+
+        Args:
+            cache (ResponseCache): The store for task outputs.
+            bypass (bool): Whether to ignore cached outputs; fresh outputs are still stored.
+        """
+        self.cache = cache
+        self.bypass = bypass
+        self._keys = {}
+
+    def task_key(self, task, inputs: dict, produced: dict) -> str:
+        """Compute the cache key of a task.
+
+        Args:
+            task (Task): The task.
+            inputs (dict): The crew inputs.
+            produced (dict): Resolved output file path to the key of the earlier
+                task that writes it.
+
+        Returns:
+            str: The key.
+        """
+        files = {}
+        for tool in task.tools or []:
+            file_path = getattr(tool, 'file_path', None)
+            if file_path:
+                path = Path(file_path).resolve()
+                files[tool.name] = produced.get(path) or _file_hash(path)
+
+        agent = task.agent
+        key = {
+            'description': task.description,
+            'expected_output': task.expected_output,
+            'agent': {
+                'role': agent.role,
+                'goal': agent.goal,
+                'backstory': agent.backstory,
+                'model': getattr(agent.llm, 'model', str(agent.llm))
+            } if agent else None,
+            'inputs': {name: value for name, value in inputs.items() if name != 'user_id'},
+            'tools': sorted(tool.name for tool in task.tools or []),
+            'files': files,
+            'context': [self._keys.get(id(context)) for context in task.context or []]
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def replay(self, tasks: list, inputs: dict, on_event=None) -> list:
+        """Replay the cached outputs of the leading tasks that have not changed.
+
+        Tasks run sequentially, so replay stops at the first task without a
+        cached output; that task and every later one are returned to be run.
+
+        Args:
+            tasks (list): The crew's tasks in execution order.
+            inputs (dict): The crew inputs.
+            on_event (callable, optional): Callback receiving 'task_cached' events.
+
+        Returns:
+            list: The tasks that still have to run.
+        """
+        produced = {}
+        pending = None
+        for index, task in enumerate(tasks):
+            key = self.task_key(task, inputs, produced)
+            self._keys[id(task)] = key
+            if task.output_file:
+                produced[Path(task.output_file).resolve()] = key
+            if pending is not None:
+                continue
+
+            cached = None if self.bypass else self.cache.get('crew_task', {'key': key})
+            if cached is None:
+                pending = index
+                continue
+
+            raw = cached.decode('utf-8')
+            task.output = TaskOutput(
+                description=task.description,
+                name=task.name,
+                expected_output=task.expected_output,
+                raw=raw,
+                agent=task.agent.role if task.agent else ''
+            )
+            if task.output_file:
+                output_path = Path(task.output_file)
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                output_path.write_text(raw, encoding='utf-8')
+            print(f"Replayed cached output of task: {task.name}")
+            if on_event:
+                on_event('task_cached', {'task': task.name, 'index': index})
+
+        return [] if pending is None else tasks[pending:]
+
+    def store(self, tasks: list):
+        """Store the outputs of tasks that have just run.
+
+        Args:
+            tasks (list): The tasks that ran.
+        """
+        for task in tasks:
+            key = self._keys.get(id(task))
+            if key is not None and task.output is not None and task.output.raw:
+                self.cache.set('crew_task', {'key': key}, task.output.raw.encode('utf-8'))
+
+def kickoff_with_cache(crew_base):
+    """Run a crew, replaying the outputs of tasks whose inputs have not changed.
+
+    Args:
+        crew_base (AnalysisCrew | SeoCrew): The crew to run.
+    """
+    crew = crew_base.crew()
+    cache = get_task_output_cache()
+    if cache is None:
+        crew.kickoff()
+        return
+
+    task_cache = CrewTaskCache(cache, bypass=crew_base.bypass_cache)
+    pending = task_cache.replay(crew.tasks, crew_base.inputs, crew_base.on_event)
+    if pending:
+        # Progress keeps the full task list so events carry the same indices as the replayed tasks'
+        if crew_base.progress is not None:
+            crew_base.progress.skip(len(crew.tasks) - len(pending))
+        crew.tasks = pending
+        crew.kickoff()
+        task_cache.store(pending)
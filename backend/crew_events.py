@@ -0,0 +1,96 @@
+class CrewProgress:
+    """Translate crewAI step and task callbacks into job progress events.
+
+    Crews run their tasks sequentially, so the end of one task marks the start
+    of the next one.
+    """
+
+    def __init__(self, on_event, tasks: list):
+        """Initialize the progress reporter.
+
+        Args:
+            on_event (callable): Callback receiving an event type and its payload.
+            tasks (list): The crew's tasks in execution order.
+        """
+        self.on_event = on_event
+        self.tasks = tasks
+        self.current = 0
+
+    def _task_name(self, index: int) -> str:
+        """Return a readable name for the task at the given position."""
+        task = self.tasks[index]
+        return task.name or task.description.strip().split('\n')[0][:80]
+
+    def _start_task(self, index: int):
+        """Emit the start event for the task at the given position, if any."""
+        if index < len(self.tasks):
+            self.on_event('task_started', {
+                'task': self._task_name(index),
+                'agent': self.tasks[index].agent.role.strip() if self.tasks[index].agent else None,
+                'index': index,
+                'total': len(self.tasks)
+            })
+
+    def skip(self, count: int):
+        """Start from a later task, when the leading ones were replayed instead of run.
+
+        Args:
+            count (int): Number of leading tasks that will not run.
+        """
+        self.current = count
+
+    def before_kickoff(self, inputs):
+        """Emit the start of the crew and its first task.
+
+        Args:
+            inputs (dict): The kickoff inputs, returned unchanged.
+
+        Returns:
+            dict: The kickoff inputs.
+        """
+        self.on_event('crew_started', {'tasks': len(self.tasks), 'replayed': self.current})
+        self._start_task(self.current)
+        return inputs
+
+    def step_callback(self, step):
+        """Forward an agent step as tool call or partial output events.
+
+        Args:
+            step: The AgentAction or AgentFinish produced by the agent.
+        """
+        try:
+            thought = getattr(step, 'thought', None)
+            if thought:
+                self.on_event('agent_output', {'text': thought, 'final': False})
+
+            tool = getattr(step, 'tool', None)
+            if tool:
+                self.on_event('tool_call', {
+                    'tool': tool,
+                    'input': str(getattr(step, 'tool_input', '')),
+                    'result': str(getattr(step, 'result', '') or '')[:500]
+                })
+
+            output = getattr(step, 'output', None)
+            if output:
+                self.on_event('agent_output', {'text': str(output), 'final': True})
+        except Exception as e:
+            print(f"Error reporting crew step: {str(e)}")
+
+    def task_callback(self, output):
+        """Emit the end of the current task and the start of the next one.
+
+        Args:
+            output (TaskOutput): The output of the finished task.
+        """
+        try:
+            # Concurrent tasks can finish out of order, so prefer the output's own name
+            self.on_event('task_finished', {
+                'task': output.name or self._task_name(self.current),
+                'index': self.current,
+                'output': output.raw
+            })
+            self.current += 1
+            self._start_task(self.current)
+        except Exception as e:
+            print(f"Error reporting crew task: {str(e)}")
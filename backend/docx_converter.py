@@ -0,0 +1,222 @@
+from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+import re
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+BULLET_PATTERN = re.compile(r'^(\s*)[-*+]\s+(.*)$')
+NUMBERED_PATTERN = re.compile(r'^(\s*)\d+[.)]\s+(.*)$')
+SEPARATOR_PATTERN = re.compile(r'^\s*([-*_])(\s*\1){2,}\s*$')
+TABLE_DIVIDER_PATTERN = re.compile(r'^\s*\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?\s*$')
+INLINE_PATTERN = re.compile(r'(\*\*.+?\*\*|__.+?__|`[^`]+`|\[[^\]]+\]\([^)]+\)|\*[^*\s][^*]*\*)')
+
+def add_inline_runs(paragraph, text: str, bold: bool = False):
+    """Add text to a paragraph, rendering bold, italic, code and link markup.
+
+    Args:
+        paragraph (docx.text.paragraph.Paragraph): The paragraph to add runs to.
+        text (str): Markdown inline text.
+        bold (bool): Whether all runs should be bold.
+    """
+    for token in INLINE_PATTERN.split(text):
+        if not token:
+            continue
+        if (token.startswith('**') and token.endswith('**')) or (token.startswith('__') and token.endswith('__')):
+            add_inline_runs(paragraph, token[2:-2], bold=True)
+        elif token.startswith('`') and token.endswith('`'):
+            run = paragraph.add_run(token[1:-1])
+            run.bold = bold or None
+            run.font.name = 'Consolas'
+        elif token.startswith('[') and token.endswith(')'):
+            label = token[1:token.index('](')]
+            paragraph.add_run(label).bold = bold or None
+        elif token.startswith('*') and token.endswith('*') and len(token) > 2:
+            run = paragraph.add_run(token[1:-1])
+            run.italic = True
+            run.bold = bold or None
+        else:
+            paragraph.add_run(token).bold = bold or None
+
+def split_table_row(line: str) -> list:
+    """Split a markdown table row into its cell texts.
+
+    Args:
+        line (str): The table row.
+
+    Returns:
+        list[str]: The stripped cell texts.
+    """
+    row = line.strip()
+    if row.startswith('|'):
+        row = row[1:]
+    if row.endswith('|'):
+        row = row[:-1]
+    return [cell.strip() for cell in row.split('|')]
+
+class MarkdownDocxConverter:
+    """Streaming converter for the markdown our crews and the blog writer emit.
+
+    Handles headings, paragraphs, bullet and numbered lists, tables, bold,
+    italic and code spans, links and '---' separators. Lines are consumed one
+    at a time; only the rows of the table being read are buffered.
+    """
+
+    def __init__(self):
+        """Initialize the converter with an empty document."""
+        self.document = Document()
+        self._table_rows = []
+        # Numbering instance of the numbered list open at each nesting level
+        self._list_numbers = {}
+
+    def _flush_table(self):
+        """Write the buffered table rows to the document."""
+        rows = [row for row in self._table_rows if not TABLE_DIVIDER_PATTERN.match(row)]
+        self._table_rows = []
+        if not rows:
+            return
+
+        cells = [split_table_row(row) for row in rows]
+        columns = max(len(row) for row in cells)
+        table = self.document.add_table(rows=0, cols=columns)
+        table.style = 'Table Grid'
+        for index, row in enumerate(cells):
+            row_cells = table.add_row().cells
+            for column, text in enumerate(row):
+                # The first row is the header row
+                add_inline_runs(row_cells[column].paragraphs[0], text, bold=index == 0)
+
+    def _add_separator(self):
+        """Add a horizontal rule as an empty paragraph with a bottom border."""
+        paragraph = self.document.add_paragraph()
+        borders = OxmlElement('w:pBdr')
+        bottom = OxmlElement('w:bottom')
+        bottom.set(qn('w:val'), 'single')
+        bottom.set(qn('w:sz'), '6')
+        bottom.set(qn('w:space'), '1')
+        bottom.set(qn('w:color'), 'auto')
+        borders.append(bottom)
+        paragraph._p.get_or_add_pPr().append(borders)
+
+    def _new_list_number(self, style: str) -> int:
+        """Create a numbering instance of a numbered list style that starts at 1.
+
+        Paragraphs of a style share the style's numbering, which would number
+        every list in the document as one; each list gets its own instance.
+
+        Args:
+            style (str): The numbered list style.
+
+        Returns:
+            int: The new numbering ID.
+        """
+        numbering = self.document.part.numbering_part.element
+        style_num_id = self.document.styles[style].element.pPr.numPr.numId.val
+        num = numbering.add_num(numbering.num_having_numId(style_num_id).abstractNumId.val)
+        num.add_lvlOverride(ilvl=0).add_startOverride(1)
+        return num.numId
+
+    def _add_list_item(self, indent: str, text: str, style: str):
+        """Add a list item, nesting it according to its indentation.
+
+        Args:
+            indent (str): Leading whitespace of the item.
+            text (str): Markdown text of the item.
+            style (str): Base list style, 'List Bullet' or 'List Number'.
+        """
+        level = min(len(indent.replace('\t', '    ')) // 2, 2)
+        level_style = style if level == 0 else f'{style} {level + 1}'
+        paragraph = self.document.add_paragraph(style=level_style)
+        add_inline_runs(paragraph, text)
+
+        # Lists nested deeper than this item end with it, as does a numbered list at its level interrupted by bullets
+        for open_level in [open_level for open_level in self._list_numbers if open_level > level]:
+            del self._list_numbers[open_level]
+        if style != 'List Number':
+            self._list_numbers.pop(level, None)
+            return
+        if level not in self._list_numbers:
+            self._list_numbers[level] = self._new_list_number(level_style)
+        num_pr = paragraph._p.get_or_add_pPr().get_or_add_numPr()
+        num_pr.get_or_add_ilvl().val = 0
+        num_pr.get_or_add_numId().val = self._list_numbers[level]
+
+    def feed(self, line: str):
+        """Convert one markdown line.
+
+        Args:
+            line (str): The line, with or without its trailing newline.
+        """
+        line = line.rstrip('\r\n')
+        stripped = line.strip()
+
+        if stripped.startswith('|'):
+            self._table_rows.append(stripped)
+            self._list_numbers = {}
+            return
+        if self._table_rows:
+            self._flush_table()
+
+        # Code fences around crew outputs carry no content
+        if not stripped or stripped.startswith('```'):
+            return
+
+        heading = HEADING_PATTERN.match(stripped)
+        bullet = BULLET_PATTERN.match(line)
+        numbered = NUMBERED_PATTERN.match(line)
+        # Any other block ends the open lists, so the next numbered list starts at 1
+        if not (bullet or numbered):
+            self._list_numbers = {}
+
+        if heading:
+            paragraph = self.document.add_heading(level=len(heading.group(1)))
+            add_inline_runs(paragraph, heading.group(2))
+            return
+
+        if SEPARATOR_PATTERN.match(stripped):
+            self._add_separator()
+            return
+
+        if bullet:
+            self._add_list_item(bullet.group(1), bullet.group(2), 'List Bullet')
+            return
+
+        if numbered:
+            self._add_list_item(numbered.group(1), numbered.group(2), 'List Number')
+            return
+
+        add_inline_runs(self.document.add_paragraph(), stripped)
+
+    def save(self, output_path):
+        """Finish the document and save it.
+
+        Args:
+            output_path (str | Path): Path of the DOCX file to write.
+        """
+        if self._table_rows:
+            self._flush_table()
+        self.document.save(str(output_path))
+
+def convert_markdown_file(markdown_file, output_path):
+    """Convert a markdown file to a DOCX file, reading it line by line.
+
+    Args:
+        markdown_file (str | Path): Path to the markdown file to convert.
+        output_path (str | Path): Path of the DOCX file to write.
+    """
+    converter = MarkdownDocxConverter()
+    with open(markdown_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            converter.feed(line)
+    converter.save(output_path)
+
+def convert_markdown_text(markdown: str, output_path):
+    """Convert markdown text already in memory to a DOCX file.
+
+    Args:
+        markdown (str): The markdown content.
+        output_path (str | Path): Path of the DOCX file to write.
+    """
+    converter = MarkdownDocxConverter()
+    for line in markdown.splitlines():
+        converter.feed(line)
+    converter.save(output_path)
@@ -0,0 +1,164 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from conversion_service import conversion_service
+from storage import user_dir
+from threading import Lock
+from pathlib import Path
+import hashlib
+import re
+import os
+
+# Markdown source of each downloadable DOCX file, relative to the user directory
+DOCX_SOURCES = {
+    'analysis.docx': Path('crew') / '1_analysis.md',
+    'ad_copies.docx': Path('crew') / '2_ad_copies.md',
+    'blog_post_outlines.docx': Path('crew') / '3_blog_post_outlines.md',
+    'blog_post.docx': Path('blogs') / 'blog_post.md',
+}
+BATCH_BLOG_PATTERN = re.compile(r'^blog_post_(\d+)\.docx$')
+
+_render_locks = {}
+_render_locks_lock = Lock()
+_prerender_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='prerender')
+
+def markdown_source(userId, filename):
+    """Return the markdown file a DOCX file is rendered from.
+
+    Args:
+        userId (str): Unique identifier for the user.
+        filename (str): Name of the DOCX file.
+
+    Returns:
+        Path: Path to the markdown source, or None if the file has no known source.
+    """
+    outputs_dir = user_dir(userId)
+    if filename in DOCX_SOURCES:
+        return outputs_dir / DOCX_SOURCES[filename]
+
+    batch_blog = BATCH_BLOG_PATTERN.match(filename)
+    if batch_blog:
+        return outputs_dir / 'blogs' / f'blog_post_{batch_blog.group(1)}.md'
+    return None
+
+def content_hash(path):
+    """Return the SHA-256 hex digest of a markdown file's text.
+
+    The file is read as text, with its line endings translated to '\n', so
+    the digest equals text_hash() of the content callers read from it.
+
+    Args:
+        path (Path): The file to hash.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'r', encoding='utf-8') as f:
+        for block in iter(lambda: f.read(65536), ''):
+            digest.update(block.encode('utf-8'))
+    return digest.hexdigest()
+
+def text_hash(markdown):
+    """Return the SHA-256 hex digest of markdown text, as content_hash() computes it for a file.
+
+    Args:
+        markdown (str): The markdown content.
+
+    Returns:
+        str: The hex digest.
+    """
+    return hashlib.sha256(markdown.replace('\r\n', '\n').replace('\r', '\n').encode('utf-8')).hexdigest()
+
+def _render_lock(output_path):
+    """Return the lock serialising renders of one DOCX file."""
+    with _render_locks_lock:
+        return _render_locks.setdefault(str(output_path), Lock())
+
+def get_docx(userId, filename, markdown=None):
+    """Return a DOCX file, rendering it from its markdown source if needed.
+
+    The DOCX file is cached next to a record of the source's content hash and
+    is only re-rendered when the markdown has changed since the last render.
+
+    Args:
+        userId (str): Unique identifier for the user.
+        filename (str): Name of the DOCX file.
+        markdown (str, optional): Current content of the markdown source, if the
+            caller already has it in memory; the source is then not read again.
+
+    Returns:
+        Path: Path to the DOCX file, or None if neither the file nor its source exists.
+    """
+    output_path = user_dir(userId) / 'doc' / filename
+    source = markdown_source(userId, filename)
+    if source is None or not source.exists():
+        return output_path if output_path.exists() else None
+
+    hash_path = output_path.with_name(f'{filename}.sha256')
+    with _render_lock(output_path):
+        if markdown is not None:
+            source_hash = text_hash(markdown)
+        else:
+            source_hash = content_hash(source)
+        if output_path.exists() and hash_path.exists() and hash_path.read_text() == source_hash:
+            return output_path
+
+        print(f"Converting {source} to {filename}")
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Render to a temporary file so a failed conversion never replaces a good one;
+        # other worker processes may be rendering the same file
+        tmp_path = output_path.with_name(f'.{filename}.{os.getpid()}.tmp')
+        conversion_service.convert(source, tmp_path, markdown)
+        os.replace(tmp_path, output_path)
+        hash_path.write_text(source_hash)
+
+        print(f"✅ Saved to: {output_path}")
+        return output_path
+
+def available_docx_files(userId, files):
+    """Return the DOCX files whose markdown sources exist, without rendering them.
+
+    Args:
+        userId (str): Unique identifier for the user.
+        files (list[tuple]): (DOCX filename, response key) pairs.
+
+    Returns:
+        dict: Response key to DOCX filename for every file that can be downloaded.
+    """
+    docx_files = {}
+    for filename, key in files:
+        source = markdown_source(userId, filename)
+        if source is not None and source.exists():
+            docx_files[key] = filename
+        else:
+            print(f"Warning: {source} not found")
+    return docx_files
+
+def prerender_docx(userId, filenames, contents=None):
+    """Render several DOCX files in the background, in parallel.
+
+    Args:
+        userId (str): Unique identifier for the user.
+        filenames (list[str]): Names of the DOCX files to render.
+        contents (dict, optional): DOCX filename to the markdown content of its
+            source, for sources the caller already has in memory.
+
+    Returns:
+        list[concurrent.futures.Future]: One future per file, resolving to its path.
+    """
+    contents = contents or {}
+    futures = []
+    for filename in filenames:
+        future = _prerender_executor.submit(get_docx, userId, filename, contents.get(filename))
+        future.add_done_callback(partial(_report_prerender, userId, filename))
+        futures.append(future)
+    return futures
+
+def _report_prerender(userId, filename, future):
+    """Log a failed background render, since callers don't wait on its future."""
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is not None:
+        print(f"Error prerendering {filename} for user {userId}: {str(error)}")
@@ -0,0 +1,577 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, Condition, Event, Thread
+from storage import STORAGE_ROOT, user_lock
+from pathlib import Path
+import importlib
+import tempfile
+import socket
+import json
+import time
+import uuid
+import re
+import os
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at its maximum depth."""
+
+class Job:
+    """A crew run submitted to the job manager."""
+
+    def __init__(self, kind: str, user_id: str):
+        """Initialize a queued job.
+
+        Args:
+            kind (str): Type of the job, e.g. 'analysis' or 'seo'.
+            user_id (str): Unique identifier for the user the job belongs to.
+        """
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.user_id = user_id
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.events = []
+        # Host and process running the job, so workers sharing the job store know who owns it
+        self.owner = f'{socket.gethostname()}:{os.getpid()}'
+        self.store = None
+        self._closed = False
+        self._events_changed = Condition()
+
+    @property
+    def done(self) -> bool:
+        """Whether the job has finished, successfully or not."""
+        return self.status in ('succeeded', 'failed')
+
+    def emit(self, event: str, data: dict = None):
+        """Record a progress event and wake up any stream waiting for it.
+
+        Args:
+            event (str): Type of the event, e.g. 'task_started' or 'tool_call'.
+            data (dict, optional): Event payload.
+        """
+        with self._events_changed:
+            record = {
+                'id': len(self.events),
+                'event': event,
+                'data': data or {},
+                'time': time.time()
+            }
+            self.events.append(record)
+            if self.store is not None:
+                try:
+                    self.store.append_event(self.id, record)
+                except Exception as e:
+                    print(f"Error logging event of job {self.id}: {str(e)}")
+            self._events_changed.notify_all()
+
+    def close(self):
+        """Mark the event log as complete once the job has finished."""
+        with self._events_changed:
+            self._closed = True
+            self._events_changed.notify_all()
+
+    def wait_for_events(self, cursor: int, timeout: float = 15.0):
+        """Wait until there are events past the cursor or the event log is closed.
+
+        Args:
+            cursor (int): Number of events already consumed.
+            timeout (float): Maximum number of seconds to wait.
+
+        Returns:
+            tuple: The new events and whether the event log is complete.
+        """
+        with self._events_changed:
+            if cursor >= len(self.events) and not self._closed:
+                self._events_changed.wait(timeout)
+            return self.events[cursor:], self._closed
+
+    def to_dict(self) -> dict:
+        """Return the job's status without its result.
+
+        Returns:
+            dict: The job's identifiers, status and timestamps.
+        """
+        return {
+            'jobId': self.id,
+            'kind': self.kind,
+            'userId': self.user_id,
+            'status': self.status,
+            'error': self.error,
+            'createdAt': self.created_at,
+            'startedAt': self.started_at,
+            'finishedAt': self.finished_at
+        }
+
+class JobStore:
+    """Job records, event logs and a job queue on disk, shared by the API's worker processes.
+
+    Submitted jobs wait in the queue until a worker with a free slot claims
+    them. Only the worker running a job writes its files afterwards: the
+    record is rewritten atomically on every status change and events are
+    appended to a log, so any other worker can report the job's status,
+    result and events.
+    """
+
+    def __init__(self, root):
+        """Initialize the store.
+
+        Args:
+            root (str | Path): Directory holding the job files.
+        """
+        self.root = Path(root)
+        self.queue_dir = self.root / 'queue'
+        self.claimed_dir = self.root / 'claimed'
+        for directory in (self.root, self.queue_dir, self.claimed_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, job_id: str, suffix: str) -> Path:
+        """Return the path of one of a job's files, or None for a malformed job ID."""
+        if not re.match(r'^[\w-]+$', job_id):
+            return None
+        return self.root / f'{job_id}{suffix}'
+
+    def _write_json(self, path: Path, data: dict):
+        """Write a JSON file atomically, so readers never see it half-written."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def save(self, job: Job):
+        """Write a job's status and result.
+
+        Args:
+            job (Job): The job, owned by this worker.
+        """
+        self._write_json(self._path(job.id, '.json'), {**job.to_dict(), 'result': job.result, 'owner': job.owner})
+
+    def enqueue(self, job: Job, fn, args: tuple):
+        """Queue a job for any worker to run.
+
+        Args:
+            job (Job): The job.
+            fn (callable): Module-level function to run; each worker imports it.
+            args (tuple): JSON-serialisable arguments passed to the function.
+        """
+        self._write_json(self.queue_dir / f'{time.time_ns():020d}-{job.id}.json', {
+            'jobId': job.id,
+            'kind': job.kind,
+            'userId': job.user_id,
+            'fn': f'{fn.__module__}:{fn.__qualname__}',
+            'args': list(args)
+        })
+
+    def queued(self) -> list:
+        """Return the names of the queued jobs' files, oldest first."""
+        return sorted(path.name for path in self.queue_dir.glob('*.json'))
+
+    def claim(self, name: str):
+        """Take a queued job off the queue, unless another worker took it first.
+
+        Args:
+            name (str): Name of the job's queue file.
+
+        Returns:
+            dict: The job's kind, user, function and arguments, or None if it was already claimed.
+        """
+        claimed_path = self.claimed_dir / f'{name}.{os.getpid()}'
+        try:
+            os.rename(self.queue_dir / name, claimed_path)
+        except FileNotFoundError:
+            return None
+        with open(claimed_path, 'r', encoding='utf-8') as f:
+            spec = json.load(f)
+        claimed_path.unlink()
+        return spec
+
+    def append_event(self, job_id: str, event: dict):
+        """Append an event to a job's event log.
+
+        Args:
+            job_id (str): The job's identifier.
+            event (dict): The event with its id, type, payload and time.
+        """
+        with open(self._path(job_id, '.events.jsonl'), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event, ensure_ascii=False) + '\n')
+
+    def read_record(self, job_id: str):
+        """Return a job's record, or None if the job is unknown."""
+        path = self._path(job_id, '.json')
+        if path is None or not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def read_events(self, job_id: str, offset: int):
+        """Return the complete events logged past a byte offset.
+
+        Args:
+            job_id (str): The job's identifier.
+            offset (int): Number of bytes of the log already read.
+
+        Returns:
+            tuple: The new events and the offset after the last complete one.
+        """
+        path = self._path(job_id, '.events.jsonl')
+        if not path.exists():
+            return [], offset
+        events = []
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                # A line without its newline is still being written
+                if not line.endswith(b'\n'):
+                    break
+                events.append(json.loads(line))
+                offset += len(line)
+        return events, offset
+
+    def load(self, job_id: str):
+        """Return a job queued or run by any worker.
+
+        Args:
+            job_id (str): The job's identifier.
+
+        Returns:
+            StoredJob: The job, or None if it is unknown or has expired.
+        """
+        record = self.read_record(job_id)
+        return StoredJob(self, record) if record is not None else None
+
+    def delete(self, job_id: str):
+        """Remove a job's files."""
+        for suffix in ('.json', '.events.jsonl'):
+            path = self._path(job_id, suffix)
+            if path is not None and path.exists():
+                path.unlink()
+
+    def prune(self, cutoff: float):
+        """Remove finished or abandoned jobs last updated before a time.
+
+        Args:
+            cutoff (float): Timestamp before which jobs expire.
+        """
+        for path in self.root.glob('*.json'):
+            try:
+                if path.stat().st_mtime >= cutoff:
+                    continue
+                job = self.load(path.stem)
+                if job is not None and job.done:
+                    self.delete(path.stem)
+            except Exception as e:
+                print(f"Error pruning job {path.stem}: {str(e)}")
+
+class StoredJob(Job):
+    """A job read back from the job store, possibly queued or run by another worker."""
+
+    poll_interval = 0.25
+
+    def __init__(self, store: JobStore, record: dict):
+        """Initialize the job from its record.
+
+        Args:
+            store (JobStore): The store the job was read from.
+            record (dict): The job's record.
+        """
+        super().__init__(record['kind'], record['userId'])
+        self.id = record['jobId']
+        self.created_at = record['createdAt']
+        self._source = store
+        self._offset = 0
+        self._update(record)
+
+    def _update(self, record: dict):
+        """Copy a job's status and result from its record."""
+        self.status = record['status']
+        self.error = record['error']
+        self.result = record['result']
+        self.started_at = record['startedAt']
+        self.finished_at = record['finishedAt']
+        self.owner = record['owner']
+        # Queued jobs are picked up by another worker if the one that queued them exits
+        if self.status == 'running' and not self._owner_alive():
+            self.status = 'failed'
+            self.error = 'The worker running the job exited'
+
+    def _owner_alive(self) -> bool:
+        """Whether the process running the job still exists, if it runs on this host."""
+        host, _, pid = self.owner.rpartition(':')
+        if host != socket.gethostname():
+            return True
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def refresh(self):
+        """Read the job's latest status and events from the store."""
+        # Read the record first: once it says the job is done, every event has been logged
+        record = self._source.read_record(self.id)
+        if record is not None:
+            self._update(record)
+        events, self._offset = self._source.read_events(self.id, self._offset)
+        self.events.extend(events)
+
+    def wait_for_events(self, cursor: int, timeout: float = 15.0):
+        """Wait until there are events past the cursor or the job has finished.
+
+        Args:
+            cursor (int): Number of events already consumed.
+            timeout (float): Maximum number of seconds to wait.
+
+        Returns:
+            tuple: The new events and whether the event log is complete.
+        """
+        deadline = time.time() + timeout
+        while True:
+            self.refresh()
+            if cursor < len(self.events) or self.done or time.time() >= deadline:
+                return self.events[cursor:], self.done
+            time.sleep(self.poll_interval)
+
+def _user_busy(user_id: str) -> bool:
+    """Whether a job is writing a user's outputs, so another would only wait for it."""
+    try:
+        with user_lock(user_id, timeout=0):
+            return False
+    except TimeoutError:
+        return True
+
+def _import_function(name: str):
+    """Return a function from its 'module:qualified.name'."""
+    module, _, qualname = name.partition(':')
+    fn = importlib.import_module(module)
+    for attribute in qualname.split('.'):
+        fn = getattr(fn, attribute)
+    return fn
+
+class JobManager:
+    """Runs crew jobs on a bounded worker pool with a bounded queue.
+
+    With a job store, the queue is shared by the API's worker processes: a
+    job may be run by any of them, and each runs as many jobs at a time as
+    it has threads, taking the oldest job whose user is not busy.
+    """
+
+    poll_interval = 0.1
+
+    def __init__(self, max_workers: int = 2, max_queue_depth: int = 20, retention: float = 3600, store: JobStore = None):
+        """Initialize the job manager.
+
+        Args:
+            max_workers (int): Number of jobs run at the same time.
+            max_queue_depth (int): Maximum number of queued and running jobs.
+            retention (float): Seconds a finished job is kept for polling.
+            store (JobStore, optional): Store sharing the queue and the jobs with
+                other worker processes; jobs are only kept in memory if not given.
+        """
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self.retention = retention
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs = {}
+        self._lock = Lock()
+        self._running = 0
+        self._wakeup = Event()
+        self._stopping = Event()
+        self._dispatcher = None
+
+    @property
+    def depth(self) -> int:
+        """Number of jobs that are queued or running; with a store, queued by any worker and running here."""
+        with self._lock:
+            return self._depth()
+
+    def _depth(self) -> int:
+        """Number of jobs that are queued or running. Caller holds the lock."""
+        depth = sum(1 for job in self._jobs.values() if not job.done)
+        if self.store is not None:
+            depth += len(self.store.queued())
+        return depth
+
+    def _prune(self):
+        """Forget finished jobs older than the retention period. Caller holds the lock."""
+        cutoff = time.time() - self.retention
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.done and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        if self.store is not None:
+            self.store.prune(cutoff)
+
+    def start(self):
+        """Start taking jobs from the shared queue, if there is a job store."""
+        if self.store is not None and self._dispatcher is None:
+            self._dispatcher = Thread(target=self._dispatch, name='job-dispatcher', daemon=True)
+            self._dispatcher.start()
+
+    def submit(self, kind: str, user_id: str, fn, *args) -> Job:
+        """Queue a function to run as a job.
+
+        Args:
+            kind (str): Type of the job.
+            user_id (str): Unique identifier for the user the job belongs to.
+            fn (callable): Function to run; its return value becomes the job result.
+                It is called with the job's emit method as the on_event keyword argument.
+                With a job store, it must be a module-level function taking
+                JSON-serialisable arguments, since another worker may run it.
+            *args: Arguments passed to the function.
+
+        Returns:
+            Job: The queued job.
+
+        Raises:
+            JobQueueFullError: If the queue is at its maximum depth.
+        """
+        job = Job(kind, user_id)
+        with self._lock:
+            self._prune()
+            depth = self._depth()
+            if depth >= self.max_queue_depth:
+                raise JobQueueFullError(f"Job queue is full ({depth} jobs pending)")
+            # With a store, the job is only tracked here once this worker claims it
+            if self.store is None:
+                self._jobs[job.id] = job
+
+        if self.store is not None:
+            job.store = self.store
+            self.store.save(job)
+            job.emit('status', {'status': job.status})
+            self.store.enqueue(job, fn, args)
+            self._wakeup.set()
+            return job
+
+        job.emit('status', {'status': job.status})
+        self._executor.submit(self._run, job, fn, *args)
+        return job
+
+    def _dispatch(self):
+        """Claim jobs from the shared queue whenever this worker has a free thread."""
+        while not self._stopping.is_set():
+            claimed = False
+            with self._lock:
+                free = self._running < self.max_workers
+            if free:
+                for name in self.store.queued():
+                    try:
+                        if self._claim(name):
+                            claimed = True
+                            break
+                    except Exception as e:
+                        print(f"Error claiming job {name}: {str(e)}")
+            if not claimed:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def _claim(self, name: str) -> bool:
+        """Claim a queued job and start running it, unless its user is busy or another worker took it."""
+        try:
+            with open(self.store.queue_dir / name, 'r', encoding='utf-8') as f:
+                user_id = json.load(f)['userId']
+        except FileNotFoundError:
+            return False
+        if _user_busy(user_id):
+            return False
+        spec = self.store.claim(name)
+        if spec is None:
+            return False
+
+        job = Job(spec['kind'], spec['userId'])
+        job.id = spec['jobId']
+        record = self.store.read_record(job.id)
+        if record is not None:
+            job.created_at = record['createdAt']
+        # Continue the event log the submitting worker started
+        job.events, _ = self.store.read_events(job.id, 0)
+        job.store = self.store
+        with self._lock:
+            self._jobs[job.id] = job
+            self._running += 1
+        self._executor.submit(self._run, job, _import_function(spec['fn']), *spec['args'])
+        return True
+
+    def _run(self, job: Job, fn, *args):
+        """Run a job's function and record its outcome."""
+        with self._lock:
+            if self.store is None:
+                self._running += 1
+            job.status = 'running'
+            job.started_at = time.time()
+        self._save(job)
+        job.emit('status', {'status': job.status})
+        try:
+            result = fn(*args, on_event=job.emit)
+            # A finished job always has its finish time, since _prune may look at it any time
+            with self._lock:
+                job.result = result
+                job.finished_at = time.time()
+                job.status = 'succeeded'
+            job.emit('result', job.result)
+        except Exception as e:
+            print(f"Error in {job.kind} job {job.id}: {str(e)}")
+            with self._lock:
+                job.error = str(e)
+                job.finished_at = time.time()
+                job.status = 'failed'
+            job.emit('error', {'message': job.error})
+        finally:
+            job.emit('status', {'status': job.status})
+            # Save the record last, so other workers see every event before the job is done
+            self._save(job)
+            job.close()
+            with self._lock:
+                self._running -= 1
+            self._wakeup.set()
+
+    def _save(self, job: Job):
+        """Write a job's record to the shared store, if there is one."""
+        if self.store is None:
+            return
+        try:
+            self.store.save(job)
+        except Exception as e:
+            print(f"Error saving {job.kind} job {job.id}: {str(e)}")
+
+    def get(self, job_id: str):
+        """Look up a job.
+
+        Args:
+            job_id (str): The job's identifier.
+
+        Returns:
+            Job: The job, or None if it is unknown or has expired. Jobs queued
+            or run by other worker processes are read from the shared store.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self.store is not None:
+            job = self.store.load(job_id)
+        return job
+
+    def shutdown(self):
+        """Stop accepting jobs and wait for running ones to finish; queued jobs stay queued for other workers."""
+        self._stopping.set()
+        self._wakeup.set()
+        self._executor.shutdown(wait=True)
+
+job_manager = JobManager(
+    max_workers=int(os.getenv("JOB_MAX_WORKERS", 2)),
+    max_queue_depth=int(os.getenv("JOB_MAX_QUEUE_DEPTH", 20)),
+    retention=float(os.getenv("JOB_RETENTION_SECONDS", 3600)),
+    # Workers of a multi-process deployment share their queue and jobs through the storage root
+    store=JobStore(os.getenv("JOB_STORE_DIR", STORAGE_ROOT / '.jobs')) if int(os.getenv("API_WORKERS", 1)) > 1 else None
+)
@@ -0,0 +1,168 @@
+from collections import OrderedDict
+from threading import Lock
+from storage import user_dir
+from pathlib import Path
+import json
+import os
+
+class KeywordIndex:
+    """Keywords of a user's competitor rankings, indexed for direct lookup."""
+
+    def __init__(self, keywords: dict, domains: dict):
+        """Initialize the index.
+
+        Args:
+            keywords (dict): Keyword to the ranking record saved for it.
+            domains (dict): Competitor domain to the list of its unique keywords.
+        """
+        self.keywords = keywords
+        self.domains = domains
+
+    @classmethod
+    def from_rankings(cls, rankings_data: dict):
+        """Build the index from competitor rankings.
+
+        Args:
+            rankings_data (dict): Competitor domain to its SpyFu rankings response.
+
+        Returns:
+            KeywordIndex: The index. Each keyword maps to the first record found
+                for it, in competitor order.
+        """
+        keywords = {}
+        domains = {}
+        for domain, data in rankings_data.items():
+            domain_keywords = {}
+            for result in data['results']:
+                keyword = result['keyword']
+                domain_keywords[keyword] = None
+                if keyword not in keywords:
+                    keywords[keyword] = result
+            domains[domain] = list(domain_keywords)
+        return cls(keywords, domains)
+
+    def details(self, selected_keywords: list) -> dict:
+        """Return the ranking records of the selected keywords.
+
+        Args:
+            selected_keywords (list[str]): Keywords to look up.
+
+        Returns:
+            dict: Keyword to ranking record, for every selected keyword in the index.
+        """
+        return {
+            keyword: self.keywords[keyword]
+            for keyword in selected_keywords
+            if keyword in self.keywords
+        }
+
+def index_path(data_dir: Path) -> Path:
+    """Return the path of the keyword index in a user's data directory.
+
+    The index is JSON rather than pickle: user directories may be synced from
+    an object store, and loading them must never run code.
+    """
+    return data_dir / 'keyword_index.json'
+
+def save_keyword_index(index: KeywordIndex, data_dir: Path):
+    """Write a keyword index next to the rankings it was built from.
+
+    Args:
+        index (KeywordIndex): The index to save.
+        data_dir (Path): The user's data directory.
+    """
+    path = index_path(data_dir)
+    # Other worker processes may be writing the same index
+    tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'keywords': index.keywords, 'domains': index.domains}, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+def load_keyword_index(path: Path) -> KeywordIndex:
+    """Read a keyword index written by save_keyword_index.
+
+    Args:
+        path (Path): Path of the index file.
+
+    Returns:
+        KeywordIndex: The index.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return KeywordIndex(data['keywords'], data['domains'])
+
+class KeywordIndexCache:
+    """In-memory LRU cache of keyword indexes, built from the keyword store or loaded from disk."""
+
+    def __init__(self, max_size: int = 32):
+        """Initialize the cache.
+
+        Args:
+            max_size (int): Maximum number of indexes kept in memory.
+        """
+        self.max_size = max_size
+        self._indexes = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, userId: str):
+        """Return a user's keyword index, building or loading it if needed.
+
+        With the shared keyword store enabled, the index is built from the
+        user's view in the store and rebuilt when any of its domains are
+        refreshed. Otherwise it is loaded from the user's data directory and
+        reloaded when the file changes; users whose data predates the index
+        get it built from competitor_rankings.json once.
+
+        Args:
+            userId (str): Unique identifier for the user.
+
+        Returns:
+            KeywordIndex: The index, or None if the user has no rankings data.
+        """
+        from tools.spyfu_tool import get_keyword_store
+
+        store = get_keyword_store()
+        version = store.user_version(userId) if store is not None else None
+        if version is not None:
+            return self._cached(userId, version, lambda: KeywordIndex.from_rankings(store.user_rankings(userId)))
+
+        data_dir = user_dir(userId) / 'data'
+        path = index_path(data_dir)
+        if not path.exists():
+            rankings_path = data_dir / 'competitor_rankings.json'
+            if not rankings_path.exists():
+                with self._lock:
+                    self._indexes.pop(userId, None)
+                return None
+            with open(rankings_path, 'r', encoding='utf-8') as f:
+                save_keyword_index(KeywordIndex.from_rankings(json.load(f)), data_dir)
+
+        return self._cached(userId, path.stat().st_mtime_ns, lambda: load_keyword_index(path))
+
+    def _cached(self, userId: str, version, build):
+        """Return the cached index of a user if its version matches, else build and cache it.
+
+        Args:
+            userId (str): Unique identifier for the user.
+            version: Value that changes whenever the user's rankings do.
+            build (callable): Returns the user's index.
+
+        Returns:
+            KeywordIndex: The index.
+        """
+        with self._lock:
+            cached = self._indexes.get(userId)
+            if cached is not None and cached[0] == version:
+                self._indexes.move_to_end(userId)
+                return cached[1]
+
+        index = build()
+
+        with self._lock:
+            self._indexes[userId] = (version, index)
+            self._indexes.move_to_end(userId)
+            while len(self._indexes) > self.max_size:
+                self._indexes.popitem(last=False)
+        return index
+
+keyword_indexes = KeywordIndexCache(max_size=int(os.getenv("KEYWORD_INDEX_CACHE_SIZE", 32)))
@@ -0,0 +1,30 @@
+from threading import Lock
+import os
+
+# Model and API key environment variable of each LLM the crews can use
+MODELS = {
+    'openai': ("gpt-4o", "OPENAI_API_KEY"),
+    'anthropic': ("claude-3-5-sonnet-20241022", "ANTHROPIC_API_KEY"),
+    'gemini': ("gemini/gemini-2.0-flash-exp", "GEMINI_API_KEY"),
+    'deepseek': ("openrouter/deepseek/deepseek-r1", "OPENROUTER_API_KEY"),
+}
+
+_llms = {}
+_llms_lock = Lock()
+
+def get_llm(name: str):
+    """Return the shared LLM client of a model, creating it on first use.
+
+    Args:
+        name (str): One of the names in MODELS.
+
+    Returns:
+        LLM: The crewAI LLM, shared by every crew.
+    """
+    with _llms_lock:
+        if name not in _llms:
+            from crewai import LLM
+
+            model, api_key_env = MODELS[name]
+            _llms[name] = LLM(model=model, api_key=os.getenv(api_key_env))
+        return _llms[name]
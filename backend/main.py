@@ -1,60 +1,180 @@
-from tools.spyfu_tool import SpyfuTool
-from analysis_crew import AnalysisCrew
-from blog_writer import generate_blog
-from seo_crew import SeoCrew
+from concurrent.futures import ThreadPoolExecutor
+from keyword_index import KeywordIndex, save_keyword_index, keyword_indexes
+from task_graph import TaskGraph
+from seo_warmup import seo_warmups, speculative_enabled
+from storage import user_dir
+from typing import TYPE_CHECKING
 from pathlib import Path
 import warnings
 import json
 import os
 
+if TYPE_CHECKING:
+    from tools.spyfu_tool import SpyfuTool
+
 # Suppress specific warnings from the pysbd module
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
-def fetch_data_from_spyfu(domain_url: str, output_dir: Path):
+def fetch_rankings(spy_tool: 'SpyfuTool', domain: str) -> dict:
+    """Get a domain's rankings from the shared keyword store, fetching them if stale.
+
+    Args:
+        spy_tool (SpyfuTool): The SpyFu tool used for fetching.
+        domain (str): The domain to get rankings for.
+
+    Returns:
+        dict: The domain's rankings, or an error payload if the fetch failed.
+    """
+    from tools.spyfu_tool import get_keyword_store
+
+    store = get_keyword_store()
+    clean_domain = spy_tool._clean_domain(domain)
+    if store is not None:
+        rankings = store.get_rankings(clean_domain)
+        if rankings is not None:
+            return rankings
+
+    # The store decides when rankings are stale, so bypass the response cache when refreshing
+    rankings = json.loads(spy_tool._get_ppc_research(domain, use_cache=store is None))
+    if store is not None and 'error' not in rankings:
+        store.save_rankings(clean_domain, rankings)
+    return rankings
+
+
+def fetch_data_from_spyfu(domain_url: str, output_dir: Path, max_workers: int = None):
     """Fetch and save data from SpyFu.
 
+    The user's rankings and the competitor list are requested together, and the
+    per-competitor rankings are fanned out over a thread pool as soon as the
+    competitor list arrives. Rankings come from the shared keyword store, and
+    only domains missing from it or older than its refresh age are fetched.
+
     Args:
         domain_url (str): The domain URL to fetch data for.
         output_dir (Path): The directory where the output data will be saved.
+        max_workers (int, optional): Maximum number of concurrent SpyFu requests.
+            Defaults to the SPYFU_MAX_WORKERS environment variable, or 5.
     """
+    # crewAI, which the SpyFu tool builds on, and pandas are imported on first use to keep the API's startup fast
+    from tools.spyfu_tool import SpyfuTool, get_response_cache, get_keyword_store
+    from analysis_tables import write_analysis_tables
+
     try:
         spy_tool = SpyfuTool()
+        # The cache counters are process-wide, so the run reports how much they moved
+        cache = get_response_cache()
+        cache_before = cache.stats() if cache is not None else None
+        store = get_keyword_store()
+        store_before = store.stats() if store is not None else None
+        if max_workers is None:
+            max_workers = int(os.getenv("SPYFU_MAX_WORKERS", 5))
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            print("\nFetching user rankings...")
+            user_rankings_future = executor.submit(fetch_rankings, spy_tool, domain_url)
+
+            print("\nFetching competitor rankings...")
+            competitors_future = executor.submit(spy_tool._get_top_ppc_competitors, domain=domain_url)
+
+            competitors_json = json.loads(competitors_future.result())
+
+            # Save competitors data to a JSON file
+            with open(output_dir / 'data' / 'competitors.json', 'w', encoding='utf-8') as f:
+                json.dump(competitors_json, f, ensure_ascii=False, separators=(',', ':'))
+
+            rankings_futures = {}
+            for competitor in competitors_json['results']:
+                domain = competitor['domain']
+                print(f"\nFetching rankings for: {domain}")
+                rankings_futures[domain] = executor.submit(fetch_rankings, spy_tool, domain)
+
+            user_rankings_json = user_rankings_future.result()
+
+            # Collect in competitor order so the saved file is deterministic
+            rankings_data = {
+                domain: future.result()
+                for domain, future in rankings_futures.items()
+            }
 
-        print("\nFetching user rankings...")
-        user_rankings = spy_tool._get_ppc_research(domain_url)
-        user_rankings_json = json.loads(user_rankings)
+        data_dir = output_dir / 'data'
+        if store is not None:
+            # The keyword endpoints serve the user's view of the shared store, so no per-user copies are written
+            store.set_user_domains(output_dir.name, [spy_tool._clean_domain(domain) for domain in rankings_data])
+        else:
+            for name, data in (('user_rankings.json', user_rankings_json), ('competitor_rankings.json', rankings_data)):
+                with open(data_dir / name, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            # Index the keywords once so the keyword endpoints don't rescan the rankings
+            save_keyword_index(KeywordIndex.from_rankings(rankings_data), data_dir)
+        # Precompute the analysis tables so the analyst only writes the narrative
+        write_analysis_tables(rankings_data, user_rankings_json, data_dir)
+
+        if cache is not None:
+            stats = cache.stats()
+            print(f"SpyFu cache: {stats['hits'] - cache_before['hits']} hits, "
+                  f"{stats['misses'] - cache_before['misses']} misses")
+        if store is not None:
+            stats = store.stats()
+            print(f"Keyword store: {stats['served'] - store_before['served']} domains served, "
+                  f"{stats['fetched'] - store_before['fetched']} fetched, "
+                  f"{stats['keywords']} keywords across {stats['domains']} domains")
 
-        # Save user rankings to a JSON file
-        with open(output_dir / 'data' / 'user_rankings.json', 'w', encoding='utf-8') as f:
-            json.dump(user_rankings_json, f, indent=2, ensure_ascii=False)
+    except Exception as e:
+        print(f"Error fetching data from SpyFu: {str(e)}")
+        raise
 
-        print("\nFetching competitor rankings...")
-        competitors = spy_tool._get_top_ppc_competitors(domain=domain_url)
-        competitors_json = json.loads(competitors)
 
-        # Save competitors data to a JSON file
-        with open(output_dir / 'data' / 'competitors.json', 'w', encoding='utf-8') as f:
-            json.dump(competitors_json, f, indent=2, ensure_ascii=False)
+def report_token_budget(crew, on_event=None):
+    """Log the estimated tool payload tokens of a crew run.
 
-        rankings_data = {}
-        for competitor in competitors_json['results']:
-            domain = competitor['domain']
-            print(f"\nFetching rankings for: {domain}")
+    Args:
+        crew (AnalysisCrew | SeoCrew): The crew that ran.
+        on_event (callable, optional): Callback receiving the usage as a 'token_budget' event.
+    """
+    crew.token_budget.log()
+    if on_event:
+        on_event('token_budget', crew.token_budget.summary())
 
-            rankings = spy_tool._get_ppc_research(domain)
-            rankings_json = json.loads(rankings)
-            rankings_data[domain] = rankings_json
 
-        # Save competitor rankings to a JSON file
-        with open(output_dir / 'data' / 'competitor_rankings.json', 'w', encoding='utf-8') as f:
-            json.dump(rankings_data, f, indent=2, ensure_ascii=False)
+def analysis_pipeline(user_id: str, school_name: str, domain_url: str, output_dir: Path, on_event=None, bypass_cache: bool = False) -> TaskGraph:
+    """Build the steps of an analysis run.
 
-    except Exception as e:
-        print(f"Error fetching data from SpyFu: {str(e)}")
-        raise
+    The crew is set up while the SpyFu data is fetched, and runs once both
+    are done.
+
+    Args:
+        user_id (str): Unique identifier for the user.
+        school_name (str): Name of the school.
+        domain_url (str): The domain URL to analyze.
+        output_dir (Path): The directory where output data will be saved.
+        on_event (callable, optional): Callback receiving progress events.
+        bypass_cache (bool): Whether to rerun every task instead of replaying cached outputs.
+
+    Returns:
+        TaskGraph: The analysis steps.
+    """
+    from analysis_tables import compose_analysis_report
+    from analysis_crew import AnalysisCrew
+    from crew_cache import kickoff_with_cache
 
+    graph = TaskGraph('Analysis pipeline')
+    graph.add('spyfu_fetch', lambda: fetch_data_from_spyfu(domain_url, output_dir))
+    graph.add('crew_setup', lambda: AnalysisCrew({
+        'user_id': user_id,
+        'school_name': school_name,
+        'domain_url': domain_url,
+    }, on_event=on_event, bypass_cache=bypass_cache))
+    graph.add('crew', lambda: kickoff_with_cache(graph.results['crew_setup']), depends_on=['spyfu_fetch', 'crew_setup'])
 
-def run_analysis_crew(user_id: str, school_name: str, domain_url: str, output_dir: Path):
+    def report():
+        report_token_budget(graph.results['crew_setup'], on_event)
+        compose_analysis_report(output_dir)
+
+    graph.add('report', report, depends_on=['crew'])
+    return graph
+
+
+def run_analysis_crew(user_id: str, school_name: str, domain_url: str, output_dir: Path, on_event=None, bypass_cache: bool = False):
     """Run the analysis crew.
 
     Args:
@@ -62,19 +182,17 @@ def run_analysis_crew(user_id: str, school_name: str, domain_url: str, output_di
         school_name (str): Name of the school.
         domain_url (str): The domain URL to analyze.
         output_dir (Path): The directory where output data will be saved.
+        on_event (callable, optional): Callback receiving progress events.
+        bypass_cache (bool): Whether to rerun every task instead of replaying cached outputs.
     """
     try:
         print(f"Running analysis for user: {user_id}")
 
-        print("Fetching SpyFu data...")
-        fetch_data_from_spyfu(domain_url, output_dir)
-
-        crew = AnalysisCrew({
-            'user_id': user_id,
-            'school_name': school_name,
-            'domain_url': domain_url,
-        })
-        crew.crew().kickoff()
+        graph = analysis_pipeline(user_id, school_name, domain_url, output_dir, on_event, bypass_cache)
+        graph.run(on_event)
+        graph.log()
+        if on_event:
+            on_event('timings', graph.summary())
 
     except Exception as e:
         print(f"Error running analysis crew: {str(e)}")
@@ -93,26 +211,16 @@ def get_available_keywords(userId: str):
     try:
         print(f"Attempting to read keywords for user: {userId}")
 
-        file_path = f'outputs/{userId}/data/competitor_rankings.json'
-        print(f"Looking for file: {file_path}")
-
-        if not os.path.exists(file_path):
+        index = keyword_indexes.get(userId)
+        if index is None:
             return {
                 'status': 'error',
-                'message': f'Rankings file not found: {file_path}'
+                'message': f"No keyword rankings found for user: {userId}"
             }
 
-        with open(file_path, 'r', encoding='utf-8') as f:
-            rankings_data = json.load(f)
-
-        domain_keywords = {}
-        for domain, data in rankings_data.items():
-            unique_keywords = set(result['keyword'] for result in data['results'])
-            domain_keywords[domain] = list(unique_keywords)
-
         return {
             'status': 'success',
-            'keywords': domain_keywords
+            'keywords': index.domains
         }
     except Exception as e:
         print(f"Error getting keywords: {str(e)}")
@@ -130,39 +238,56 @@ def save_keyword_details(userId: str, selected_keywords: list[str]):
         selected_keywords (list[str]): List of selected keywords to get details for.
     """
     try:
-        with open(f'outputs/{userId}/data/competitor_rankings.json', 'r', encoding='utf-8') as f:
-            rankings_data = json.load(f)
+        index = keyword_indexes.get(userId)
+        if index is None:
+            raise FileNotFoundError(f"No keyword rankings found for user: {userId}")
+        keyword_details = index.details(selected_keywords)
 
-        keyword_details = {}
-        for domain in rankings_data:
-            for result in rankings_data[domain]['results']:
-                if result['keyword'] in selected_keywords:
-                    if result['keyword'] not in keyword_details:
-                        keyword_details[result['keyword']] = result
+        with open(user_dir(userId) / 'data' / 'selected_keywords_details.json', 'w', encoding='utf-8') as f:
+            json.dump(keyword_details, f, ensure_ascii=False, separators=(',', ':'))
 
-        with open(f'outputs/{userId}/data/selected_keywords_details.json', 'w', encoding='utf-8') as f:
-            json.dump(keyword_details, f, indent=2, ensure_ascii=False)
+        # Prepare the SEO crew while the user reviews the selection
+        if speculative_enabled():
+            seo_warmups.start(userId)
 
     except Exception as e:
         print(f"Error getting keyword details: {str(e)}")
 
 
-def run_seo_crew(userId: str, school_name: str, domain_url: str):
+def run_seo_crew(userId: str, school_name: str, domain_url: str, on_event=None, bypass_cache: bool = False):
     """Run the SEO crew.
 
     Args:
         userId (str): Unique identifier for the user.
         school_name (str): Name of the school.
         domain_url (str): The domain URL to analyze.
+        on_event (callable, optional): Callback receiving progress events.
+        bypass_cache (bool): Whether to rerun every task instead of replaying cached outputs.
     """
+    from crew_cache import kickoff_with_cache
+    from seo_crew import SeoCrew
+
     try:
         print(f"Running SEO crew for user: {userId}")
-        crew = SeoCrew({
+        if on_event:
+            on_event('stage', {'stage': 'crew'})
+        inputs = {
             'user_id': userId,
             'school_name': school_name,
             'domain_url': domain_url
-        })
-        crew.crew().kickoff()
+        }
+        crew = seo_warmups.take(userId)
+        if crew is None:
+            crew = SeoCrew(inputs, on_event=on_event, bypass_cache=bypass_cache)
+        else:
+            # Attach to the speculative warm-up started when the keywords were saved
+            crew.inputs = inputs
+            crew.on_event = on_event
+            crew.bypass_cache = bypass_cache
+            if on_event:
+                on_event('warmup', {'seconds': crew.warmup_seconds})
+        kickoff_with_cache(crew)
+        report_token_budget(crew, on_event)
     except Exception as e:
         print(f"Error running SEO crew: {str(e)}")
         raise
@@ -171,8 +296,8 @@ def run_seo_crew(userId: str, school_name: str, domain_url: str):
 if __name__ == "__main__":
     school_name = "Seth M.R. Jaipuria Schools"
     domain_url = "jaipuriaschools.ac.in"
-    output_dir = Path('outputs/acc34af2-5b10-4c53-91c1-d94edeaf3fed')
-    output_dir.mkdir(exist_ok=True)
+    output_dir = user_dir('acc34af2-5b10-4c53-91c1-d94edeaf3fed')
+    output_dir.mkdir(parents=True, exist_ok=True)
     (output_dir / 'data').mkdir(exist_ok=True)
     (output_dir / 'crew').mkdir(exist_ok=True)
 
@@ -222,6 +347,7 @@ if __name__ == "__main__":
 
     # # Step 6: Run blog writer crew
     # print("\nRunning blog writer")
+    # from blog_writer import generate_blog
     # blog_outline = input("Enter the blog outline: ")
     # generate_blog(blog_outline, "ef2c1a46-2511-482f-8668-935b1f219eeb")
     # print("Blog writer crew complete!")
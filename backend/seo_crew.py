@@ -1,34 +1,18 @@
-from crewai_tools import FileReadTool, SerperDevTool, WebsiteSearchTool
 from crewai.project import CrewBase, agent, crew, task
-from crewai import Agent, Crew, Task, LLM
+from crewai import Agent, Crew, Task
 from dotenv import load_dotenv
-from pathlib import Path
+from crew_events import CrewProgress
+from llms import get_llm
+from storage import user_dir, with_output_file
+from task_graph import schedule_tasks
+from tools.token_budget import BudgetedFileReadTool, token_budget_from_env
+from tools.serper_tool import CachedSerperDevTool
+from tools.site_search_tool import website_search_tool
 import os
 
 load_dotenv()
 serper_api_key = os.getenv("SERPER_API_KEY")
 
-# Initialize LLMs with respective API keys
-openai = LLM(
-    model="gpt-4o",
-    api_key=os.getenv("OPENAI_API_KEY")
-)
-
-anthropic = LLM(
-    model="claude-3-5-sonnet-20241022",
-    api_key=os.getenv("ANTHROPIC_API_KEY")
-)
-
-gemini = LLM(
-    model="gemini/gemini-2.0-flash-exp",
-    api_key=os.getenv("GEMINI_API_KEY")
-)
-
-deepseek = LLM(
-    model="openrouter/deepseek/deepseek-r1",
-    api_key=os.getenv("OPENROUTER_API_KEY")
-)
-
 @CrewBase
 class SeoCrew():
     """SEO Content Generation Crew"""
@@ -36,17 +20,24 @@ class SeoCrew():
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
-    def __init__(self, inputs: dict):
+    def __init__(self, inputs: dict, on_event=None, bypass_cache: bool = False):
         """
         Initialize the SeoCrew with user ID and inputs.
 
         Args:
             user_id (str): The ID of the user.
             inputs (dict): The input data for the crew.
+            on_event (callable, optional): Callback receiving progress events.
+            bypass_cache (bool): Whether to run every task even if its output is cached.
         """
         try:
             self.inputs = inputs
-            self.output_dir = Path('outputs') / str(self.inputs['user_id'])
+            self.on_event = on_event
+            self.bypass_cache = bypass_cache
+            self.progress = None
+            self.output_dir = user_dir(self.inputs['user_id'])
+            # Caps and measures what the file tools feed to the agents
+            self.token_budget = token_budget_from_env()
         except Exception as e:
             print(f"Error initializing SeoCrew: {e}")
             raise
@@ -62,7 +53,7 @@ class SeoCrew():
         try:
             return Agent(
                 config=self.agents_config['ad_copy_specialist'],
-                llm=openai,
+                llm=get_llm('openai'),
                 verbose=False
             )
         except Exception as e:
@@ -79,7 +70,7 @@ class SeoCrew():
         try:
             return Agent(
                 config=self.agents_config['blog_outline_strategist'],
-                llm=anthropic,
+                llm=get_llm('anthropic'),
                 verbose=False
             )
         except Exception as e:
@@ -94,31 +85,64 @@ class SeoCrew():
             Task: The task for generating ad copies.
         """
         try:
-            return Task(
-                config=self.tasks_config['generate_ad_copies'],
-                agent=self.ad_copy_specialist_agent(),
-                tools=[
-                    FileReadTool(
-                        name="Read selected keywords data",
-                        description="Read the selected_keywords.json file",
-                        file_path=self.output_dir / 'data' / 'selected_keywords_details.json',
-                        encoding='utf-8',
-                        errors='ignore'
-                    ),
-                    WebsiteSearchTool(
-                        website="https://www.jaipuriaschools.ac.in/why-jaipuria",
-                    ),
-                    WebsiteSearchTool(
-                        website="https://www.jaipuriaschools.ac.in/open-a-jaipuria-school",
-                    ),
-                    SerperDevTool(api_key=serper_api_key)
-                ],
-                output_file=str(self.output_dir / 'crew' / '2_ad_copies.md')
+            agent = self.ad_copy_specialist_agent()
+            return with_output_file(
+                Task(
+                    config=self.tasks_config['generate_ad_copies'],
+                    agent=agent,
+                    tools=[
+                        BudgetedFileReadTool(
+                            name="Read selected keywords data",
+                            description="Read the selected_keywords.json file",
+                            file_path=self.output_dir / 'data' / 'selected_keywords_details.json',
+                            task_name='generate_ad_copies',
+                            budget=self.token_budget,
+                            model=agent.llm.model
+                        ),
+                        # Served from the local site index when it has been built (see tools/site_index.py)
+                        website_search_tool("https://www.jaipuriaschools.ac.in/why-jaipuria"),
+                        website_search_tool("https://www.jaipuriaschools.ac.in/open-a-jaipuria-school"),
+                        CachedSerperDevTool(api_key=serper_api_key)
+                    ]
+                ),
+                self.output_dir / 'crew' / '2_ad_copies.md'
             )
         except Exception as e:
             print(f"Error generating ad copies task: {e}")
             raise
 
+    @task
+    def plan_blog_keywords_task(self) -> Task:
+        """Define the task for choosing the blog keywords and planning their blogs.
+
+        It only needs the selected keywords, so it runs alongside the ad copies.
+
+        Returns:
+            Task: The task for planning the blog keywords.
+        """
+        try:
+            agent = self.blog_outline_strategist_agent()
+            return with_output_file(
+                Task(
+                    config=self.tasks_config['plan_blog_keywords'],
+                    agent=agent,
+                    tools=[
+                        BudgetedFileReadTool(
+                            name="Read selected keywords data",
+                            description="Read the selected keywords details",
+                            file_path=self.output_dir / 'data' / 'selected_keywords_details.json',
+                            task_name='plan_blog_keywords',
+                            budget=self.token_budget,
+                            model=agent.llm.model
+                        )
+                    ]
+                ),
+                self.output_dir / 'crew' / '2_blog_keyword_plan.md'
+            )
+        except Exception as e:
+            print(f"Error generating blog keyword plan task: {e}")
+            raise
+
     @task
     def generate_blog_post_outlines_task(self) -> Task:
         """Define the task for generating blog post outlines.
@@ -127,27 +151,23 @@ class SeoCrew():
             Task: The task for generating blog post outlines.
         """
         try:
-            return Task(
-                config=self.tasks_config['generate_blog_post_outlines'],
-                agent=self.blog_outline_strategist_agent(),
-                tools=[
-                    FileReadTool(
-                        name="Read ad copies data",
-                        description="Read the ad copies from 2_ad_copies.md file",
-                        file_path=self.output_dir / 'crew' / '2_ad_copies.md',
-                        encoding='utf-8',
-                        errors='ignore'
-                    ),
-                    FileReadTool(
-                        name="Read selected keywords data",
-                        description="Read the selected keywords details",
-                        file_path=self.output_dir / 'data' / 'selected_keywords_details.json',
-                        encoding='utf-8',
-                        errors='ignore'
-                    )
-                ],
-                context=[self.generate_ad_copies_task()],
-                output_file=str(self.output_dir / 'crew' / '3_blog_post_outlines.md')
+            agent = self.blog_outline_strategist_agent()
+            return with_output_file(
+                Task(
+                    config=self.tasks_config['generate_blog_post_outlines'],
+                    agent=agent,
+                    tools=[
+                        BudgetedFileReadTool(
+                            name="Read ad copies data",
+                            description="Read the ad copies from 2_ad_copies.md file",
+                            file_path=self.output_dir / 'crew' / '2_ad_copies.md',
+                            task_name='generate_blog_post_outlines',
+                            budget=self.token_budget,
+                            model=agent.llm.model
+                        )
+                    ]
+                ),
+                self.output_dir / 'crew' / '3_blog_post_outlines.md'
             )
         except Exception as e:
             print(f"Error generating blog post outlines task: {e}")
@@ -161,10 +181,24 @@ class SeoCrew():
             Crew: The SEO content generation crew.
         """
         try:
+            # Independent tasks run concurrently; dependencies come from tasks.yaml
+            tasks = schedule_tasks(self.tasks, self.tasks_config)
+            if self.on_event is None:
+                return Crew(
+                    agents=self.agents,
+                    tasks=tasks,
+                    verbose=True
+                )
+
+            # Report task, tool and agent output progress to the caller
+            self.progress = CrewProgress(self.on_event, tasks)
             return Crew(
                 agents=self.agents,
-                tasks=self.tasks,
-                verbose=True
+                tasks=tasks,
+                verbose=True,
+                step_callback=self.progress.step_callback,
+                task_callback=self.progress.task_callback,
+                before_kickoff_callbacks=[self.progress.before_kickoff]
             )
         except Exception as e:
             print(f"Error creating crew: {e}")
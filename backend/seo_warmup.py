@@ -0,0 +1,104 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+import threading
+import time
+import os
+
+if TYPE_CHECKING:
+    from seo_crew import SeoCrew
+
+def speculative_enabled() -> bool:
+    """Return whether saving keywords starts warming up the SEO crew.
+
+    Enabled by setting SEO_SPECULATIVE to "true". A warm-up lives in the worker
+    process that saved the keywords, and when API_WORKERS is above 1 the SEO
+    job is usually claimed by another worker, so speculation is always
+    disabled then.
+    """
+    if int(os.getenv("API_WORKERS", 1)) > 1:
+        return False
+    return os.getenv("SEO_SPECULATIVE", "false").lower() == "true"
+
+def warm_up_seo_crew(userId: str) -> 'SeoCrew':
+    """Prepare an SEO crew before the SEO run is requested.
+
+    Builds the agents and tasks, which loads the pages of the website search
+    tools.
+
+    Args:
+        userId (str): Unique identifier for the user.
+
+    Returns:
+        SeoCrew: The prepared crew; its inputs and callbacks are set when it is taken.
+    """
+    from seo_crew import SeoCrew
+
+    start = time.perf_counter()
+    crew = SeoCrew({'user_id': userId})
+    # Task methods are memoized, so the crew built at run time reuses these tasks.
+    # crew() itself is not called here because it is memoized with the callbacks it was built with
+    crew.generate_ad_copies_task()
+    crew.plan_blog_keywords_task()
+    crew.generate_blog_post_outlines_task()
+    crew.warmup_seconds = time.perf_counter() - start
+    print(f"Warmed up SEO crew for user {userId} in {crew.warmup_seconds:.2f}s")
+    return crew
+
+class SeoWarmups:
+    """Speculative SEO crew warm-ups, at most one per user."""
+
+    def __init__(self, max_workers: int = 2, ttl: float = 900):
+        """Initialize the warm-up pool.
+
+        Args:
+            max_workers (int): Number of warm-ups run at the same time.
+            ttl (float): Seconds a warm-up stays usable after it was started.
+        """
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='seo-warmup')
+        self._warmups = {}
+        self._lock = threading.Lock()
+
+    def start(self, userId: str):
+        """Start warming up a user's SEO crew, replacing any earlier warm-up.
+
+        Args:
+            userId (str): Unique identifier for the user.
+        """
+        with self._lock:
+            cutoff = time.time() - self.ttl
+            for expired in [user for user, (_, started) in self._warmups.items() if started < cutoff]:
+                del self._warmups[expired]
+            self._warmups[userId] = (self._executor.submit(warm_up_seo_crew, userId), time.time())
+
+    def take(self, userId: str):
+        """Take a user's warmed-up SEO crew, waiting for the warm-up if it is still running.
+
+        Args:
+            userId (str): Unique identifier for the user.
+
+        Returns:
+            SeoCrew: The prepared crew, or None if there is no usable warm-up.
+        """
+        with self._lock:
+            warmup = self._warmups.pop(userId, None)
+        if warmup is None:
+            return None
+
+        future, started = warmup
+        if started < time.time() - self.ttl:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Error warming up SEO crew: {str(e)}")
+            return None
+
+    def shutdown(self):
+        """Stop accepting warm-ups and drop the running ones."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+seo_warmups = SeoWarmups(
+    max_workers=int(os.getenv("SEO_WARMUP_WORKERS", 2)),
+    ttl=float(os.getenv("SEO_WARMUP_TTL", 900))
+)
@@ -0,0 +1,271 @@
+from contextlib import contextmanager
+from threading import Lock
+from pathlib import Path
+import mimetypes
+import tempfile
+import fcntl
+import json
+import time
+import re
+import os
+
+# Absolute root of every user's outputs; API workers sharing it must see the same filesystem
+STORAGE_ROOT = Path(os.getenv("STORAGE_ROOT", Path(__file__).resolve().parent / 'outputs')).resolve()
+LOCKS_DIR = STORAGE_ROOT / '.locks'
+USER_ID_PATTERN = re.compile(r'^[\w-]+$')
+
+_storage = None
+_storage_lock = Lock()
+
+def user_dir(userId) -> Path:
+    """Return the directory holding a user's outputs.
+
+    Args:
+        userId (str): Unique identifier for the user.
+
+    Returns:
+        Path: The absolute path of the user's directory under STORAGE_ROOT.
+
+    Raises:
+        ValueError: If the user ID could escape the storage root.
+    """
+    userId = str(userId)
+    if not USER_ID_PATTERN.match(userId):
+        raise ValueError(f"Invalid user ID: {userId}")
+    return STORAGE_ROOT / userId
+
+@contextmanager
+def user_lock(userId, timeout: float = None):
+    """Hold a user's exclusive lock while writing their outputs.
+
+    The lock is a file lock, so it is shared by the threads of a worker and by
+    every worker process using the same STORAGE_ROOT. It is not reentrant.
+    Lock files live outside the user directory so deleting the user's data
+    does not release the lock, and they are never removed.
+
+    Args:
+        userId (str): Unique identifier for the user.
+        timeout (float, optional): Maximum number of seconds to wait for the
+            lock; waits as long as needed if not given.
+
+    Raises:
+        TimeoutError: If the lock is still held by someone else after the timeout.
+    """
+    LOCKS_DIR.mkdir(parents=True, exist_ok=True)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with open(LOCKS_DIR / f'{user_dir(userId).name}.lock', 'a') as f:
+        while True:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX if deadline is None else fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Outputs of user {userId} are in use by another job")
+                time.sleep(0.1)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def with_output_file(task, path):
+    """Set the file a crew task saves its output to.
+
+    crewAI strips the leading slash of an output_file passed to Task, which
+    would make paths under STORAGE_ROOT relative to the working directory,
+    so the absolute path is assigned once the task has been created.
+
+    Args:
+        task (Task): The crew task.
+        path (Path): Absolute path of the output file.
+
+    Returns:
+        Task: The task.
+    """
+    task.output_file = str(path)
+    return task
+
+class LocalStorage:
+    """Keeps user outputs on this node's disk, under STORAGE_ROOT.
+
+    The user directories are the stored copy, so there is nothing to sync,
+    and downloads are streamed by the API itself.
+    """
+
+    def sync_down(self, userId, subdirs: tuple = None):
+        """Nothing to fetch: the user directory is the stored copy."""
+
+    def sync_up(self, userId, subdirs: tuple = None):
+        """Nothing to upload: the user directory is the stored copy."""
+
+    def download_url(self, userId, relative_path: str, filename: str):
+        """Local files have no URL of their own; the API serves them."""
+        return None
+
+    def delete_user(self, userId):
+        """Nothing to delete beyond the user directory."""
+
+class S3Storage:
+    """Keeps user outputs in an S3-compatible bucket, so any node can serve them.
+
+    Each node works on a copy of a user's directory under STORAGE_ROOT:
+    sync_down fetches the objects that changed in the bucket since this node
+    last synced them, and sync_up uploads the local files that changed since
+    then. Files are streamed both ways, and downloads are served from the
+    bucket through presigned URLs.
+    """
+
+    # Records the ETag, size and mtime of every synced file of a user on this node
+    MANIFEST = '.storage_manifest.json'
+
+    def __init__(self, client, prefix: str = '', presign_expires: int = 900):
+        """Initialize the backend.
+
+        Args:
+            client (S3Client): Client for the bucket.
+            prefix (str): Key prefix of all user directories in the bucket.
+            presign_expires (int): Seconds a download URL stays valid.
+        """
+        self.client = client
+        self.prefix = prefix
+        self.presign_expires = presign_expires
+        self._manifest_locks = {}
+        self._manifest_locks_lock = Lock()
+
+    def _key(self, userId, relative_path: str = '') -> str:
+        """Return the key of a file in a user directory."""
+        return f'{self.prefix}{user_dir(userId).name}/{relative_path}'
+
+    @contextmanager
+    def _manifest(self, userId):
+        """Hold a user's manifest for update and save it afterwards.
+
+        Syncs of the same user in other worker processes are not excluded;
+        at worst they transfer a file twice.
+        """
+        with self._manifest_locks_lock:
+            lock = self._manifest_locks.setdefault(str(userId), Lock())
+        path = user_dir(userId) / self.MANIFEST
+        with lock:
+            manifest = json.loads(path.read_text(encoding='utf-8')) if path.exists() else {}
+            try:
+                yield manifest
+            finally:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.', suffix='.tmp')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(manifest, f)
+                os.replace(tmp_path, path)
+
+    @staticmethod
+    def _synced(path: Path, etag: str) -> dict:
+        """Return the manifest entry of a file just synced."""
+        stat = path.stat()
+        return {'etag': etag, 'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+
+    def sync_down(self, userId, subdirs: tuple = None):
+        """Fetch the user's files that changed in the bucket since this node last synced them.
+
+        Args:
+            userId (str): Unique identifier for the user.
+            subdirs (tuple, optional): Only fetch files in these subdirectories, e.g. ('crew',).
+        """
+        outputs_dir = user_dir(userId)
+        user_prefix = self._key(userId)
+        with self._manifest(userId) as manifest:
+            for key, etag in self.client.list_objects(user_prefix).items():
+                relative_path = key[len(user_prefix):]
+                if subdirs and relative_path.split('/', 1)[0] not in subdirs:
+                    continue
+                path = outputs_dir / relative_path
+                entry = manifest.get(relative_path)
+                if entry and entry['etag'] == etag and path.exists():
+                    continue
+                path.parent.mkdir(parents=True, exist_ok=True)
+                manifest[relative_path] = self._synced(path, self.client.download_file(key, path))
+
+    def sync_up(self, userId, subdirs: tuple = None):
+        """Upload the user's files that changed on this node since they were last synced.
+
+        Files and directories whose names start with a dot are temporary or
+        local to the node and are not uploaded.
+
+        Args:
+            userId (str): Unique identifier for the user.
+            subdirs (tuple, optional): Only upload files in these subdirectories.
+        """
+        outputs_dir = user_dir(userId)
+        if not outputs_dir.exists():
+            return
+        with self._manifest(userId) as manifest:
+            for path in sorted(outputs_dir.rglob('*')):
+                parts = path.relative_to(outputs_dir).parts
+                if not path.is_file() or any(part.startswith('.') for part in parts):
+                    continue
+                if subdirs and parts[0] not in subdirs:
+                    continue
+                relative_path = '/'.join(parts)
+                stat = path.stat()
+                entry = manifest.get(relative_path)
+                if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+                    continue
+                with open(path, 'rb') as f:
+                    etag = self.client.put_object(
+                        self._key(userId, relative_path), f, stat.st_size,
+                        content_type=mimetypes.guess_type(path.name)[0]
+                    )
+                manifest[relative_path] = {'etag': etag, 'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+
+    def download_url(self, userId, relative_path: str, filename: str) -> str:
+        """Return a presigned URL to download a user's file from the bucket.
+
+        Args:
+            userId (str): Unique identifier for the user.
+            relative_path (str): Path of the file in the user directory.
+            filename (str): File name the browser saves the download as.
+
+        Returns:
+            str: The presigned URL.
+        """
+        return self.client.presigned_url(self._key(userId, relative_path), self.presign_expires, filename)
+
+    def delete_user(self, userId):
+        """Delete all of a user's files from the bucket.
+
+        Args:
+            userId (str): Unique identifier for the user.
+        """
+        for key in self.client.list_objects(self._key(userId)):
+            self.client.delete_object(key)
+
+def get_storage():
+    """Return the storage backend chosen by STORAGE_BACKEND, 'local' (the default) or 's3'.
+
+    The S3 backend is configured by S3_BUCKET, S3_ENDPOINT_URL, S3_REGION,
+    S3_ACCESS_KEY_ID and S3_SECRET_ACCESS_KEY (or the AWS_ equivalents),
+    and optionally S3_PUBLIC_ENDPOINT_URL, S3_PREFIX and S3_PRESIGN_EXPIRES.
+
+    Returns:
+        LocalStorage | S3Storage: The shared backend, created on first use.
+    """
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            if os.getenv("STORAGE_BACKEND", "local").lower() == "s3":
+                from tools.s3_client import S3Client
+
+                region = os.getenv("S3_REGION", os.getenv("AWS_REGION", "us-east-1"))
+                _storage = S3Storage(
+                    S3Client(
+                        os.getenv("S3_ENDPOINT_URL", f"https://s3.{region}.amazonaws.com"),
+                        os.environ["S3_BUCKET"],
+                        os.getenv("S3_ACCESS_KEY_ID", os.getenv("AWS_ACCESS_KEY_ID")),
+                        os.getenv("S3_SECRET_ACCESS_KEY", os.getenv("AWS_SECRET_ACCESS_KEY")),
+                        region=region,
+                        public_endpoint_url=os.getenv("S3_PUBLIC_ENDPOINT_URL")
+                    ),
+                    prefix=os.getenv("S3_PREFIX", ""),
+                    presign_expires=int(os.getenv("S3_PRESIGN_EXPIRES", 900))
+                )
+            else:
+                _storage = LocalStorage()
+        return _storage
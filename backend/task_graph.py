@@ -0,0 +1,224 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import threading
+import time
+import os
+
+def parallel_enabled() -> bool:
+    """Return whether independent steps and crew tasks may run concurrently.
+
+    Disabled by setting PIPELINE_PARALLEL to "false", which runs everything
+    one at a time in dependency order.
+    """
+    return os.getenv("PIPELINE_PARALLEL", "true").lower() != "false"
+
+class TaskGraph:
+    """Runs named steps as soon as the steps they depend on have finished.
+
+    Each step's start and end are recorded, so a run can report its wall time,
+    the sum of its step times (the time of running them one after another)
+    and its critical path.
+    """
+
+    def __init__(self, name: str, max_workers: int = None):
+        """Initialize an empty graph.
+
+        Args:
+            name (str): Name of the graph, used in its timing log.
+            max_workers (int, optional): Maximum number of steps running at once.
+                Defaults to 4, or 1 if PIPELINE_PARALLEL is "false".
+        """
+        self.name = name
+        self.max_workers = max_workers or (4 if parallel_enabled() else 1)
+        self.steps = {}
+        self.results = {}
+        self.timings = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, fn, depends_on: list = ()):
+        """Add a step, replacing any step of the same name.
+
+        Args:
+            name (str): Name of the step.
+            fn (callable): Function called without arguments; its return value
+                is stored in results under the step's name.
+            depends_on (list): Names of the steps that must finish first.
+        """
+        self.steps[name] = (fn, list(depends_on))
+
+    def _order(self) -> list:
+        """Return the step names in dependency order, keeping insertion order where free.
+
+        Raises:
+            ValueError: If a dependency is unknown or the steps form a cycle.
+        """
+        order = []
+        visiting = set()
+
+        def visit(name):
+            if name in order:
+                return
+            if name not in self.steps:
+                raise ValueError(f"Unknown step in {self.name}: {name}")
+            if name in visiting:
+                raise ValueError(f"Dependency cycle in {self.name} at step: {name}")
+            visiting.add(name)
+            for dependency in self.steps[name][1]:
+                visit(dependency)
+            visiting.discard(name)
+            order.append(name)
+
+        for name in self.steps:
+            visit(name)
+        return order
+
+    def _run_step(self, name: str, on_event=None):
+        """Run one step and record its result and timing."""
+        if on_event:
+            on_event('stage', {'stage': name})
+        start = time.perf_counter()
+        try:
+            result = self.steps[name][0]()
+        finally:
+            with self._lock:
+                self.timings[name] = (start, time.perf_counter())
+        with self._lock:
+            self.results[name] = result
+        return result
+
+    def run(self, on_event=None) -> dict:
+        """Run every step, starting each one once its dependencies have finished.
+
+        Args:
+            on_event (callable, optional): Callback receiving a 'stage' event as
+                each step starts.
+
+        Returns:
+            dict: Step name to the step's return value.
+
+        Raises:
+            Exception: The first exception raised by a step; steps that have not
+                started yet are not run.
+        """
+        order = self._order()
+        self.results = {}
+        self.timings = {}
+        self._started = time.perf_counter()
+        done = set()
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while len(done) < len(order):
+                for name in order:
+                    if len(running) >= self.max_workers:
+                        break
+                    if name in done or name in running.values():
+                        continue
+                    if all(dependency in done for dependency in self.steps[name][1]):
+                        running[executor.submit(self._run_step, name, on_event)] = name
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    future.result()
+                    done.add(name)
+
+        self._finished = time.perf_counter()
+        return self.results
+
+    def critical_path(self) -> tuple:
+        """Return the longest chain of dependent steps, weighted by their measured durations.
+
+        This is the shortest wall time any schedule of the last run's steps
+        could reach, however many run concurrently.
+
+        Returns:
+            tuple: The step names in execution order, and their total duration in seconds.
+        """
+        chains = {}
+        for name in self._order():
+            if name not in self.timings:
+                continue
+            start, end = self.timings[name]
+            before = max((chains[dependency] for dependency in self.steps[name][1] if dependency in chains),
+                         key=lambda chain: chain[1], default=([], 0.0))
+            chains[name] = (before[0] + [name], before[1] + end - start)
+        return max(chains.values(), key=lambda chain: chain[1], default=([], 0.0))
+
+    def summary(self) -> dict:
+        """Return the timings of the last run.
+
+        Returns:
+            dict: Wall time, sum of step times, critical path and its time, and
+                per step start offset and duration, all in seconds.
+        """
+        path, path_seconds = self.critical_path()
+        return {
+            'wall': self._finished - self._started,
+            'sequential': sum(end - start for start, end in self.timings.values()),
+            'critical_path': path,
+            'critical_path_seconds': path_seconds,
+            'steps': {
+                name: {'start': start - self._started, 'duration': end - start}
+                for name, (start, end) in self.timings.items()
+            }
+        }
+
+    def log(self):
+        """Print the timings of the last run."""
+        summary = self.summary()
+        print(f"{self.name}: {summary['wall']:.2f}s wall, {summary['sequential']:.2f}s of steps, "
+              f"critical path {' -> '.join(summary['critical_path'])} {summary['critical_path_seconds']:.2f}s")
+        for name, step in summary['steps'].items():
+            print(f"  {name}: started at {step['start']:.2f}s, took {step['duration']:.2f}s")
+
+def schedule_tasks(tasks: list, tasks_config: dict) -> list:
+    """Order crew tasks by their dependencies and run independent ones concurrently.
+
+    A task's dependencies are the tasks named in the depends_on list of its
+    entry in tasks.yaml, whose key is the task's name without the _task
+    suffix; they become the task's context. Tasks are then grouped into
+    levels, a task's level being one more than the highest level of its
+    dependencies, and run level by level. crewAI starts asynchronous tasks
+    without waiting and makes each synchronous task wait for all of them
+    first, so the tasks of a level are asynchronous except the first task of
+    every later level, which is the barrier that waits for the level before.
+    A crew may end with at most one asynchronous task, so the last task is
+    synchronous whenever the one before it is asynchronous too.
+
+    Args:
+        tasks (list): The crew's tasks in definition order.
+        tasks_config (dict): The crew's task configuration.
+
+    Returns:
+        list: The tasks in execution order. If PIPELINE_PARALLEL is "false"
+            they are only reordered.
+
+    Raises:
+        ValueError: If a task depends on a task that is not part of the crew.
+    """
+    by_name = {task.name.removesuffix('_task'): task for task in tasks}
+    for name, task in by_name.items():
+        depends_on = tasks_config.get(name, {}).get('depends_on')
+        if depends_on:
+            missing = [dependency for dependency in depends_on if dependency not in by_name]
+            if missing:
+                raise ValueError(f"Task {name} depends on tasks outside its crew: {', '.join(missing)}")
+            task.context = [by_name[dependency] for dependency in depends_on]
+
+    levels = {}
+
+    def level(task):
+        if id(task) not in levels:
+            context = task.context if isinstance(task.context, list) else []
+            levels[id(task)] = 1 + max((level(dependency) for dependency in context), default=-1)
+        return levels[id(task)]
+
+    ordered = sorted(tasks, key=level)
+    if parallel_enabled():
+        for task in ordered:
+            same_level = [other for other in ordered if level(other) == level(task)]
+            is_barrier = level(task) > 0 and same_level[0] is task
+            task.async_execution = len(same_level) > 1 and not is_barrier
+        if len(ordered) > 1 and ordered[-2].async_execution:
+            ordered[-1].async_execution = False
+    return ordered
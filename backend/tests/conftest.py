@@ -0,0 +1,8 @@
+from pathlib import Path
+import sys
+import os
+
+# The backend modules are imported as top-level modules, as when the API runs from this directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("CREWAI_TELEMETRY_OPT_OUT", "true")
@@ -0,0 +1,109 @@
+from analysis_tables import (
+    USER_DOMAIN,
+    build_analysis_tables,
+    compose_analysis_report,
+    keyword_gaps,
+    keyword_overlap,
+    metric_rankings,
+    rankings_frame,
+    summary_statistics,
+    write_analysis_tables
+)
+
+
+def rankings(*rows):
+    return {'resultCount': len(rows), 'results': [
+        {
+            'keyword': keyword,
+            'searchVolume': volume,
+            'rankingDifficulty': difficulty,
+            'totalMonthlyClicks': 10,
+            'exactCostPerClick': cpc,
+            'paidCompetitors': 1
+        }
+        for keyword, volume, difficulty, cpc in rows
+    ]}
+
+
+COMPETITORS = {
+    'a.com': rankings(('cbse school', 1000, 9, 2.0), ('school franchise', 500, 0, 8.0), ('day school', 300, 2, 1.0)),
+    'b.com': rankings(('cbse school', 1000, 9, 2.0), ('school franchise', 500, 0, 8.0), ('boarding school', 2000, 99, 3.0)),
+    'failed.com': {'error': 'SpyFu request failed'}
+}
+USER = rankings(('cbse school', 1000, 9, 2.0), ('preschool', 100, 1, 0.5))
+
+
+def frames(competitors=COMPETITORS, user=USER):
+    return rankings_frame(competitors), rankings_frame({USER_DOMAIN: user})
+
+
+def test_rankings_frame_skips_failed_domains():
+    competitors, user = frames()
+
+    assert list(competitors['domain'].unique()) == ['a.com', 'b.com']
+    assert len(competitors) == 6
+    assert rankings_frame({}).empty
+    assert rankings_frame({'a.com': {'results': [{'keyword': ''}]}}).empty
+
+
+def test_summary_statistics():
+    summary = summary_statistics(*frames()).set_index('Domain')
+
+    assert list(summary.index) == [USER_DOMAIN, 'a.com', 'b.com']
+    assert summary.loc['a.com', 'Keywords'] == 3
+    assert summary.loc['b.com', 'Total Search Volume'] == 3500
+    assert summary.loc[USER_DOMAIN, 'Highest Cost Per Click'] == 2.0
+
+
+def test_keyword_gaps():
+    gaps = keyword_gaps(*frames())
+
+    # Keywords the user ranks for are not gaps; easy, large keywords come first
+    assert list(gaps['Keyword']) == ['school franchise', 'day school', 'boarding school']
+    assert list(gaps['Competitors Ranking']) == [2, 1, 1]
+    assert list(keyword_gaps(*frames(), limit=1)['Keyword']) == ['school franchise']
+
+
+def test_metric_rankings():
+    ranked = metric_rankings(*frames(), limit=3)
+
+    by_volume = ranked['Top Keywords by Search Volume']
+    assert list(by_volume['Keyword']) == ['boarding school', 'cbse school', 'school franchise']
+    assert list(by_volume['You Rank']) == ['No', 'Yes', 'No']
+    assert list(ranked['Top Keywords by Cost Per Click']['Keyword']) == ['school franchise', 'boarding school', 'cbse school']
+
+
+def test_keyword_overlap():
+    overlap = keyword_overlap(*frames()).set_index('Domain')
+
+    assert list(overlap.columns) == [USER_DOMAIN, 'a.com', 'b.com']
+    assert overlap.loc['a.com', 'a.com'] == 3
+    assert overlap.loc['a.com', 'b.com'] == 2
+    assert overlap.loc[USER_DOMAIN, 'b.com'] == 1
+    assert list(keyword_overlap(*frames({}, {})).columns) == ['Domain']
+
+
+def test_tables_without_user_data():
+    tables = build_analysis_tables({'failed.com': {'error': 'SpyFu request failed'}}, {})
+
+    assert 'No keyword data is available for your domain.' in tables['report']
+    assert 'failed.com' not in tables['briefing']
+    assert '## Keyword Overlap' in tables['briefing']
+
+
+def test_report_composed_from_tables_and_narrative(tmp_path):
+    (tmp_path / 'data').mkdir()
+    (tmp_path / 'crew').mkdir()
+    write_analysis_tables(COMPETITORS, USER, tmp_path / 'data')
+    (tmp_path / 'crew' / '1_analysis_narrative.md').write_text('## 3. Insights\n\nRank for more.\n\n', encoding='utf-8')
+
+    compose_analysis_report(tmp_path)
+
+    report = (tmp_path / 'crew' / '1_analysis.md').read_text(encoding='utf-8')
+    briefing = (tmp_path / 'data' / 'analysis_tables.md').read_text(encoding='utf-8')
+    assert report.startswith('# SEO Keyword Performance Analysis\n\n## 1. Competitor Keyword Analysis')
+    assert report.endswith('## 3. Insights\n\nRank for more.\n')
+    assert report.index('### b.com') < report.index('## 2. User Keyword Analysis') < report.index('## 3. Insights')
+    # Only the keyword tables go into the report; the rest is for the analyst
+    assert '## Keyword Gaps' not in report
+    assert '## Keyword Gaps' in briefing
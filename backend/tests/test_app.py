@@ -0,0 +1,91 @@
+import os
+
+import pytest
+
+os.environ.setdefault("ALLOWED_ORIGINS", "http://localhost:3000")
+
+from fastapi.testclient import TestClient
+
+import app as api
+from seo_warmup import speculative_enabled
+
+client = TestClient(api.app)
+
+
+@pytest.mark.parametrize('method, path', [
+    ('get', '/keywords?userId=..'),
+    ('get', '/download/bad%20id/analysis.docx'),
+    ('post', '/keywords/save/bad%20id'),
+    ('post', '/jobs/seo/bad%20id'),
+    ('delete', '/cleanup/bad%20id'),
+])
+def test_invalid_user_id_rejected(method, path):
+    body = {'keywords': [], 'institution_name': 'School', 'domain_url': 'school.example.in'}
+    response = client.request(method, path, json=body if method == 'post' else None)
+
+    assert response.status_code == 400
+    assert 'Invalid user ID' in response.json()['detail']
+
+
+def test_speculation_disabled_with_several_workers(monkeypatch):
+    monkeypatch.setenv('SEO_SPECULATIVE', 'true')
+    assert speculative_enabled()
+
+    monkeypatch.setenv('API_WORKERS', '4')
+    assert not speculative_enabled()
+
+
+OUTLINES = """Here are the 2 outlines:
+---
+# Blog Outline
+## Content outline:
+- First title
+---
+# Blog Outline
+## Content outline:
+- Second title
+---
+"""
+
+
+def test_split_outlines_keeps_only_outlines():
+    outlines = api.split_outlines(OUTLINES)
+
+    assert len(outlines) == 2
+    assert outlines[0].endswith('- First title')
+    assert outlines[1].endswith('- Second title')
+    assert api.split_outlines('Here are the outlines:\n---\n') == []
+
+
+def test_batch_writes_a_blog_per_outline(monkeypatch, tmp_path):
+    monkeypatch.setattr('storage.STORAGE_ROOT', tmp_path)
+    user_id = 'user-1'
+    crew_dir = tmp_path / user_id / 'crew'
+    crew_dir.mkdir(parents=True)
+    (crew_dir / '3_blog_post_outlines.md').write_text(OUTLINES, encoding='utf-8')
+
+    def fake_generate_blog(outline, user_id, filename='blog_post.md', cancelled=None):
+        return {'status': 'success', 'content': outline.splitlines()[-1]}
+
+    monkeypatch.setattr(api, 'generate_blog', fake_generate_blog)
+
+    response = client.post(f'/generate-blog/{user_id}/batch')
+
+    assert response.status_code == 200
+    events = [line.split(': ', 1)[1] for line in response.text.splitlines() if line.startswith('event: ')]
+    assert events == ['started', 'outline', 'outline', 'done']
+    assert '"total": 2, "succeeded": 2' in response.text
+    assert '"markdown": "- First title"' in response.text
+    assert '"markdown": "- Second title"' in response.text
+
+
+def test_batch_without_outlines(monkeypatch, tmp_path):
+    monkeypatch.setattr('storage.STORAGE_ROOT', tmp_path)
+
+    assert client.post('/generate-blog/user-1/batch').status_code == 404
+
+    crew_dir = tmp_path / 'user-1' / 'crew'
+    crew_dir.mkdir(parents=True)
+    (crew_dir / '3_blog_post_outlines.md').write_text('Here are the outlines:\n---\n', encoding='utf-8')
+
+    assert client.post('/generate-blog/user-1/batch').status_code == 400
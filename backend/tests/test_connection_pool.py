@@ -0,0 +1,90 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+import io
+
+import pytest
+
+from tools.connection_pool import HTTPSConnectionPool, STALE_CONNECTION_ERRORS
+
+
+class DroppingHandler(BaseHTTPRequestHandler):
+    """Answers one request per connection and then closes it without saying so, like a server's keep-alive timeout."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.server.connections.add(self.client_address)
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.close_connection = True
+
+    do_GET = do_POST
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), DroppingHandler)
+    server.connections = set()
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_pool(server, **kwargs):
+    return HTTPSConnectionPool('127.0.0.1', server.server_port, secure=False, **kwargs)
+
+
+def test_retries_stale_connection_once(server):
+    pool = make_pool(server)
+    assert pool.request('POST', '/', headers={'Content-Length': '5'}, body=b'first') == (200, b'first')
+    assert len(pool._idle) == 1
+    # The idle connection was closed by the server; the retry opens a new one
+    assert pool.request('POST', '/', headers={'Content-Length': '6'}, body=b'second') == (200, b'second')
+    assert len(server.connections) == 2
+
+
+def test_rewinds_file_body_on_retry(server):
+    pool = make_pool(server)
+    pool.request('POST', '/', headers={'Content-Length': '5'}, body=b'first')
+
+    body = io.BytesIO(b'streamed body')
+    status, data = pool.request('POST', '/', headers={'Content-Length': str(len(body.getvalue()))}, body=body)
+    assert (status, data) == (200, b'streamed body')
+
+
+def test_stream_reuses_connection_only_when_read(server):
+    pool = make_pool(server)
+    with pool.stream('POST', '/', headers={'Content-Length': '5'}, body=b'block') as res:
+        assert res.read(2) == b'bl'
+    # A partly read response leaves its connection unusable, so it is not pooled
+    assert not pool._idle
+
+    with pool.stream('POST', '/', headers={'Content-Length': '5'}, body=b'block') as res:
+        assert res.read() == b'block'
+    assert len(pool._idle) == 1
+
+
+def test_fresh_connection_errors_are_not_retried():
+    # Accepts connections and closes them without answering
+    class Silent(BaseHTTPRequestHandler):
+        def handle(self):
+            self.request.close()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Silent)
+    Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        pool = HTTPSConnectionPool('127.0.0.1', server.server_port, secure=False)
+        with pytest.raises(STALE_CONNECTION_ERRORS):
+            pool.request('GET', '/')
+        # The failed request gave its slot back
+        assert pool._slots.acquire(blocking=False)
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,109 @@
+from types import SimpleNamespace
+
+import pytest
+
+import crew_cache
+from crew_cache import CrewTaskCache, kickoff_with_cache
+from crew_events import CrewProgress
+from tools.response_cache import ResponseCache
+
+INPUTS = {'user_id': 'u1', 'school_name': 'Jaipuria School', 'domain_url': 'jaipuria.example.in'}
+
+
+def make_task(name, tmp_path, reads=None, context=None):
+    agent = SimpleNamespace(role='Analyst', goal='Analyse', backstory='Years of SEO', llm=SimpleNamespace(model='gpt-4o'))
+    tools = [SimpleNamespace(name=f'Read {path.name}', file_path=path) for path in reads or []]
+    return SimpleNamespace(
+        name=name, description=f'Do {name}', expected_output='A report', agent=agent, tools=tools,
+        context=context, output_file=str(tmp_path / f'{name}.md'), output=None
+    )
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(tmp_path / 'cache', ttl=60, max_bytes=1024 * 1024)
+
+
+@pytest.fixture
+def tasks(tmp_path):
+    data = tmp_path / 'tables.md'
+    data.write_text('tables', encoding='utf-8')
+    first = make_task('analysis', tmp_path, reads=[data])
+    second = make_task('ad_copies', tmp_path, reads=[tmp_path / 'analysis.md'])
+    third = make_task('outlines', tmp_path, context=[second])
+    return [first, second, third]
+
+
+def run(cache, tasks, inputs=INPUTS):
+    """Replay what is cached, pretend to run the rest and store their outputs."""
+    task_cache = CrewTaskCache(cache)
+    pending = task_cache.replay(tasks, inputs)
+    for task in pending:
+        task.output = SimpleNamespace(raw=f'output of {task.name}')
+    task_cache.store(pending)
+    return [task.name for task in pending]
+
+
+def test_unchanged_tasks_replayed(cache, tasks, tmp_path):
+    assert run(cache, tasks) == ['analysis', 'ad_copies', 'outlines']
+    assert run(cache, tasks) == []
+    assert (tmp_path / 'outlines.md').read_text(encoding='utf-8') == 'output of outlines'
+
+
+def test_user_id_not_part_of_key(cache, tasks):
+    run(cache, tasks)
+    assert run(cache, tasks, {**INPUTS, 'user_id': 'u2'}) == []
+
+
+def test_changed_input_file_invalidates_downstream(cache, tasks, tmp_path):
+    run(cache, tasks)
+    (tmp_path / 'tables.md').write_text('new tables', encoding='utf-8')
+    assert run(cache, tasks) == ['analysis', 'ad_copies', 'outlines']
+
+
+def test_changed_task_invalidates_itself_and_later_tasks(cache, tasks):
+    run(cache, tasks)
+    tasks[1].description = 'Do ad copies differently'
+    assert run(cache, tasks) == ['ad_copies', 'outlines']
+
+
+def test_changed_crew_input_or_model_invalidates(cache, tasks):
+    run(cache, tasks)
+    assert run(cache, tasks, {**INPUTS, 'school_name': 'Another School'}) == ['analysis', 'ad_copies', 'outlines']
+    tasks[2].agent = SimpleNamespace(**{**vars(tasks[2].agent), 'llm': SimpleNamespace(model='claude-3-5-sonnet-20241022')})
+    assert run(cache, tasks) == ['outlines']
+
+
+def test_bypass_reruns_everything(cache, tasks):
+    run(cache, tasks)
+    assert CrewTaskCache(cache, bypass=True).replay(tasks, INPUTS) == tasks
+
+
+def test_partial_replay_keeps_progress_indices(cache, tasks, monkeypatch):
+    monkeypatch.setattr(crew_cache, 'get_task_output_cache', lambda: cache)
+    run(cache, tasks[:1])
+    events = []
+
+    def on_event(event, data):
+        events.append((event, data.get('task'), data.get('index'), data.get('total')))
+
+    progress = CrewProgress(on_event, tasks)
+
+    def kickoff():
+        progress.before_kickoff(INPUTS)
+        for task in crew.tasks:
+            task.output = SimpleNamespace(name=task.name, raw=f'output of {task.name}')
+            progress.task_callback(task.output)
+
+    crew = SimpleNamespace(tasks=list(tasks), kickoff=kickoff)
+    crew_base = SimpleNamespace(crew=lambda: crew, inputs=INPUTS, on_event=on_event, bypass_cache=False, progress=progress)
+    kickoff_with_cache(crew_base)
+
+    assert events == [
+        ('task_cached', 'analysis', 0, None),
+        ('crew_started', None, None, None),
+        ('task_started', 'ad_copies', 1, 3),
+        ('task_finished', 'ad_copies', 1, None),
+        ('task_started', 'outlines', 2, 3),
+        ('task_finished', 'outlines', 2, None),
+    ]
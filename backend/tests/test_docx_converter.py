@@ -0,0 +1,42 @@
+from docx import Document
+
+from docx_converter import convert_markdown_text
+
+
+def list_numbering(path):
+    """Return each paragraph's text and numbering ID, for the numbered list items."""
+    return [
+        (paragraph.text, paragraph._p.pPr.numPr.numId.val)
+        for paragraph in Document(str(path)).paragraphs
+        if paragraph.style.name.startswith('List Number')
+    ]
+
+
+def test_each_numbered_list_restarts(tmp_path):
+    path = tmp_path / 'out.docx'
+    convert_markdown_text("1. one\n2. two\n\nBetween the lists\n\n1. again\n2. again too\n", path)
+
+    numbering = list_numbering(path)
+    assert numbering[0][1] == numbering[1][1]
+    assert numbering[2][1] == numbering[3][1]
+    assert numbering[0][1] != numbering[2][1]
+
+
+def test_blank_lines_and_nested_items_continue_a_list(tmp_path):
+    path = tmp_path / 'out.docx'
+    convert_markdown_text("1. one\n\n2. two\n   1. sub\n   - bullet\n3. three\n   1. other sub\n", path)
+
+    numbering = dict(list_numbering(path))
+    assert numbering['one'] == numbering['two'] == numbering['three']
+    # Each nested list starts again at 1
+    assert numbering['sub'] != numbering['other sub']
+
+
+def test_converts_headings_tables_and_inline_markup(tmp_path):
+    path = tmp_path / 'out.docx'
+    convert_markdown_text("# Title\n\nSome **bold** text\n\n| A | B |\n|---|---|\n| 1 | 2 |\n", path)
+
+    document = Document(str(path))
+    assert [paragraph.style.name for paragraph in document.paragraphs] == ['Heading 1', 'Normal']
+    assert [run.bold for run in document.paragraphs[1].runs] == [None, True, None]
+    assert [[cell.text for cell in row.cells] for row in document.tables[0].rows] == [['A', 'B'], ['1', '2']]
@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+import docx_store
+
+
+@pytest.fixture
+def renders(tmp_path, monkeypatch):
+    """Record conversions instead of running them in the conversion pool."""
+    monkeypatch.setattr('storage.STORAGE_ROOT', tmp_path)
+    calls = []
+
+    def convert(source, output_path, markdown=None):
+        calls.append(source)
+        output_path.write_bytes(b'PK docx')
+
+    monkeypatch.setattr(docx_store.conversion_service, 'convert', convert)
+    return calls
+
+
+def write_source(tmp_path, content: bytes):
+    source = tmp_path / 'u1' / 'crew' / '1_analysis.md'
+    source.parent.mkdir(parents=True, exist_ok=True)
+    source.write_bytes(content)
+    return source
+
+
+def test_renders_once_until_source_changes(tmp_path, renders):
+    source = write_source(tmp_path, b'# Analysis\n')
+
+    path = docx_store.get_docx('u1', 'analysis.docx')
+    assert path == tmp_path / 'u1' / 'doc' / 'analysis.docx'
+    assert docx_store.get_docx('u1', 'analysis.docx') == path
+    assert len(renders) == 1
+
+    source.write_bytes(b'# Analysis, updated\n')
+    docx_store.get_docx('u1', 'analysis.docx')
+    assert len(renders) == 2
+
+
+def test_in_memory_content_matches_crlf_file(tmp_path, renders):
+    source = write_source(tmp_path, b'# Analysis\r\n\r\n- point\r\n')
+    with open(source, 'r', encoding='utf-8') as f:
+        markdown = f.read()
+
+    # Rendered from the content in memory, then downloaded, which hashes the file
+    docx_store.get_docx('u1', 'analysis.docx', markdown)
+    docx_store.get_docx('u1', 'analysis.docx')
+    docx_store.get_docx('u1', 'analysis.docx', markdown)
+    assert len(renders) == 1
+
+
+def test_unknown_file(renders):
+    assert docx_store.get_docx('u1', 'missing.docx') is None
+
+
+def test_prerender_logs_failures(tmp_path, renders, monkeypatch, capsys):
+    write_source(tmp_path, b'# Analysis\n')
+
+    def fail(source, output_path, markdown=None):
+        raise RuntimeError('converter crashed')
+
+    monkeypatch.setattr(docx_store.conversion_service, 'convert', fail)
+    docx_store.prerender_docx('u1', ['analysis.docx'])
+
+    # The done-callback runs on the render thread, just after the future completes
+    output = ''
+    deadline = time.time() + 5
+    while 'Error prerendering' not in output and time.time() < deadline:
+        time.sleep(0.01)
+        output += capsys.readouterr().out
+    assert 'Error prerendering analysis.docx for user u1: converter crashed' in output
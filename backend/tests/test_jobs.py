@@ -0,0 +1,140 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+import time
+
+import pytest
+
+from jobs import Job, JobManager, JobQueueFullError, JobStore
+
+
+def wait_until_done(job, timeout=5):
+    deadline = time.time() + timeout
+    while not job.done and time.time() < deadline:
+        time.sleep(0.01)
+    assert job.done
+
+
+@pytest.fixture
+def manager():
+    manager = JobManager(max_workers=1, max_queue_depth=2, retention=60)
+    yield manager
+    manager.shutdown()
+
+
+def test_job_lifecycle(manager):
+    def add(a, b, on_event=None):
+        on_event('progress', {'step': 1})
+        return {'sum': a + b}
+
+    job = manager.submit('analysis', 'user1', add, 1, 2)
+    wait_until_done(job)
+
+    assert job.status == 'succeeded'
+    assert job.result == {'sum': 3}
+    assert job.started_at <= job.finished_at
+    events = [(event['event'], event['data']) for event in job.events]
+    assert events == [
+        ('status', {'status': 'queued'}),
+        ('status', {'status': 'running'}),
+        ('progress', {'step': 1}),
+        ('result', {'sum': 3}),
+        ('status', {'status': 'succeeded'}),
+    ]
+    assert manager.get(job.id) is job
+
+
+def test_failed_job_records_error(manager):
+    def fail(on_event=None):
+        raise RuntimeError('crew failed')
+
+    job = manager.submit('seo', 'user1', fail)
+    wait_until_done(job)
+
+    assert job.status == 'failed'
+    assert job.error == 'crew failed'
+    assert job.finished_at is not None
+    assert (job.events[-2]['event'], job.events[-2]['data']) == ('error', {'message': 'crew failed'})
+
+
+def test_queue_full(manager):
+    release = Event()
+
+    def block(on_event=None):
+        release.wait(5)
+
+    first = manager.submit('seo', 'user1', block)
+    manager.submit('seo', 'user2', block)
+    with pytest.raises(JobQueueFullError):
+        manager.submit('seo', 'user3', block)
+    assert manager.depth == 2
+
+    release.set()
+    wait_until_done(first)
+    # Finished jobs no longer count against the queue depth
+    deadline = time.time() + 5
+    while manager.depth and time.time() < deadline:
+        time.sleep(0.01)
+    manager.submit('seo', 'user3', block)
+
+
+def test_prune_forgets_expired_jobs(manager):
+    old = manager.submit('seo', 'user1', lambda on_event=None: 'old')
+    wait_until_done(old)
+    old.finished_at = time.time() - 120
+
+    recent = manager.submit('seo', 'user1', lambda on_event=None: 'recent')
+    wait_until_done(recent)
+
+    assert manager.get(old.id) is None
+    assert manager.get(recent.id) is recent
+
+
+
+def add(a, b, on_event=None):
+    """Module-level job function, so a worker sharing the store can import it."""
+    return {'sum': a + b}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr('storage.STORAGE_ROOT', tmp_path)
+    monkeypatch.setattr('storage.LOCKS_DIR', tmp_path / '.locks')
+    return JobStore(tmp_path / '.jobs')
+
+
+def test_store_job_claimed_once(store):
+    job = Job('seo', 'user1')
+    store.enqueue(job, add, (1, 2))
+    [name] = store.queued()
+
+    # Every worker sees the job queued and tries to take it at the same time
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        claims = list(executor.map(store.claim, [name] * 8))
+
+    specs = [spec for spec in claims if spec is not None]
+    assert len(specs) == 1
+    assert specs[0] == {'jobId': job.id, 'kind': 'seo', 'userId': 'user1', 'fn': 'test_jobs:add', 'args': [1, 2]}
+    assert store.queued() == []
+    assert list(store.claimed_dir.iterdir()) == []
+
+
+def test_store_job_run_by_another_worker(store):
+    submitter = JobManager(max_workers=1, store=store)
+    worker = JobManager(max_workers=1, store=store)
+    worker.start()
+    try:
+        job = submitter.submit('seo', 'user1', add, 1, 2)
+
+        deadline = time.time() + 5
+        while (stored := submitter.get(job.id)).status != 'succeeded' and time.time() < deadline:
+            time.sleep(0.02)
+
+        assert stored.result == {'sum': 3}
+        stored.refresh()
+        assert [event['data'] for event in stored.events if event['event'] == 'status'] == [
+            {'status': 'queued'}, {'status': 'running'}, {'status': 'succeeded'}
+        ]
+        assert submitter.depth == 0
+    finally:
+        worker.shutdown()
+        submitter.shutdown()
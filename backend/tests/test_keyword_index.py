@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from keyword_index import KeywordIndex, KeywordIndexCache, save_keyword_index, index_path
+
+RANKINGS = {
+    'a.com': {'resultCount': 2, 'results': [
+        {'keyword': 'cbse school', 'searchVolume': 100},
+        {'keyword': 'school franchise', 'searchVolume': 50},
+    ]},
+    'b.com': {'resultCount': 2, 'results': [
+        {'keyword': 'school franchise', 'searchVolume': 60},
+        {'keyword': 'cbse school', 'searchVolume': 100},
+        {'keyword': 'cbse school', 'searchVolume': 100},
+    ]},
+}
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr('storage.STORAGE_ROOT', tmp_path)
+    monkeypatch.setenv('KEYWORD_STORE_ENABLED', 'false')
+    data_dir = tmp_path / 'u1' / 'data'
+    data_dir.mkdir(parents=True)
+    return data_dir
+
+
+def test_from_rankings():
+    index = KeywordIndex.from_rankings(RANKINGS)
+
+    assert index.domains == {'a.com': ['cbse school', 'school franchise'], 'b.com': ['school franchise', 'cbse school']}
+    # The first record in competitor order wins
+    assert index.details(['school franchise', 'unknown']) == {'school franchise': {'keyword': 'school franchise', 'searchVolume': 50}}
+
+
+def test_saved_as_json_and_reloaded_when_changed(data_dir):
+    save_keyword_index(KeywordIndex.from_rankings(RANKINGS), data_dir)
+    assert json.loads(index_path(data_dir).read_text(encoding='utf-8'))['domains']['a.com'] == ['cbse school', 'school franchise']
+
+    cache = KeywordIndexCache()
+    index = cache.get('u1')
+    assert cache.get('u1') is index
+
+    save_keyword_index(KeywordIndex.from_rankings({'c.com': {'results': [{'keyword': 'new'}]}}), data_dir)
+    assert list(cache.get('u1').domains) == ['c.com']
+
+
+def test_built_from_rankings_file_when_missing(data_dir):
+    (data_dir / 'competitor_rankings.json').write_text(json.dumps(RANKINGS), encoding='utf-8')
+    # An index from an older version is never unpickled
+    (data_dir / 'keyword_index.pkl').write_bytes(b'not a pickle')
+
+    index = KeywordIndexCache().get('u1')
+
+    assert list(index.domains) == ['a.com', 'b.com']
+    assert index_path(data_dir).exists()
+
+
+def test_missing_user(data_dir):
+    assert KeywordIndexCache().get('u2') is None
@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+from keyword_index import KeywordIndexCache
+from tools import spyfu_tool
+from tools.keyword_store import KeywordMetricsStore, METRIC_FIELDS
+
+
+def rankings(*keywords, volume=100):
+    return {'resultCount': len(keywords), 'results': [
+        {'keyword': keyword, **dict.fromkeys(METRIC_FIELDS, 1), 'searchVolume': volume} for keyword in keywords
+    ]}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return KeywordMetricsStore(tmp_path / 'keyword_metrics.db', max_age=60)
+
+
+def test_rankings_round_trip_and_expiry(store):
+    assert store.get_rankings('a.com') is None
+
+    store.save_rankings('a.com', rankings('cbse school', 'school franchise'))
+    assert store.get_rankings('a.com') == rankings('cbse school', 'school franchise')
+    assert store.get_rankings('a.com', max_age=-1) is None
+    assert store.stats()['served'] == 1
+    assert store.stats()['fetched'] == 1
+
+
+def test_keywords_stored_once(store):
+    store.save_rankings('a.com', rankings('cbse school', 'school franchise'))
+    store.save_rankings('b.com', rankings('cbse school', volume=200))
+
+    assert store.stats()['keywords'] == 2
+    # The latest metrics of a keyword are served for every domain ranking for it
+    assert store.get_rankings('a.com')['results'][0]['searchVolume'] == 200
+
+
+def test_user_view(store):
+    store.save_rankings('a.com', rankings('cbse school'))
+    store.save_rankings('b.com', rankings('school franchise'))
+    store.set_user_domains('u1', ['b.com', 'a.com', 'missing.com'])
+
+    # Missing domains are skipped and reading the view doesn't count as serving
+    assert list(store.user_rankings('u1')) == ['b.com', 'a.com']
+    assert store.stats()['served'] == 0
+    assert store.user_rankings('u2') == {}
+    assert store.user_version('u2') is None
+
+    version = store.user_version('u1')
+    time.sleep(0.01)
+    store.save_rankings('a.com', rankings('cbse school'))
+    assert store.user_version('u1') != version
+
+
+def test_index_built_from_store(store, tmp_path, monkeypatch):
+    monkeypatch.setattr('storage.STORAGE_ROOT', tmp_path)
+    monkeypatch.setattr(spyfu_tool, '_keyword_store', store)
+    store.save_rankings('a.com', rankings('cbse school'))
+    store.set_user_domains('u1', ['a.com'])
+
+    cache = KeywordIndexCache()
+    index = cache.get('u1')
+    assert index.domains == {'a.com': ['cbse school']}
+    # No per-user files are needed or written
+    assert not (tmp_path / 'u1').exists()
+    assert cache.get('u1') is index
+
+    time.sleep(0.01)
+    store.save_rankings('a.com', rankings('cbse school', 'school franchise'))
+    assert cache.get('u1').domains == {'a.com': ['cbse school', 'school franchise']}
+
+
+def test_orphaned_keywords_deleted(store):
+    store.save_rankings('a.com', rankings('cbse school', 'school franchise'))
+    store.save_rankings('b.com', rankings('cbse school', 'day school'))
+
+    # A refresh drops the keywords no domain ranks for any more
+    store.save_rankings('a.com', rankings('cbse school', 'boarding school'))
+    assert store.stats()['keywords'] == 3
+    assert store.get_rankings('b.com') == rankings('cbse school', 'day school')
+
+    # An expired domain no user has any more goes with its keywords; fresh ones stay
+    store.set_user_domains('u1', ['a.com', 'b.com'])
+    store.set_user_domains('u2', ['a.com'])
+    store.max_age = -1
+    store.set_user_domains('u1', ['a.com'])
+    assert store.stats()['domains'] == 1
+    assert store.stats()['keywords'] == 2
+    assert store.get_rankings('a.com', max_age=60) == rankings('cbse school', 'boarding school')
@@ -0,0 +1,68 @@
+from pathlib import Path
+import time
+import os
+
+from tools.response_cache import ResponseCache
+
+
+def test_get_returns_stored_body(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.set('/endpoint', {'domain': 'a.com'}, b'{"results": []}')
+
+    assert cache.get('/endpoint', {'domain': 'a.com'}) == b'{"results": []}'
+    assert cache.get('/endpoint', {'domain': 'b.com'}) is None
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'stores': 1, 'evictions': 0}
+
+
+def test_key_ignores_parameter_order(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.set('/endpoint', {'a': 1, 'b': 2}, b'body')
+
+    assert cache.get('/endpoint', {'b': 2, 'a': 1}) == b'body'
+
+
+def test_expired_entry_is_a_miss_and_deleted(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path, ttl=60)
+    cache.set('/endpoint', {}, b'body')
+    path = cache._path(cache.make_key('/endpoint', {}))
+
+    now = time.time()
+    monkeypatch.setattr('tools.response_cache.time.time', lambda: now + 61)
+    assert cache.get('/endpoint', {}) is None
+    assert not path.exists()
+    assert cache._total_bytes == 0
+
+
+def test_evicts_least_recently_used_over_budget(tmp_path):
+    body = b'x' * 1000
+    cache = ResponseCache(tmp_path, max_bytes=2500)
+    for index in range(2):
+        cache.set('/endpoint', {'i': index}, body)
+        path = cache._path(cache.make_key('/endpoint', {'i': index}))
+        os.utime(path, (index, index))
+    # Reading entry 0 makes entry 1 the least recently used
+    assert cache.get('/endpoint', {'i': 0}) == body
+
+    cache.set('/endpoint', {'i': 2}, body)
+
+    assert cache.get('/endpoint', {'i': 1}) is None
+    assert cache.get('/endpoint', {'i': 0}) == body
+    assert cache.get('/endpoint', {'i': 2}) == body
+    assert cache.stats()['evictions'] == 1
+    assert cache._total_bytes <= 2500
+
+
+def test_only_scans_when_over_budget(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path, max_bytes=10_000)
+    cache.set('/endpoint', {'i': 0}, b'x' * 100)
+
+    scans = []
+    original_glob = Path.glob
+    monkeypatch.setattr(Path, 'glob', lambda self, pattern: scans.append(pattern) or original_glob(self, pattern))
+    for index in range(1, 20):
+        cache.set('/endpoint', {'i': index}, b'x' * 100)
+    # Replacing an entry does not count its old size twice
+    cache.set('/endpoint', {'i': 0}, b'x' * 100)
+
+    assert scans == []
+    assert cache._total_bytes == sum(path.stat().st_size for path in tmp_path.glob('*/*.json'))
@@ -0,0 +1,91 @@
+from pathlib import Path
+from threading import Thread
+import urllib.request
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'benchmarks'))
+
+from s3_standin import start_standin
+from storage import S3Storage
+from tools.s3_client import S3Client
+
+
+@pytest.fixture
+def storage(tmp_path):
+    server = start_standin(tmp_path / 'bucket')
+    Thread(target=server.serve_forever, daemon=True).start()
+    client = S3Client(f'http://127.0.0.1:{server.server_port}', 'outputs', 'standin', 'standin-secret')
+    yield S3Storage(client, prefix='users/')
+    server.shutdown()
+
+
+def use_node(monkeypatch, root):
+    """Act as an API node with its own STORAGE_ROOT, and return the user's directory on it."""
+    monkeypatch.setattr('storage.STORAGE_ROOT', root)
+    return root / 'u1'
+
+
+def count_calls(monkeypatch, client, method):
+    calls = []
+    original = getattr(client, method)
+
+    def counted(key, *args, **kwargs):
+        calls.append(key)
+        return original(key, *args, **kwargs)
+
+    monkeypatch.setattr(client, method, counted)
+    return calls
+
+
+def test_sync_between_nodes(storage, tmp_path, monkeypatch):
+    uploads = count_calls(monkeypatch, storage.client, 'put_object')
+    downloads = count_calls(monkeypatch, storage.client, 'download_file')
+
+    outputs = use_node(monkeypatch, tmp_path / 'a')
+    (outputs / 'crew').mkdir(parents=True)
+    (outputs / 'data').mkdir()
+    (outputs / 'crew' / '1_analysis.md').write_text('# Analysis\r\n', encoding='utf-8')
+    (outputs / 'data' / 'competitors.json').write_text('{}', encoding='utf-8')
+    (outputs / 'crew' / '.1_analysis.md.tmp').write_text('partial', encoding='utf-8')
+    storage.sync_up('u1')
+    storage.sync_up('u1')
+
+    # Dot files stay on the node, and unchanged files are uploaded once
+    assert sorted(uploads) == ['users/u1/crew/1_analysis.md', 'users/u1/data/competitors.json']
+    assert sorted(storage.client.list_objects('users/u1/')) == sorted(uploads)
+
+    outputs = use_node(monkeypatch, tmp_path / 'b')
+    storage.sync_down('u1', ('crew',))
+    assert (outputs / 'crew' / '1_analysis.md').read_bytes() == b'# Analysis\r\n'
+    assert not (outputs / 'data').exists()
+    storage.sync_down('u1')
+    storage.sync_down('u1')
+    assert (outputs / 'data' / 'competitors.json').exists()
+    assert len(downloads) == 2
+
+    (outputs / 'crew' / '1_analysis.md').write_text('# Analysis, revised\n', encoding='utf-8')
+    storage.sync_up('u1')
+    assert uploads[-1] == 'users/u1/crew/1_analysis.md'
+
+    outputs = use_node(monkeypatch, tmp_path / 'a')
+    storage.sync_down('u1')
+    assert (outputs / 'crew' / '1_analysis.md').read_text(encoding='utf-8') == '# Analysis, revised\n'
+    # Only the changed object was fetched again
+    assert downloads[-1] == 'users/u1/crew/1_analysis.md'
+    assert len(downloads) == 3
+
+
+def test_download_url_and_delete(storage, tmp_path, monkeypatch):
+    outputs = use_node(monkeypatch, tmp_path / 'a')
+    (outputs / 'blogs').mkdir(parents=True)
+    (outputs / 'blogs' / 'blog_post.docx').write_bytes(b'PK docx')
+    storage.sync_up('u1')
+
+    url = storage.download_url('u1', 'blogs/blog_post.docx', 'blog_post.docx')
+    with urllib.request.urlopen(url) as response:
+        assert response.read() == b'PK docx'
+
+    storage.delete_user('u1')
+    assert storage.client.list_objects('users/u1/') == {}
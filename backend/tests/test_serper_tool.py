@@ -0,0 +1,29 @@
+import pytest
+
+from tools.serper_tool import CachedSerperDevTool, normalize_query
+
+
+@pytest.mark.parametrize('query, normalized', [
+    ('CBSE School Franchise, India?', 'cbse school franchise india'),
+    ('  preschool\tfranchise   cost ', 'preschool franchise cost'),
+    ("k-12 school's fees...", "k-12 school's fees"),
+    ('jaipuriaschools.ac.in reviews', 'jaipuriaschools.ac.in reviews'),
+])
+def test_case_punctuation_and_whitespace_ignored(query, normalized):
+    assert normalize_query(query) == normalized
+
+
+@pytest.mark.parametrize('query, other', [
+    ('best school near me', 'school'),
+    ('how to open a school', 'open school'),
+    ('school franchise vs preschool franchise', 'school franchise preschool franchise'),
+    ('school franchise india', 'india school franchise'),
+])
+def test_meaningful_words_and_order_kept(query, other):
+    assert normalize_query(query) != normalize_query(other)
+
+
+def test_search_key():
+    tool = CachedSerperDevTool(api_key='test')
+    assert tool.search_key('School franchise?') == tool.search_key('school  franchise')
+    assert tool.search_key('school franchise') != tool.search_key('school franchise', n_results=20)
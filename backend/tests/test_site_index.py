@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from tools.site_index import build_site_index, chunk_text, load_site_index, snapshot_path
+
+URLS = ['https://school.example.in/about', 'https://school.example.in/admissions']
+WORDS = ['admissions', 'fees', 'campus', 'franchise']
+
+
+class FakeEmbedder:
+    """Embeds each text as its counts of WORDS, recording what it was asked to embed."""
+
+    def __init__(self, dimension=len(WORDS)):
+        self.dimension = dimension
+        self.calls = []
+
+    def __call__(self, texts, model):
+        self.calls.append((model, list(texts)))
+        vectors = np.array([[text.count(word) for word in WORDS] + [1] * (self.dimension - len(WORDS)) for text in texts],
+                           dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True).clip(min=1e-12)
+
+
+def write_page(snapshot_dir, url, *lines):
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    body = ''.join(f'<p>{line}</p>' for line in lines)
+    snapshot_path(url, snapshot_dir).write_text(f'<html><nav>Menu</nav><body>{body}</body></html>', encoding='utf-8')
+
+
+@pytest.fixture
+def snapshots(tmp_path):
+    snapshot_dir = tmp_path / 'snapshots'
+    write_page(snapshot_dir, URLS[0], 'Our campus has labs', 'We offer a franchise')
+    write_page(snapshot_dir, URLS[1], 'Admissions are open', 'Fees are listed here')
+    return snapshot_dir
+
+
+def test_chunk_text():
+    assert chunk_text('aaaa\nbbbb\ncccc', chunk_chars=9) == ['aaaa\nbbbb', 'cccc']
+    assert chunk_text('a very long line', chunk_chars=4) == ['a very long line']
+    assert chunk_text('') == []
+
+
+def test_search(snapshots, tmp_path):
+    index_dir = tmp_path / 'index'
+    build_site_index(URLS, snapshots, index_dir, embed=FakeEmbedder(), model='model-a')
+
+    index = load_site_index(index_dir)
+    assert index.model == 'model-a'
+    assert index.dimension == len(WORDS)
+    query = FakeEmbedder()(['fees'], 'model-a')[0]
+    assert index.search(URLS[1], query, top_k=1) == ['Admissions are open\nFees are listed here']
+    # Only the page's own chunks are searched, and navigation is left out
+    assert index.search(URLS[0], query) == ['Our campus has labs\nWe offer a franchise']
+
+
+def test_only_changed_pages_embedded(snapshots, tmp_path):
+    index_dir = tmp_path / 'index'
+    build_site_index(URLS, snapshots, index_dir, embed=FakeEmbedder(), model='model-a')
+    first = load_site_index(index_dir)
+
+    write_page(snapshots, URLS[1], 'Admissions close soon')
+    embed = FakeEmbedder()
+    manifest = build_site_index(URLS, snapshots, index_dir, embed=embed, model='model-a')
+
+    assert embed.calls == [('model-a', ['Admissions close soon'])]
+    assert (manifest['pages'][URLS[1]]['start'], manifest['pages'][URLS[1]]['end']) == (1, 2)
+    index = load_site_index(index_dir)
+    assert index is not first
+    assert index.chunks == ['Our campus has labs\nWe offer a franchise', 'Admissions close soon']
+    # The build a reader may still hold stays readable
+    assert first.chunks[1] == 'Admissions are open\nFees are listed here'
+
+
+def test_model_change_embeds_every_page(snapshots, tmp_path):
+    index_dir = tmp_path / 'index'
+    build_site_index(URLS, snapshots, index_dir, embed=FakeEmbedder(), model='model-a')
+
+    embed = FakeEmbedder(dimension=6)
+    manifest = build_site_index(URLS, snapshots, index_dir, embed=embed, model='model-b')
+
+    assert [model for model, _ in embed.calls] == ['model-b', 'model-b']
+    assert manifest['model'] == 'model-b'
+    assert manifest['dimension'] == 6
+    assert load_site_index(index_dir).embeddings.shape == (2, 6)
+
+
+def test_builds_swapped_as_a_whole(snapshots, tmp_path):
+    index_dir = tmp_path / 'index'
+    assert load_site_index(index_dir) is None
+
+    for _ in range(3):
+        build_site_index(URLS, snapshots, index_dir, embed=FakeEmbedder(), model='model-a')
+
+    # CURRENT points at the newest build; only it and the one before are kept
+    current = (index_dir / 'CURRENT').read_text(encoding='utf-8')
+    builds = [path.name for path in index_dir.iterdir() if path.is_dir()]
+    assert len(builds) == 2 and current in builds
+    assert sorted(path.name for path in (index_dir / current).iterdir()) == ['chunks.json', 'embeddings.npy', 'manifest.json']
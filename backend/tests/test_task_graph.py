@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+from pathlib import Path
+import threading
+import time
+
+import pytest
+import yaml
+
+from task_graph import TaskGraph, schedule_tasks
+
+
+def test_steps_run_after_their_dependencies():
+    order = []
+    graph = TaskGraph('test')
+    graph.add('report', lambda: order.append('report') or 'done', depends_on=['crew'])
+    graph.add('crew', lambda: order.append('crew'), depends_on=['fetch', 'setup'])
+    graph.add('fetch', lambda: order.append('fetch'))
+    graph.add('setup', lambda: order.append('setup'))
+
+    results = graph.run()
+
+    assert order.index('crew') > max(order.index('fetch'), order.index('setup'))
+    assert order[-1] == 'report'
+    assert results['report'] == 'done'
+
+
+def test_independent_steps_overlap(monkeypatch):
+    monkeypatch.setenv('PIPELINE_PARALLEL', 'true')
+    both_running = threading.Barrier(2, timeout=5)
+    graph = TaskGraph('test')
+    graph.add('fetch', both_running.wait)
+    graph.add('setup', both_running.wait)
+    graph.add('crew', lambda: time.sleep(0.05), depends_on=['fetch', 'setup'])
+
+    graph.run()
+    summary = graph.summary()
+
+    assert summary['critical_path'][-1] == 'crew'
+    assert summary['critical_path_seconds'] <= summary['sequential']
+
+
+def test_sequential_mode(monkeypatch):
+    monkeypatch.setenv('PIPELINE_PARALLEL', 'false')
+    assert TaskGraph('test').max_workers == 1
+
+
+def test_failing_step_stops_dependents():
+    ran = []
+    graph = TaskGraph('test', max_workers=1)
+    graph.add('fetch', lambda: 1 / 0)
+    graph.add('crew', lambda: ran.append('crew'), depends_on=['fetch'])
+
+    with pytest.raises(ZeroDivisionError):
+        graph.run()
+    assert ran == []
+
+
+@pytest.mark.parametrize('steps, message', [
+    ({'crew': ['fetch']}, 'Unknown step'),
+    ({'a': ['b'], 'b': ['a']}, 'Dependency cycle'),
+])
+def test_invalid_graph(steps, message):
+    graph = TaskGraph('test')
+    for name, depends_on in steps.items():
+        graph.add(name, lambda: None, depends_on=depends_on)
+    with pytest.raises(ValueError, match=message):
+        graph.run()
+
+
+def seo_tasks():
+    with open(Path(__file__).resolve().parent.parent / 'config' / 'tasks.yaml', 'r', encoding='utf-8') as f:
+        tasks_config = yaml.safe_load(f)
+    names = ['generate_ad_copies', 'plan_blog_keywords', 'generate_blog_post_outlines']
+    return [SimpleNamespace(name=f'{name}_task', context=None, async_execution=False) for name in names], tasks_config
+
+
+def test_seo_keyword_plan_runs_alongside_ad_copies(monkeypatch):
+    monkeypatch.setenv('PIPELINE_PARALLEL', 'true')
+    tasks, tasks_config = seo_tasks()
+    ad_copies, keyword_plan, outlines = tasks
+
+    assert schedule_tasks(tasks, tasks_config) == [ad_copies, keyword_plan, outlines]
+    assert outlines.context == [ad_copies, keyword_plan]
+    assert [task.async_execution for task in tasks] == [True, True, False]
+
+
+def test_schedule_without_parallelism(monkeypatch):
+    monkeypatch.setenv('PIPELINE_PARALLEL', 'false')
+    tasks, tasks_config = seo_tasks()
+
+    schedule_tasks(list(reversed(tasks)), tasks_config)
+
+    assert not any(task.async_execution for task in tasks)
+
+
+def test_dependency_outside_crew():
+    tasks = [SimpleNamespace(name='generate_blog_post_outlines_task', context=None, async_execution=False)]
+    with pytest.raises(ValueError, match='outside its crew'):
+        schedule_tasks(tasks, {'generate_blog_post_outlines': {'depends_on': ['generate_ad_copies']}})
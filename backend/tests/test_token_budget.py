@@ -0,0 +1,30 @@
+from tools.token_budget import BudgetedFileReadTool, TokenBudget, estimate_tokens
+
+TEXT = 'school franchise cost near me\n' * 200
+
+
+def test_claude_estimates_scaled_up():
+    assert estimate_tokens(TEXT, 'claude-3-5-sonnet-20241022') > estimate_tokens(TEXT, 'gpt-4o')
+    assert estimate_tokens(TEXT, 'anthropic/claude-3-5-sonnet-20241022') == estimate_tokens(TEXT, 'claude-3-5-sonnet-20241022')
+
+
+def test_tool_counts_with_its_agents_model(tmp_path):
+    path = tmp_path / 'tables.md'
+    path.write_text(TEXT, encoding='utf-8')
+    budget = TokenBudget(model='gpt-4o')
+
+    BudgetedFileReadTool(file_path=str(path), task_name='analysis', budget=budget, model='claude-3-5-sonnet-20241022')._run()
+
+    assert budget.summary()['analysis'][BudgetedFileReadTool().name]['tokens'] == estimate_tokens(TEXT, 'claude-3-5-sonnet-20241022')
+
+
+def test_truncated_to_allowance(tmp_path):
+    path = tmp_path / 'tables.md'
+    path.write_text(TEXT, encoding='utf-8')
+    budget = TokenBudget(task_limit=300, tool_limit=200)
+    tool = BudgetedFileReadTool(file_path=str(path), task_name='analysis', budget=budget)
+
+    assert '[Truncated to about 200 of' in tool._run()
+    assert '[Truncated to about 100 of' in tool._run()
+    assert tool._run().startswith('\n[Truncated to about 0 of')
+
@@ -0,0 +1,168 @@
+import http.client
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Errors raised when a pooled keep-alive socket was closed by the server
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+# Bytes sent per write when a request body is streamed from a file
+BLOCK_SIZE = 64 * 1024
+
+class HTTPSConnectionPool:
+    """Thread-safe pool of keep-alive HTTPS connections to a single host."""
+
+    def __init__(self, host: str, port: int = 443, max_size: int = 10,
+                 idle_timeout: float = 30.0, timeout: float = 60.0, context=None, secure: bool = True):
+        """Initialize the pool.
+
+        Args:
+            host (str): Host to connect to.
+            port (int): Port to connect to.
+            max_size (int): Maximum number of connections open at the same time.
+            idle_timeout (float): Seconds after which an idle connection is discarded.
+            timeout (float): Socket timeout for each connection.
+            context (ssl.SSLContext, optional): SSL context for the connections.
+            secure (bool): Whether to use HTTPS; plain HTTP is only meant for local services.
+        """
+        self.host = host
+        self.port = port
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.context = context
+        self.secure = secure
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def _new_connection(self):
+        """Open a new connection to the pool's host.
+
+        Returns:
+            http.client.HTTPConnection: The new, not yet connected, connection.
+        """
+        if not self.secure:
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout, blocksize=BLOCK_SIZE)
+        return http.client.HTTPSConnection(
+            self.host, self.port, timeout=self.timeout, context=self.context, blocksize=BLOCK_SIZE
+        )
+
+    def _acquire(self):
+        """Take a slot and return an idle connection, or a new one if none is usable.
+
+        Returns:
+            tuple: The connection and whether it was reused from the idle list.
+        """
+        self._slots.acquire()
+        now = time.monotonic()
+        with self._lock:
+            while self._idle:
+                conn, last_used = self._idle.pop()
+                if now - last_used < self.idle_timeout and conn.sock is not None:
+                    return conn, True
+                conn.close()
+        return self._new_connection(), False
+
+    def _release(self, conn, reusable: bool):
+        """Return a connection to the idle list, or close it, and free its slot.
+
+        Args:
+            conn (http.client.HTTPSConnection): The connection to release.
+            reusable (bool): Whether the connection can serve another request.
+        """
+        try:
+            if reusable:
+                with self._lock:
+                    self._idle.append((conn, time.monotonic()))
+            else:
+                conn.close()
+        finally:
+            self._slots.release()
+
+    def _send(self, conn, reused: bool, method: str, url: str, headers: dict, body):
+        """Send a request and return its response, retrying once if a reused connection is stale.
+
+        Returns:
+            tuple: The connection the response arrived on and the response.
+        """
+        # A streamed body is rewound before it is sent again
+        start = body.tell() if hasattr(body, 'seek') else None
+        while True:
+            try:
+                conn.request(method, url, body=body, headers=headers or {})
+                return conn, conn.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                conn.close()
+                if not reused or (body is not None and start is None and not isinstance(body, bytes)):
+                    raise
+                if start is not None:
+                    body.seek(start)
+                conn, reused = self._new_connection(), False
+
+    def request(self, method: str, url: str, headers: dict = None, body=None):
+        """Send a request over a pooled connection.
+
+        A request on a reused connection that turns out to be stale is retried
+        once on a fresh connection.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Request path and query string.
+            headers (dict, optional): Request headers.
+            body (bytes | file, optional): Request body; a file is sent in blocks
+                and needs a Content-Length header.
+
+        Returns:
+            tuple: The response status code and the response body as bytes.
+        """
+        conn, reused = self._acquire()
+        try:
+            conn, res = self._send(conn, reused, method, url, headers, body)
+            data = res.read()
+        except Exception:
+            self._release(conn, reusable=False)
+            raise
+
+        self._release(conn, reusable=not res.will_close)
+        return res.status, data
+
+    @contextmanager
+    def stream(self, method: str, url: str, headers: dict = None, body=None):
+        """Send a request and read its response body in blocks instead of all at once.
+
+        The connection goes back to the pool when the block exits, if the body
+        was read to the end.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Request path and query string.
+            headers (dict, optional): Request headers.
+            body (bytes | file, optional): Request body, as for request().
+
+        Yields:
+            http.client.HTTPResponse: The response, with its body still unread.
+        """
+        conn, reused = self._acquire()
+        res = None
+        try:
+            conn, res = self._send(conn, reused, method, url, headers, body)
+            yield res
+        except Exception:
+            self._release(conn, reusable=False)
+            raise
+        self._release(conn, reusable=res.isclosed() and not res.will_close)
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                conn.close()
@@ -0,0 +1,250 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+METRIC_FIELDS = (
+    'searchVolume',
+    'rankingDifficulty',
+    'totalMonthlyClicks',
+    'exactCostPerClick',
+    'paidCompetitors'
+)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS keywords (
+    keyword TEXT PRIMARY KEY,
+    {', '.join(METRIC_FIELDS)},
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS domains (
+    domain TEXT PRIMARY KEY,
+    result_count INTEGER,
+    fetched_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS domain_keywords (
+    domain TEXT NOT NULL REFERENCES domains(domain) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    keyword TEXT NOT NULL REFERENCES keywords(keyword),
+    PRIMARY KEY (domain, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS user_domains (
+    user_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    domain TEXT NOT NULL,
+    PRIMARY KEY (user_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS user_domains_domain ON user_domains (domain);
+CREATE INDEX IF NOT EXISTS domain_keywords_keyword ON domain_keywords (keyword);
+"""
+
+class KeywordMetricsStore:
+    """SQLite store of SpyFu keyword metrics shared by every user.
+
+    Each keyword's metrics are stored once, however many domains rank for it,
+    and each domain's rankings are stored once, however many users have it as
+    a competitor. A user's view is just the ordered list of their domains,
+    and the keyword endpoints read it from here rather than from files in the
+    user's directory. Domains are refetched only once their rankings are older
+    than max_age. Keywords no domain ranks for any more are deleted, and so are
+    expired domains once no user has them as a competitor.
+    """
+
+    def __init__(self, db_path, max_age: float = 7 * 24 * 3600):
+        """Initialize the store, creating the database if needed.
+
+        Args:
+            db_path (str | Path): Path of the SQLite database file.
+            max_age (float): Seconds after which a domain's rankings are refetched.
+        """
+        self.db_path = Path(db_path)
+        self.max_age = max_age
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counters = {'served': 0, 'fetched': 0}
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection to the database."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30)
+            # WAL lets several server processes read while one of them writes
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA foreign_keys=ON')
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _delete_orphaned_keywords(connection: sqlite3.Connection, keywords):
+        """Delete those of the given keywords that no domain ranks for any more."""
+        connection.executemany(
+            'DELETE FROM keywords WHERE keyword = ? '
+            'AND NOT EXISTS (SELECT 1 FROM domain_keywords WHERE keyword = ?)',
+            [(keyword, keyword) for keyword in set(keywords)]
+        )
+
+    def _count(self, name: str):
+        """Increment one of the store counters."""
+        with self._lock:
+            self._counters[name] += 1
+
+    def get_rankings(self, domain: str, max_age: float = None):
+        """Return a domain's stored rankings if they are fresh enough.
+
+        Args:
+            domain (str): The cleaned domain.
+            max_age (float, optional): Maximum age in seconds; defaults to the store's.
+
+        Returns:
+            dict: The rankings in the SpyFu tool's format, or None if the domain
+                is unknown or its rankings are older than max_age.
+        """
+        if max_age is None:
+            max_age = self.max_age
+        rankings = self._read_rankings(domain, max_age)
+        if rankings is not None:
+            self._count('served')
+        return rankings
+
+    def _read_rankings(self, domain: str, max_age: float):
+        """Return a domain's stored rankings if they are younger than max_age, else None."""
+        connection = self._connect()
+        row = connection.execute(
+            'SELECT result_count, fetched_at FROM domains WHERE domain = ?', (domain,)
+        ).fetchone()
+        if row is None or time.time() - row[1] > max_age:
+            return None
+
+        columns = ', '.join(f'k.{field}' for field in METRIC_FIELDS)
+        results = [
+            dict(zip(('keyword',) + METRIC_FIELDS, result))
+            for result in connection.execute(
+                f'SELECT k.keyword, {columns} FROM domain_keywords d '
+                'JOIN keywords k ON k.keyword = d.keyword '
+                'WHERE d.domain = ? ORDER BY d.position',
+                (domain,)
+            )
+        ]
+        return {'resultCount': row[0], 'results': results}
+
+    def save_rankings(self, domain: str, rankings: dict):
+        """Store freshly fetched rankings for a domain, replacing its old ones.
+
+        Args:
+            domain (str): The cleaned domain.
+            rankings (dict): The rankings in the SpyFu tool's format.
+        """
+        now = time.time()
+        results = [result for result in rankings.get('results', []) if result.get('keyword')]
+        with self._connect() as connection:
+            old_keywords = [
+                row[0] for row in
+                connection.execute('SELECT keyword FROM domain_keywords WHERE domain = ?', (domain,))
+            ]
+            connection.executemany(
+                f"INSERT OR REPLACE INTO keywords (keyword, {', '.join(METRIC_FIELDS)}, updated_at) "
+                f"VALUES (?, {', '.join('?' for _ in METRIC_FIELDS)}, ?)",
+                [
+                    (result['keyword'], *(result.get(field) for field in METRIC_FIELDS), now)
+                    for result in results
+                ]
+            )
+            connection.execute('DELETE FROM domain_keywords WHERE domain = ?', (domain,))
+            connection.execute(
+                'INSERT OR REPLACE INTO domains (domain, result_count, fetched_at) VALUES (?, ?, ?)',
+                (domain, rankings.get('resultCount'), now)
+            )
+            connection.executemany(
+                'INSERT INTO domain_keywords (domain, position, keyword) VALUES (?, ?, ?)',
+                [(domain, position, result['keyword']) for position, result in enumerate(results)]
+            )
+            self._delete_orphaned_keywords(connection, old_keywords)
+        self._count('fetched')
+
+    def set_user_domains(self, user_id: str, domains: list):
+        """Record which domains make up a user's view, in order.
+
+        The user's previous domains that no user has any more and whose rankings
+        have expired are deleted, together with the keywords only they ranked for.
+
+        Args:
+            user_id (str): Unique identifier for the user.
+            domains (list[str]): The user's cleaned competitor domains.
+        """
+        with self._connect() as connection:
+            old_domains = [
+                row[0] for row in
+                connection.execute('SELECT domain FROM user_domains WHERE user_id = ?', (user_id,))
+            ]
+            connection.execute('DELETE FROM user_domains WHERE user_id = ?', (user_id,))
+            connection.executemany(
+                'INSERT INTO user_domains (user_id, position, domain) VALUES (?, ?, ?)',
+                [(user_id, position, domain) for position, domain in enumerate(domains)]
+            )
+
+            expired = [
+                domain for domain in set(old_domains) - set(domains)
+                if connection.execute(
+                    'SELECT 1 FROM domains WHERE domain = ? AND fetched_at < ? '
+                    'AND NOT EXISTS (SELECT 1 FROM user_domains WHERE domain = ?)',
+                    (domain, time.time() - self.max_age, domain)
+                ).fetchone()
+            ]
+            keywords = [
+                row[0] for domain in expired
+                for row in connection.execute('SELECT keyword FROM domain_keywords WHERE domain = ?', (domain,))
+            ]
+            connection.executemany('DELETE FROM domains WHERE domain = ?', [(domain,) for domain in expired])
+            self._delete_orphaned_keywords(connection, keywords)
+
+    def user_version(self, user_id: str):
+        """Return what a user's view currently consists of, to tell when it changes.
+
+        Args:
+            user_id (str): Unique identifier for the user.
+
+        Returns:
+            tuple: The user's domains with the time their rankings were fetched,
+                in order, or None if the store has no view for the user.
+        """
+        rows = self._connect().execute(
+            'SELECT u.domain, d.fetched_at FROM user_domains u LEFT JOIN domains d ON d.domain = u.domain '
+            'WHERE u.user_id = ? ORDER BY u.position',
+            (user_id,)
+        ).fetchall()
+        return tuple(rows) or None
+
+    def user_rankings(self, user_id: str) -> dict:
+        """Return the stored rankings of a user's domains, regardless of age.
+
+        Args:
+            user_id (str): Unique identifier for the user.
+
+        Returns:
+            dict: Domain to rankings, in the user's competitor order.
+        """
+        rankings = {}
+        for domain, _ in self.user_version(user_id) or ():
+            domain_rankings = self._read_rankings(domain, float('inf'))
+            if domain_rankings is not None:
+                rankings[domain] = domain_rankings
+        return rankings
+
+    def stats(self) -> dict:
+        """Return the table sizes and the served and fetched counters.
+
+        Returns:
+            dict: Numbers of keywords, domains and users, and counter values.
+        """
+        connection = self._connect()
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            'keywords': connection.execute('SELECT COUNT(*) FROM keywords').fetchone()[0],
+            'domains': connection.execute('SELECT COUNT(*) FROM domains').fetchone()[0],
+            'users': connection.execute('SELECT COUNT(DISTINCT user_id) FROM user_domains').fetchone()[0],
+            **counters
+        }
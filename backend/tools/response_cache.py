@@ -0,0 +1,176 @@
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Absolute root of the shared caches, so that workers started from any directory share them
+CACHE_ROOT = Path(os.getenv("CACHE_ROOT", Path(__file__).resolve().parent.parent / 'cache')).resolve()
+
+class ResponseCache:
+    """Disk-backed TTL cache for API responses with LRU eviction under a byte budget.
+
+    Entries are content-addressed by a hash of the request key and written
+    atomically, so several workers and processes can share one cache directory.
+    A file's modification time records its last access and drives LRU eviction.
+    The cache keeps a running total of the bytes it has written and only scans
+    the directory when that total goes over the budget; the scan also picks up
+    entries written by other processes.
+    """
+
+    def __init__(self, cache_dir, ttl: float = 7 * 24 * 3600, max_bytes: int = 100 * 1024 * 1024):
+        """Initialize the cache.
+
+        Args:
+            cache_dir (str | Path): Directory holding the cache entries.
+            ttl (float): Seconds after which an entry is considered expired.
+            max_bytes (int): Total size of the entries above which the least
+                recently used ones are evicted.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        # Bytes held by the entries, as of the last scan plus this process's writes since
+        self._total_bytes = None
+
+    def _count(self, name: str, amount: int = 1):
+        """Increment one of the cache counters."""
+        with self._lock:
+            self._counters[name] += amount
+
+    def stats(self) -> dict:
+        """Return a snapshot of the hit, miss, store and eviction counters.
+
+        Returns:
+            dict: The counter values.
+        """
+        with self._lock:
+            return dict(self._counters)
+
+    @staticmethod
+    def make_key(endpoint: str, params: dict) -> str:
+        """Build the content address of a request.
+
+        Args:
+            endpoint (str): The API endpoint path.
+            params (dict): The request parameters.
+
+        Returns:
+            str: Hex digest identifying the request.
+        """
+        canonical = json.dumps([endpoint, params], sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        """Return the file path of a cache entry."""
+        return self.cache_dir / key[:2] / f'{key}.json'
+
+    def get(self, endpoint: str, params: dict):
+        """Look up a cached response body.
+
+        Args:
+            endpoint (str): The API endpoint path.
+            params (dict): The request parameters.
+
+        Returns:
+            bytes: The cached body, or None on a miss or an expired entry.
+        """
+        path = self._path(self.make_key(endpoint, params))
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._count('misses')
+            return None
+
+        if time.time() - entry['created'] > self.ttl:
+            with contextlib.suppress(OSError):
+                size = path.stat().st_size
+                path.unlink()
+                self._add_bytes(-size)
+            self._count('misses')
+            return None
+
+        # Mark the entry as recently used for LRU eviction
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        self._count('hits')
+        return entry['body'].encode('utf-8')
+
+    def set(self, endpoint: str, params: dict, body: bytes):
+        """Store a response body.
+
+        Args:
+            endpoint (str): The API endpoint path.
+            params (dict): The request parameters.
+            body (bytes): The response body to cache.
+        """
+        path = self._path(self.make_key(endpoint, params))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+
+        # Write to a temporary file and rename it so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'created': time.time(), 'body': body.decode('utf-8')}, f)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+
+        self._count('stores')
+        if self._add_bytes(size - replaced) > self.max_bytes:
+            self._evict()
+
+    def _add_bytes(self, amount: int) -> int:
+        """Add to the running byte total, scanning the directory for it on first use.
+
+        Returns:
+            int: The new total.
+        """
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(
+                    path.stat().st_size for path in self.cache_dir.glob('*/*.json') if path.is_file()
+                )
+            else:
+                self._total_bytes += amount
+            return self._total_bytes
+
+    def _evict(self):
+        """Delete least recently used entries until the cache fits its byte budget."""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob('*/*.json'):
+            with contextlib.suppress(OSError):
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        if total <= self.max_bytes:
+            with self._lock:
+                self._total_bytes = total
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            with contextlib.suppress(OSError):
+                path.unlink()
+                self._count('evictions')
+            total -= size
+
+        with self._lock:
+            self._total_bytes = total
@@ -0,0 +1,310 @@
+from tools.connection_pool import HTTPSConnectionPool
+from contextlib import contextmanager
+from urllib.parse import quote, urlsplit
+from xml.etree import ElementTree
+import datetime
+import hashlib
+import hmac
+import os
+
+EMPTY_SHA256 = hashlib.sha256(b'').hexdigest()
+# Uploads are streamed, so their body is not hashed into the signature
+UNSIGNED_PAYLOAD = 'UNSIGNED-PAYLOAD'
+S3_NAMESPACE = '{http://s3.amazonaws.com/doc/2006-03-01/}'
+CHUNK_SIZE = 64 * 1024
+
+class S3Error(Exception):
+    """Raised when the object store rejects a request."""
+
+    def __init__(self, status: int, message: str):
+        """Initialize the error.
+
+        Args:
+            status (int): HTTP status of the response.
+            message (str): Body of the response.
+        """
+        super().__init__(f"S3 request failed with status {status}: {message}")
+        self.status = status
+
+def canonical_query(params: dict) -> str:
+    """Return query parameters in the sorted, encoded form Signature Version 4 signs."""
+    return '&'.join(
+        f"{quote(str(key), safe='~')}={quote(str(value), safe='~')}"
+        for key, value in sorted(params.items())
+    )
+
+def signing_key(secret_key: str, date_stamp: str, region: str) -> bytes:
+    """Derive the Signature Version 4 key for a day and region.
+
+    Args:
+        secret_key (str): The secret access key.
+        date_stamp (str): The day, as YYYYMMDD.
+        region (str): The region of the bucket.
+
+    Returns:
+        bytes: The signing key.
+    """
+    key = f'AWS4{secret_key}'.encode('utf-8')
+    for part in (date_stamp, region, 's3', 'aws4_request'):
+        key = hmac.new(key, part.encode('utf-8'), hashlib.sha256).digest()
+    return key
+
+def signature(secret_key: str, region: str, amz_date: str, canonical_request: str) -> str:
+    """Sign a canonical request.
+
+    Args:
+        secret_key (str): The secret access key.
+        region (str): The region of the bucket.
+        amz_date (str): Time of the request, as YYYYMMDDTHHMMSSZ.
+        canonical_request (str): The canonical form of the request.
+
+    Returns:
+        str: The hex signature.
+    """
+    scope = f'{amz_date[:8]}/{region}/s3/aws4_request'
+    string_to_sign = '\n'.join([
+        'AWS4-HMAC-SHA256',
+        amz_date,
+        scope,
+        hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()
+    ])
+    return hmac.new(
+        signing_key(secret_key, amz_date[:8], region), string_to_sign.encode('utf-8'), hashlib.sha256
+    ).hexdigest()
+
+class S3Client:
+    """Client for S3-compatible object stores, such as AWS S3 or MinIO.
+
+    Requests are signed with Signature Version 4 and use path-style URLs, so
+    any S3-compatible endpoint works. Objects are uploaded from and downloaded
+    to files in blocks, so their size does not matter.
+    """
+
+    def __init__(self, endpoint_url: str, bucket: str, access_key: str, secret_key: str,
+                 region: str = 'us-east-1', public_endpoint_url: str = None, max_connections: int = 10):
+        """Initialize the client.
+
+        Args:
+            endpoint_url (str): URL of the object store, e.g. https://s3.ap-south-1.amazonaws.com.
+            bucket (str): Name of the bucket.
+            access_key (str): The access key ID.
+            secret_key (str): The secret access key.
+            region (str): The region of the bucket.
+            public_endpoint_url (str, optional): URL browsers reach the object store
+                at, for presigned URLs, if it differs from endpoint_url.
+            max_connections (int): Maximum number of connections open at the same time.
+        """
+        endpoint = urlsplit(endpoint_url)
+        self.endpoint_url = endpoint_url.rstrip('/')
+        self.public_endpoint_url = (public_endpoint_url or endpoint_url).rstrip('/')
+        self.host = endpoint.netloc
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self._pool = HTTPSConnectionPool(
+            endpoint.hostname,
+            endpoint.port or (443 if endpoint.scheme == 'https' else 80),
+            max_size=max_connections,
+            secure=endpoint.scheme == 'https'
+        )
+
+    def _path(self, key: str = '') -> str:
+        """Return the URL path of an object, or of the bucket."""
+        return f"/{quote(self.bucket)}/{quote(key, safe='/~')}" if key else f"/{quote(self.bucket)}"
+
+    def _signed_headers(self, method: str, path: str, query: dict = None, payload_hash: str = EMPTY_SHA256,
+                        headers: dict = None, now: datetime.datetime = None) -> dict:
+        """Return request headers with the Signature Version 4 authorization.
+
+        Args:
+            method (str): HTTP method.
+            path (str): URL path of the request.
+            query (dict, optional): Query parameters.
+            payload_hash (str): SHA-256 hex digest of the body, or UNSIGNED-PAYLOAD.
+            headers (dict, optional): Headers to send and sign.
+            now (datetime.datetime, optional): Time of the request, if not the current time.
+
+        Returns:
+            dict: The headers to send.
+        """
+        amz_date = (now or datetime.datetime.now(datetime.timezone.utc)).strftime('%Y%m%dT%H%M%SZ')
+        signed = {key.lower(): str(value).strip() for key, value in (headers or {}).items()}
+        signed.update({'host': self.host, 'x-amz-date': amz_date, 'x-amz-content-sha256': payload_hash})
+        names = sorted(signed)
+        canonical_request = '\n'.join([
+            method,
+            path,
+            canonical_query(query or {}),
+            ''.join(f'{name}:{signed[name]}\n' for name in names),
+            ';'.join(names),
+            payload_hash
+        ])
+        signed['authorization'] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{amz_date[:8]}/{self.region}/s3/aws4_request, "
+            f"SignedHeaders={';'.join(names)}, "
+            f"Signature={signature(self.secret_key, self.region, amz_date, canonical_request)}"
+        )
+        return signed
+
+    def _url(self, path: str, query: dict = None) -> str:
+        """Return the request target for a path and query parameters."""
+        return f'{path}?{canonical_query(query)}' if query else path
+
+    def put_object(self, key: str, fileobj, length: int, content_type: str = None, metadata: dict = None) -> str:
+        """Upload an object from a file, in blocks.
+
+        Args:
+            key (str): Key of the object.
+            fileobj (file): Binary file positioned at the start of the content.
+            length (int): Number of bytes to upload.
+            content_type (str, optional): Content type of the object.
+            metadata (dict, optional): User metadata stored with the object.
+
+        Returns:
+            str: The object's ETag.
+        """
+        headers = {f'x-amz-meta-{name}': value for name, value in (metadata or {}).items()}
+        if content_type:
+            headers['content-type'] = content_type
+        path = self._path(key)
+        request_headers = self._signed_headers('PUT', path, payload_hash=UNSIGNED_PAYLOAD, headers=headers)
+        request_headers['content-length'] = str(length)
+        with self._pool.stream('PUT', path, headers=request_headers, body=fileobj) as res:
+            data = res.read()
+            if res.status != 200:
+                raise S3Error(res.status, data.decode('utf-8', 'replace'))
+            return res.getheader('ETag', '').strip('"')
+
+    @contextmanager
+    def get_object(self, key: str):
+        """Open an object for reading in blocks.
+
+        Args:
+            key (str): Key of the object.
+
+        Yields:
+            http.client.HTTPResponse: The response; read() it in blocks.
+
+        Raises:
+            FileNotFoundError: If the object does not exist.
+        """
+        path = self._path(key)
+        with self._pool.stream('GET', path, headers=self._signed_headers('GET', path)) as res:
+            if res.status == 404:
+                res.read()
+                raise FileNotFoundError(key)
+            if res.status != 200:
+                raise S3Error(res.status, res.read().decode('utf-8', 'replace'))
+            yield res
+
+    def download_file(self, key: str, path) -> str:
+        """Download an object to a file, in blocks, replacing the file only once it is complete.
+
+        Args:
+            key (str): Key of the object.
+            path (str | Path): Where to save the object.
+
+        Returns:
+            str: The object's ETag.
+        """
+        # A hidden temporary name, so the partial file is never mistaken for the object
+        tmp_path = os.path.join(os.path.dirname(path), f'.{os.path.basename(path)}.{os.getpid()}.part')
+        try:
+            with self.get_object(key) as res, open(tmp_path, 'wb') as f:
+                etag = res.getheader('ETag', '').strip('"')
+                for block in iter(lambda: res.read(CHUNK_SIZE), b''):
+                    f.write(block)
+            os.replace(tmp_path, path)
+            return etag
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def head_object(self, key: str):
+        """Return an object's size, ETag and user metadata.
+
+        Args:
+            key (str): Key of the object.
+
+        Returns:
+            dict: The object's 'size', 'etag' and 'metadata', or None if it does not exist.
+        """
+        path = self._path(key)
+        with self._pool.stream('HEAD', path, headers=self._signed_headers('HEAD', path)) as res:
+            res.read()
+            if res.status == 404:
+                return None
+            if res.status != 200:
+                raise S3Error(res.status, res.reason)
+            return {
+                'size': int(res.getheader('Content-Length', 0)),
+                'etag': res.getheader('ETag', '').strip('"'),
+                'metadata': {
+                    name[len('x-amz-meta-'):]: value for name, value in res.getheaders()
+                    if name.lower().startswith('x-amz-meta-')
+                }
+            }
+
+    def delete_object(self, key: str):
+        """Delete an object; deleting a missing object is not an error.
+
+        Args:
+            key (str): Key of the object.
+        """
+        path = self._path(key)
+        status, data = self._pool.request('DELETE', path, headers=self._signed_headers('DELETE', path))
+        if status not in (200, 204):
+            raise S3Error(status, data.decode('utf-8', 'replace'))
+
+    def list_objects(self, prefix: str) -> dict:
+        """List the objects under a prefix.
+
+        Args:
+            prefix (str): Key prefix.
+
+        Returns:
+            dict: Key to ETag of every object under the prefix.
+        """
+        objects = {}
+        path = self._path()
+        query = {'list-type': '2', 'prefix': prefix}
+        while True:
+            status, data = self._pool.request('GET', self._url(path, query), headers=self._signed_headers('GET', path, query))
+            if status != 200:
+                raise S3Error(status, data.decode('utf-8', 'replace'))
+            root = ElementTree.fromstring(data)
+            for item in root.iter(f'{S3_NAMESPACE}Contents'):
+                objects[item.findtext(f'{S3_NAMESPACE}Key')] = item.findtext(f'{S3_NAMESPACE}ETag', '').strip('"')
+            token = root.findtext(f'{S3_NAMESPACE}NextContinuationToken')
+            if root.findtext(f'{S3_NAMESPACE}IsTruncated') != 'true' or not token:
+                return objects
+            query['continuation-token'] = token
+
+    def presigned_url(self, key: str, expires: int = 900, filename: str = None, now: datetime.datetime = None) -> str:
+        """Return a URL anyone can download an object from until it expires.
+
+        Args:
+            key (str): Key of the object.
+            expires (int): Seconds the URL stays valid.
+            filename (str, optional): File name the browser saves the download as.
+            now (datetime.datetime, optional): Time of signing, if not the current time.
+
+        Returns:
+            str: The presigned URL, on the public endpoint.
+        """
+        amz_date = (now or datetime.datetime.now(datetime.timezone.utc)).strftime('%Y%m%dT%H%M%SZ')
+        path = self._path(key)
+        host = urlsplit(self.public_endpoint_url).netloc
+        query = {
+            'X-Amz-Algorithm': 'AWS4-HMAC-SHA256',
+            'X-Amz-Credential': f'{self.access_key}/{amz_date[:8]}/{self.region}/s3/aws4_request',
+            'X-Amz-Date': amz_date,
+            'X-Amz-Expires': str(expires),
+            'X-Amz-SignedHeaders': 'host'
+        }
+        if filename:
+            query['response-content-disposition'] = f'attachment; filename="{filename}"'
+        canonical_request = '\n'.join(['GET', path, canonical_query(query), f'host:{host}\n', 'host', UNSIGNED_PAYLOAD])
+        query['X-Amz-Signature'] = signature(self.secret_key, self.region, amz_date, canonical_request)
+        return f'{self.public_endpoint_url}{self._url(path, query)}'
@@ -0,0 +1,172 @@
+from collections import OrderedDict
+from crewai_tools import SerperDevTool
+from tools.response_cache import ResponseCache, CACHE_ROOT
+from typing import Any
+import threading
+import json
+import time
+import re
+import os
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+_recordings = None
+_recordings_lock = threading.Lock()
+
+def normalize_query(query: str) -> str:
+    """Reduce a search query to the form that decides its results.
+
+    Only case, punctuation and whitespace are ignored, so "CBSE school
+    franchise, India?" and "cbse school franchise india" match. Every word and
+    the word order are kept: "best school near me" and "school" get different
+    results.
+
+    Args:
+        query (str): The search query.
+
+    Returns:
+        str: The normalised query.
+    """
+    words = re.findall(r"[\w'+&.-]+", str(query).lower())
+    return ' '.join(word for word in (word.strip('.-') for word in words) if word)
+
+def get_response_cache():
+    """Return the search result cache shared by all users.
+
+    The cache is disabled by setting SERPER_CACHE_ENABLED to "false".
+
+    Returns:
+        ResponseCache: The shared cache, or None if caching is disabled.
+    """
+    global _response_cache
+    if os.getenv("SERPER_CACHE_ENABLED", "true").lower() == "false":
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                os.getenv("SERPER_CACHE_DIR", CACHE_ROOT / "serper"),
+                ttl=float(os.getenv("SERPER_CACHE_TTL", 24 * 3600)),
+                max_bytes=int(os.getenv("SERPER_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+            )
+        return _response_cache
+
+def search_mode() -> str:
+    """Return the search mode from SERPER_MODE.
+
+    'live' searches through the cache, 'record' also appends every result to
+    the recordings file, and 'replay' only serves recorded results and never
+    searches, so crews can be benchmarked offline.
+    """
+    return os.getenv("SERPER_MODE", "live").lower()
+
+def _recordings_path() -> str:
+    """Return the path of the search recordings file."""
+    return os.getenv("SERPER_RECORDINGS_PATH", str(CACHE_ROOT / "serper_recordings.jsonl"))
+
+def _load_recordings() -> dict:
+    """Return the recorded results by search key, reading the recordings file once."""
+    global _recordings
+    with _recordings_lock:
+        if _recordings is None:
+            _recordings = {}
+            if os.path.exists(_recordings_path()):
+                with open(_recordings_path(), 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            record = json.loads(line)
+                            _recordings[record['key']] = record['result']
+        return _recordings
+
+def _record(key: str, query: str, result):
+    """Append a search result to the recordings file."""
+    recordings = _load_recordings()
+    with _recordings_lock:
+        recordings[key] = result
+        os.makedirs(os.path.dirname(_recordings_path()) or '.', exist_ok=True)
+        with open(_recordings_path(), 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'key': key, 'query': query, 'result': result}, ensure_ascii=False) + '\n')
+
+def _memo_get(key: str):
+    """Return a result from the in-process memo if it has not expired."""
+    with _memo_lock:
+        entry = _memo.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.time():
+            del _memo[key]
+            return None
+        _memo.move_to_end(key)
+        return entry[1]
+
+def _memo_set(key: str, result):
+    """Store a result in the in-process memo, evicting the least recently used."""
+    with _memo_lock:
+        _memo[key] = (time.time() + float(os.getenv("SERPER_CACHE_TTL", 24 * 3600)), result)
+        _memo.move_to_end(key)
+        while len(_memo) > int(os.getenv("SERPER_MEMO_SIZE", 1024)):
+            _memo.popitem(last=False)
+
+class CachedSerperDevTool(SerperDevTool):
+    """SerperDevTool whose results are shared across users and runs.
+
+    Searches are keyed by their normalised query and search settings, and
+    served from an in-process memo, then from the shared on-disk cache, and
+    only then searched live.
+    """
+
+    def search_key(self, query: str, n_results: int = None) -> str:
+        """Return the cache key of a search.
+
+        Args:
+            query (str): The search query.
+            n_results (int, optional): Number of results, if not the tool's default.
+
+        Returns:
+            str: The key.
+        """
+        return json.dumps([
+            normalize_query(query),
+            n_results or self.n_results,
+            self.search_url,
+            self.country,
+            self.location,
+            self.locale
+        ])
+
+    def _search(self, query: str, n_results: int = None):
+        """Return the results of a search from the memo, cache, recordings or a live search."""
+        key = self.search_key(query, n_results)
+        mode = search_mode()
+        if mode == 'replay':
+            result = _load_recordings().get(key)
+            return result if result is not None else f"No recorded search results for: {query}"
+
+        cache = get_response_cache()
+        result = _memo_get(key) if cache is not None else None
+        if result is None:
+            params = {'key': key}
+            cached = cache.get('serper', params) if cache is not None else None
+            if cached is not None:
+                result = json.loads(cached)
+            else:
+                result = super()._run(search_query=query, n_results=n_results or self.n_results)
+                # Serper returns its raw response instead of formatted results on errors; don't keep those
+                if not isinstance(result, str):
+                    return result
+                if cache is not None:
+                    cache.set('serper', params, json.dumps(result, ensure_ascii=False).encode('utf-8'))
+            if cache is not None:
+                _memo_set(key, result)
+
+        if mode == 'record' and key not in _load_recordings():
+            _record(key, query, result)
+        return result
+
+    def _run(self, **kwargs: Any) -> Any:
+        """Return the results of the search, from the caches when possible."""
+        query = kwargs.get("search_query") or kwargs.get("query")
+        if not query or kwargs.get("save_file", self.save_file):
+            return super()._run(**kwargs)
+        return self._search(query, kwargs.get("n_results"))
@@ -0,0 +1,242 @@
+"""Local vector index of the institution pages the SEO crew searches.
+
+The pages are saved as HTML snapshots and indexed once, offline: their text
+is chunked and embedded, and the embeddings are stored as one normalised
+float32 matrix that queries memory-map instead of loading. Rebuilding only
+embeds the pages whose text changed since the last build, unless the embedding
+model changed. Each build is written to a fresh version directory, which the
+CURRENT file in the index directory then points to, so readers always see the
+embeddings, chunks and manifest of a single build.
+
+Usage (from the backend directory):
+    python -m tools.site_index [--fetch]
+"""
+from urllib.request import urlopen, Request
+from bs4 import BeautifulSoup
+from pathlib import Path
+import numpy as np
+import threading
+import argparse
+import hashlib
+import litellm
+import shutil
+import uuid
+import json
+import os
+
+SITE_PAGES = [
+    "https://www.jaipuriaschools.ac.in/why-jaipuria",
+    "https://www.jaipuriaschools.ac.in/open-a-jaipuria-school",
+]
+# Resolved against the backend directory, so that workers started from any directory share the index
+KNOWLEDGE_DIR = Path(__file__).resolve().parent.parent / 'knowledge'
+SNAPSHOT_DIR = Path(os.getenv("SITE_SNAPSHOT_DIR", KNOWLEDGE_DIR / 'snapshots')).resolve()
+INDEX_DIR = Path(os.getenv("SITE_INDEX_DIR", KNOWLEDGE_DIR / 'site_index')).resolve()
+EMBEDDING_MODEL = os.getenv("SITE_INDEX_EMBEDDING_MODEL", "text-embedding-3-small")
+CHUNK_CHARS = int(os.getenv("SITE_INDEX_CHUNK_CHARS", 1000))
+
+def snapshot_path(url: str, snapshot_dir: Path = SNAPSHOT_DIR) -> Path:
+    """Return the path of a page's HTML snapshot."""
+    return snapshot_dir / (url.split('://', 1)[-1].strip('/').replace('/', '_') + '.html')
+
+def fetch_snapshots(urls: list = SITE_PAGES, snapshot_dir: Path = SNAPSHOT_DIR):
+    """Download the pages and save them as HTML snapshots.
+
+    Args:
+        urls (list): The page URLs.
+        snapshot_dir (Path): Directory the snapshots are saved in.
+    """
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    for url in urls:
+        with urlopen(Request(url, headers={'User-Agent': 'Mozilla/5.0'}), timeout=30) as response:
+            snapshot_path(url, snapshot_dir).write_bytes(response.read())
+        print(f"Saved snapshot of {url}")
+
+def page_text(html: str) -> str:
+    """Extract the readable text of a page, without navigation and scripts.
+
+    Args:
+        html (str): The page's HTML.
+
+    Returns:
+        str: One line per block of text.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(['script', 'style', 'noscript', 'nav', 'header', 'footer', 'form', 'svg']):
+        tag.decompose()
+    lines = (' '.join(line.split()) for line in soup.get_text('\n').splitlines())
+    return '\n'.join(line for line in lines if line)
+
+def chunk_text(text: str, chunk_chars: int = CHUNK_CHARS) -> list:
+    """Split text into chunks of about a number of characters, at line boundaries.
+
+    Args:
+        text (str): The text.
+        chunk_chars (int): Target chunk size.
+
+    Returns:
+        list: The chunks.
+    """
+    chunks = []
+    current = ''
+    for line in text.splitlines():
+        if current and len(current) + len(line) + 1 > chunk_chars:
+            chunks.append(current)
+            current = ''
+        current = f'{current}\n{line}' if current else line
+    if current:
+        chunks.append(current)
+    return chunks
+
+def embed_texts(texts: list, model: str = EMBEDDING_MODEL) -> np.ndarray:
+    """Embed texts and normalise the vectors to unit length.
+
+    Args:
+        texts (list): The texts.
+        model (str): The embedding model.
+
+    Returns:
+        np.ndarray: One float32 row per text.
+    """
+    response = litellm.embedding(model=model, input=texts)
+    vectors = np.array([item['embedding'] for item in response.data], dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True).clip(min=1e-12)
+
+def build_site_index(urls: list = SITE_PAGES, snapshot_dir: Path = SNAPSHOT_DIR,
+                     index_dir: Path = INDEX_DIR, embed=embed_texts, model: str = EMBEDDING_MODEL) -> dict:
+    """Build or refresh the index from the saved snapshots.
+
+    Pages whose extracted text has the same hash as in the existing index
+    keep their chunks and embeddings; only new and changed pages are embedded.
+    Every page is embedded again when the existing index used another model.
+
+    Args:
+        urls (list): The page URLs.
+        snapshot_dir (Path): Directory of the HTML snapshots.
+        index_dir (Path): Directory of the index.
+        embed (callable): Function embedding a list of texts with a model into normalised rows.
+        model (str): The embedding model.
+
+    Returns:
+        dict: The new manifest: the model, the embedding dimension, and each
+            page URL with its text hash and row range.
+    """
+    old = load_site_index(index_dir)
+    if old is not None and old.model != model:
+        print(f"Embedding model changed from {old.model} to {model}, embedding every page")
+        old = None
+    chunks = []
+    vectors = []
+    pages = {}
+
+    for url in urls:
+        text = page_text(snapshot_path(url, snapshot_dir).read_text(encoding='utf-8', errors='ignore'))
+        text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        previous = old.pages.get(url) if old else None
+        if previous and previous['hash'] == text_hash:
+            page_chunks = old.chunks[previous['start']:previous['end']]
+            page_vectors = np.array(old.embeddings[previous['start']:previous['end']])
+            print(f"Unchanged: {url}")
+        else:
+            page_chunks = chunk_text(text)
+            page_vectors = embed(page_chunks, model) if page_chunks else None
+            print(f"Embedded {len(page_chunks)} chunks of {url}")
+
+        pages[url] = {'hash': text_hash, 'start': len(chunks), 'end': len(chunks) + len(page_chunks)}
+        chunks.extend(page_chunks)
+        if page_chunks:
+            vectors.append(page_vectors)
+
+    embeddings = np.concatenate(vectors).astype(np.float32) if vectors else np.zeros((0, 0), dtype=np.float32)
+    manifest = {'model': model, 'dimension': int(embeddings.shape[1]), 'pages': pages}
+
+    # Write the build to its own directory and point CURRENT at it. The previous build is
+    # kept for readers that have just read CURRENT; older builds and files are removed
+    current_path = index_dir / 'CURRENT'
+    previous_version = current_path.read_text(encoding='utf-8').strip() if current_path.exists() else None
+    version = uuid.uuid4().hex
+    version_dir = index_dir / version
+    version_dir.mkdir(parents=True)
+    np.save(version_dir / 'embeddings.npy', embeddings)
+    with open(version_dir / 'chunks.json', 'w', encoding='utf-8') as f:
+        json.dump(chunks, f, ensure_ascii=False)
+    with open(version_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    tmp_path = index_dir / f'CURRENT.{version}.tmp'
+    tmp_path.write_text(version, encoding='utf-8')
+    os.replace(tmp_path, current_path)
+
+    for path in index_dir.iterdir():
+        if path.name in ('CURRENT', version, previous_version):
+            continue
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        elif not path.name.startswith('CURRENT.'):
+            path.unlink(missing_ok=True)
+    return manifest
+
+class SiteIndex:
+    """A built site index with its embeddings memory-mapped."""
+
+    def __init__(self, version_dir: Path):
+        """Open one build of an index.
+
+        Args:
+            version_dir (Path): Directory of the build.
+        """
+        self.embeddings = np.load(version_dir / 'embeddings.npy', mmap_mode='r')
+        with open(version_dir / 'chunks.json', 'r', encoding='utf-8') as f:
+            self.chunks = json.load(f)
+        with open(version_dir / 'manifest.json', 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.model = manifest['model']
+        self.dimension = manifest['dimension']
+        self.pages = manifest['pages']
+
+    def search(self, url: str, query_vector: np.ndarray, top_k: int = 3) -> list:
+        """Return the chunks of a page most similar to a query.
+
+        Args:
+            url (str): The page URL.
+            query_vector (np.ndarray): The normalised query embedding.
+            top_k (int): Maximum number of chunks returned.
+
+        Returns:
+            list: The chunks, most similar first.
+        """
+        page = self.pages[url]
+        scores = self.embeddings[page['start']:page['end']] @ query_vector
+        best = np.argsort(-scores)[:top_k]
+        return [self.chunks[page['start'] + int(row)] for row in best]
+
+_site_indexes = {}
+_site_indexes_lock = threading.Lock()
+
+def load_site_index(index_dir: Path = INDEX_DIR):
+    """Return the current build of the index in a directory, reopening it when it has been rebuilt.
+
+    Args:
+        index_dir (Path): Directory of the index.
+
+    Returns:
+        SiteIndex: The index, or None if it has not been built.
+    """
+    try:
+        version = (index_dir / 'CURRENT').read_text(encoding='utf-8').strip()
+    except FileNotFoundError:
+        return None
+    with _site_indexes_lock:
+        cached = _site_indexes.get(index_dir)
+        if cached is None or cached[0] != version:
+            cached = (version, SiteIndex(index_dir / version))
+            _site_indexes[index_dir] = cached
+        return cached[1]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fetch', action='store_true', help='Download fresh snapshots of the pages first')
+    args = parser.parse_args()
+
+    if args.fetch:
+        fetch_snapshots()
+    build_site_index()
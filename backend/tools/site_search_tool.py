@@ -0,0 +1,57 @@
+from crewai_tools import WebsiteSearchTool
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+from tools.site_index import load_site_index, embed_texts
+from functools import lru_cache
+from typing import Any, Type
+
+class SiteSearchToolSchema(BaseModel):
+    """Input for SiteSearchTool."""
+
+    search_query: str = Field(..., description="Mandatory search query you want to use to search a specific website")
+
+@lru_cache(maxsize=256)
+def _query_embedding(query: str, model: str):
+    """Embed a search query, remembering recent queries."""
+    return embed_texts([query], model)[0]
+
+class SiteSearchTool(BaseTool):
+    """Semantic search over a page of the local site index, without crawling or embedding the page."""
+
+    name: str = "Search in a specific website"
+    description: str = "A tool that can be used to semantic search a query from a specific website content."
+    args_schema: Type[BaseModel] = SiteSearchToolSchema
+    website: str
+    top_k: int = 3
+
+    def __init__(self, website: str, **kwargs):
+        """Initialize the tool for one indexed page.
+
+        Args:
+            website (str): URL of the page, as listed in the site index.
+        """
+        super().__init__(website=website, **kwargs)
+        self.description = f"A tool that can be used to semantic search a query from {website} website content."
+
+    def _run(self, search_query: str, **kwargs: Any) -> Any:
+        """Return the page content most relevant to the query."""
+        index = load_site_index()
+        if index is None or self.website not in index.pages:
+            return f"The content of {self.website} is not indexed."
+        # Queries are embedded with the model the index was built with
+        chunks = index.search(self.website, _query_embedding(search_query, index.model), self.top_k)
+        return "Relevant Content:\n" + "\n\n".join(chunks)
+
+def website_search_tool(website: str) -> BaseTool:
+    """Return a search tool for a website page, from the local site index when it has the page.
+
+    Args:
+        website (str): URL of the page.
+
+    Returns:
+        BaseTool: A SiteSearchTool, or a WebsiteSearchTool that crawls and embeds the page.
+    """
+    index = load_site_index()
+    if index is not None and website in index.pages:
+        return SiteSearchTool(website=website)
+    return WebsiteSearchTool(website=website)
@@ -1,15 +1,101 @@
-import http.client
 import os
 import json
 import base64
+import threading
+from functools import lru_cache
+from urllib.parse import urlencode
 from crewai.tools import BaseTool
 from typing import Type
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
-import contextlib
+from tools.connection_pool import HTTPSConnectionPool
+from tools.response_cache import ResponseCache, CACHE_ROOT
+from tools.keyword_store import KeywordMetricsStore
 
 load_dotenv()
 
+_connection_pool = None
+_connection_pool_lock = threading.Lock()
+_response_cache = None
+_response_cache_lock = threading.Lock()
+_keyword_store = None
+_keyword_store_lock = threading.Lock()
+
+def get_connection_pool() -> HTTPSConnectionPool:
+    """Return the process-wide keep-alive connection pool for the SpyFu API.
+
+    Returns:
+        HTTPSConnectionPool: The shared connection pool, created on first use.
+    """
+    global _connection_pool
+    with _connection_pool_lock:
+        if _connection_pool is None:
+            _connection_pool = HTTPSConnectionPool(
+                os.getenv("SPYFU_API_HOST", "www.spyfu.com"),
+                port=int(os.getenv("SPYFU_API_PORT", 443)),
+                max_size=int(os.getenv("SPYFU_POOL_SIZE", 10)),
+                idle_timeout=float(os.getenv("SPYFU_POOL_IDLE_TIMEOUT", 30))
+            )
+        return _connection_pool
+
+def get_response_cache():
+    """Return the process-wide SpyFu response cache.
+
+    The cache is disabled by setting SPYFU_CACHE_ENABLED to "false".
+
+    Returns:
+        ResponseCache: The shared response cache, or None if caching is disabled.
+    """
+    global _response_cache
+    if os.getenv("SPYFU_CACHE_ENABLED", "true").lower() == "false":
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                os.getenv("SPYFU_CACHE_DIR", CACHE_ROOT / "spyfu"),
+                ttl=float(os.getenv("SPYFU_CACHE_TTL", 7 * 24 * 3600)),
+                max_bytes=int(os.getenv("SPYFU_CACHE_MAX_BYTES", 100 * 1024 * 1024))
+            )
+        return _response_cache
+
+def get_keyword_store():
+    """Return the process-wide keyword metrics store shared by all users.
+
+    The store is disabled by setting KEYWORD_STORE_ENABLED to "false". It holds
+    the users' keyword views, so API nodes serving the same users must share
+    KEYWORD_STORE_PATH, as they share JOB_STORE_DIR.
+
+    Returns:
+        KeywordMetricsStore: The shared store, or None if it is disabled.
+    """
+    global _keyword_store
+    if os.getenv("KEYWORD_STORE_ENABLED", "true").lower() == "false":
+        return None
+    with _keyword_store_lock:
+        if _keyword_store is None:
+            _keyword_store = KeywordMetricsStore(
+                os.getenv("KEYWORD_STORE_PATH", CACHE_ROOT / "keyword_metrics.db"),
+                max_age=float(os.getenv("KEYWORD_STORE_MAX_AGE", 7 * 24 * 3600))
+            )
+        return _keyword_store
+
+@lru_cache(maxsize=1)
+def _build_auth_headers(api_id: str, secret_key: str) -> dict:
+    """Build the SpyFu authentication headers for a set of credentials.
+
+    Args:
+        api_id (str): SpyFu API ID.
+        secret_key (str): SpyFu secret key.
+
+    Returns:
+        dict: A dictionary containing the authorization headers.
+    """
+    auth_string = base64.b64encode(f"{api_id}:{secret_key}".encode()).decode()
+    return {
+        'Authorization': f'Basic {auth_string}',
+        'Accept': 'application/json'
+    }
+
 class SpyfuToolInput(BaseModel):
     """Input schema for SpyfuTool."""
     domain: str = Field(..., description="Domain to analyze")
@@ -64,11 +150,32 @@ class SpyfuTool(BaseTool):
         if not api_id or not secret_key:
             raise ValueError("SPYFU_API_ID and SPYFU_SECRET_KEY must be set in .env file")
 
-        auth_string = base64.b64encode(f"{api_id}:{secret_key}".encode()).decode()
-        return {
-            'Authorization': f'Basic {auth_string}',
-            'Accept': 'application/json'
-        }
+        return _build_auth_headers(api_id, secret_key)
+
+    def _request(self, endpoint: str, params: dict, use_cache: bool = True):
+        """Send a GET request to the SpyFu API, serving it from the response cache when possible.
+
+        Args:
+            endpoint (str): The API endpoint path.
+            params (dict): The query parameters.
+            use_cache (bool): Whether to read and write the response cache.
+
+        Returns:
+            tuple: The response status code and the response body as bytes.
+        """
+        cache = get_response_cache() if use_cache else None
+        if cache is not None:
+            cached = cache.get(endpoint, params)
+            if cached is not None:
+                return 200, cached
+
+        url = f"{endpoint}?{urlencode(params)}"
+        status, data = get_connection_pool().request("GET", url, headers=self._get_auth_headers())
+
+        # Only successful responses are cached so that errors are retried on the next run
+        if cache is not None and status == 200:
+            cache.set(endpoint, params, data)
+        return status, data
 
     def _clean_domain(self, domain: str) -> str:
         """Clean domain URL by removing protocol and trailing slashes.
@@ -91,84 +198,78 @@ class SpyfuTool(BaseTool):
             str: JSON string containing the top PPC competitors data or error message.
         """
         try:
-            with contextlib.closing(http.client.HTTPSConnection("www.spyfu.com")) as conn:
-                headers = self._get_auth_headers()
-                clean_domain = self._clean_domain(domain)
-
-                url = (
-                    f"/apis/competitors_api/v2/ppc/getTopCompetitors?"
-                    f"domain={clean_domain}&"
-                    f"startingRow=2&"
-                    f"pageSize=5&"
-                    f"countryCode=IN"
-                )
-
-                conn.request("GET", url, headers=headers)
-                res = conn.getresponse()
-                data = res.read()
-
-                if res.status == 200:
-                    return data.decode("utf-8")
-                else:
-                    error_msg = f"Error getting competitors: {res.status} - {data.decode('utf-8')}"
-                    print(f"SpyFu API Error: {error_msg}")
-                    return json.dumps({"error": error_msg})
+            clean_domain = self._clean_domain(domain)
+
+            status, data = self._request(
+                "/apis/competitors_api/v2/ppc/getTopCompetitors",
+                {
+                    'domain': clean_domain,
+                    'startingRow': 2,
+                    'pageSize': 5,
+                    'countryCode': 'IN'
+                }
+            )
+
+            if status == 200:
+                return data.decode("utf-8")
+            else:
+                error_msg = f"Error getting competitors: {status} - {data.decode('utf-8')}"
+                print(f"SpyFu API Error: {error_msg}")
+                return json.dumps({"error": error_msg})
 
         except Exception as e:
             error_msg = f"Error in PPC competitors request: {str(e)}"
             print(error_msg)
             return json.dumps({"error": error_msg})
 
-    def _get_ppc_research(self, domain: str) -> str:
+    def _get_ppc_research(self, domain: str, use_cache: bool = True) -> str:
         """Get PPC research data.
 
         Args:
             domain (str): The domain to analyze.
+            use_cache (bool): Whether the response may be served from the response cache.
 
         Returns:
             str: JSON string containing the PPC research data or error message.
         """
         try:
-            with contextlib.closing(http.client.HTTPSConnection("www.spyfu.com")) as conn:
-                headers = self._get_auth_headers()
-                clean_domain = self._clean_domain(domain)
-
-                url = (
-                    f"/apis/keyword_api/v2/ppc/getMostSuccessful?"
-                    f"query={clean_domain}&"
-                    f"startingRow=1&"
-                    f"pageSize=10&"
-                    f"countryCode=IN"
-                )
-
-                conn.request("GET", url, headers=headers)
-                res = conn.getresponse()
-                data = res.read()
-
-                if res.status == 200:
-                    full_data = json.loads(data.decode("utf-8"))
-                    filtered_results = [
-                        {
-                            'keyword': result.get('keyword'),
-                            'searchVolume': result.get('searchVolume'),
-                            'rankingDifficulty': result.get('rankingDifficulty'),
-                            'totalMonthlyClicks': result.get('totalMonthlyClicks'),
-                            'exactCostPerClick': result.get('exactCostPerClick'),
-                            'paidCompetitors': result.get('paidCompetitors')
-                        }
-                        for result in full_data.get('results', [])
-                    ]
-
-                    filtered_data = {
-                        'resultCount': full_data.get('resultCount'),
-                        'results': filtered_results
+            clean_domain = self._clean_domain(domain)
+
+            status, data = self._request(
+                "/apis/keyword_api/v2/ppc/getMostSuccessful",
+                {
+                    'query': clean_domain,
+                    'startingRow': 1,
+                    'pageSize': 10,
+                    'countryCode': 'IN'
+                },
+                use_cache=use_cache
+            )
+
+            if status == 200:
+                full_data = json.loads(data.decode("utf-8"))
+                filtered_results = [
+                    {
+                        'keyword': result.get('keyword'),
+                        'searchVolume': result.get('searchVolume'),
+                        'rankingDifficulty': result.get('rankingDifficulty'),
+                        'totalMonthlyClicks': result.get('totalMonthlyClicks'),
+                        'exactCostPerClick': result.get('exactCostPerClick'),
+                        'paidCompetitors': result.get('paidCompetitors')
                     }
+                    for result in full_data.get('results', [])
+                ]
+
+                filtered_data = {
+                    'resultCount': full_data.get('resultCount'),
+                    'results': filtered_results
+                }
 
-                    return json.dumps(filtered_data, indent=2)
-                else:
-                    error_msg = f"Error getting PPC research: {res.status} - {data.decode('utf-8')}"
-                    print(f"SpyFu API Error: {error_msg}")
-                    return json.dumps({"error": error_msg})
+                return json.dumps(filtered_data, separators=(',', ':'))
+            else:
+                error_msg = f"Error getting PPC research: {status} - {data.decode('utf-8')}"
+                print(f"SpyFu API Error: {error_msg}")
+                return json.dumps({"error": error_msg})
 
         except Exception as e:
             error_msg = f"Error in PPC research request: {str(e)}"
@@ -0,0 +1,224 @@
+import os
+import json
+import threading
+import litellm
+from typing import Any, Optional
+from pydantic import Field
+from crewai_tools import FileReadTool
+
+# litellm has no local tokenizer for Claude 3 and later models and counts them
+# with OpenAI's, which yields fewer tokens than Claude's own; their estimates
+# are scaled up by this ratio
+CLAUDE_TOKEN_RATIO = 1.2
+
+def estimate_tokens(text: str, model: str = None) -> int:
+    """Estimate the number of tokens a text costs as model input.
+
+    Args:
+        text (str): The text.
+        model (str, optional): Model whose tokenizer is used, if litellm knows it.
+
+    Returns:
+        int: The estimated token count; about four characters per token if no
+            tokenizer is available.
+    """
+    model = model or 'gpt-4o'
+    try:
+        tokens = litellm.token_counter(model=model, text=text)
+    except Exception:
+        return (len(text) + 3) // 4
+    name = model.rsplit('/', 1)[-1]
+    if name.startswith('claude') and not name.startswith(('claude-2', 'claude-instant')):
+        return int(tokens * CLAUDE_TOKEN_RATIO)
+    return tokens
+
+def _table_rows(data):
+    """Return the rows of JSON data shaped like a table, or None.
+
+    A table is a list of flat objects, or an object of flat objects; in the
+    latter case each row is prefixed with its key unless the row already
+    holds it, as keyword details keyed by keyword do.
+    """
+    if isinstance(data, list) and data and all(isinstance(row, dict) for row in data):
+        rows = data
+    elif isinstance(data, dict) and data and all(isinstance(row, dict) for row in data.values()):
+        if all(key in row.values() for key, row in data.items()):
+            rows = list(data.values())
+        else:
+            rows = [{'key': key, **row} for key, row in data.items()]
+    else:
+        return None
+    if any(isinstance(value, (dict, list)) for row in rows for value in row.values()):
+        return None
+    return rows
+
+def compact_payload(text: str, data_format: str = 'tsv') -> str:
+    """Serialise JSON text compactly for an agent.
+
+    Args:
+        text (str): The file content.
+        data_format (str): 'tsv' renders tables of flat records as tab-separated
+            rows under one header line, falling back to minified JSON; 'json'
+            always minifies. Any other value leaves the text unchanged.
+
+    Returns:
+        str: The compact text, or the original text if it is not JSON.
+    """
+    if data_format not in ('tsv', 'json'):
+        return text
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return text
+
+    rows = _table_rows(data) if data_format == 'tsv' else None
+    if rows is None:
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+    columns = list(dict.fromkeys(column for row in rows for column in row))
+    lines = ['\t'.join(columns)]
+    for row in rows:
+        lines.append('\t'.join('' if row.get(column) is None else str(row.get(column)) for column in columns))
+    return '\n'.join(lines)
+
+class TokenBudget:
+    """Per-task token budget for the payloads tools return to agents.
+
+    Every tool payload is measured; a payload is cut down to what is left of
+    its task's budget and to its tool's own cap. The totals are kept per task
+    and per tool so each run can log its estimated input cost.
+    """
+
+    def __init__(self, task_limit: int = 16000, tool_limit: int = 12000, model: str = None):
+        """Initialize the budget.
+
+        Args:
+            task_limit (int): Maximum tokens of tool payloads per task.
+            tool_limit (int): Maximum tokens of a single tool payload.
+            model (str, optional): Model whose tokenizer is used for estimates
+                of tools that don't name their agent's model.
+        """
+        self.task_limit = task_limit
+        self.tool_limit = tool_limit
+        self.model = model
+        self._usage = {}
+        self._lock = threading.Lock()
+
+    def allowance(self, task_name: str, tool_limit: int = None) -> int:
+        """Return how many tokens the next payload of a task may use.
+
+        Args:
+            task_name (str): Name of the task the tool belongs to.
+            tool_limit (int, optional): The tool's own cap, if lower than the default.
+
+        Returns:
+            int: The token allowance.
+        """
+        with self._lock:
+            used = sum(tool['sent'] for tool in self._usage.get(task_name, {}).values())
+        cap = self.tool_limit if tool_limit is None else min(tool_limit, self.tool_limit)
+        return max(0, min(self.task_limit - used, cap))
+
+    def record(self, task_name: str, tool_name: str, tokens: int, sent: int):
+        """Record one tool payload.
+
+        Args:
+            task_name (str): Name of the task the tool belongs to.
+            tool_name (str): Name of the tool.
+            tokens (int): Estimated tokens of the full payload.
+            sent (int): Estimated tokens actually returned to the agent.
+        """
+        with self._lock:
+            tool = self._usage.setdefault(task_name, {}).setdefault(
+                tool_name, {'calls': 0, 'tokens': 0, 'sent': 0, 'truncated': 0}
+            )
+            tool['calls'] += 1
+            tool['tokens'] += tokens
+            tool['sent'] += sent
+            tool['truncated'] += int(sent < tokens)
+
+    def summary(self) -> dict:
+        """Return the recorded usage.
+
+        Returns:
+            dict: Task name to tool name to calls, payload tokens, tokens sent and truncations.
+        """
+        with self._lock:
+            return {task: {tool: dict(usage) for tool, usage in tools.items()} for task, tools in self._usage.items()}
+
+    def log(self):
+        """Print the estimated tool payload tokens of the run, per task and tool."""
+        total = 0
+        for task, tools in self.summary().items():
+            sent = sum(usage['sent'] for usage in tools.values())
+            total += sent
+            print(f"Token budget for {task}: {sent}/{self.task_limit} tokens")
+            for tool, usage in tools.items():
+                truncated = f", truncated {usage['truncated']}x" if usage['truncated'] else ''
+                print(f"  {tool}: {usage['calls']} calls, {usage['sent']} of {usage['tokens']} tokens sent{truncated}")
+        print(f"Estimated tool payload tokens this run: {total}")
+
+def truncate_to_tokens(text: str, tokens: int, limit: int) -> str:
+    """Cut a text down to about a number of tokens, at a line boundary if possible.
+
+    Args:
+        text (str): The text.
+        tokens (int): Estimated tokens of the whole text.
+        limit (int): Token limit.
+
+    Returns:
+        str: The cut text, ending with a note on how much was left out.
+    """
+    keep = len(text) * limit // max(tokens, 1)
+    cut = text[:keep]
+    if '\n' in cut:
+        cut = cut[:cut.rindex('\n')]
+    return f"{cut}\n[Truncated to about {limit} of {tokens} tokens]"
+
+class BudgetedFileReadTool(FileReadTool):
+    """FileReadTool that serialises JSON compactly and respects a token budget."""
+
+    task_name: str = ''
+    budget: Optional[Any] = None
+    max_tokens: Optional[int] = None
+    # The model of the agent reading the payload, whose tokens are what it costs
+    model: Optional[str] = None
+    data_format: str = Field(default_factory=lambda: os.getenv("AGENT_DATA_FORMAT", "tsv"))
+
+    def _run(self, **kwargs: Any) -> Any:
+        """Read the file and return its compact, budgeted content."""
+        file_path = kwargs.get("file_path", self.file_path)
+        try:
+            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+                content = compact_payload(f.read(), self.data_format)
+        except Exception as e:
+            return f"Fail to read the file {file_path}. Error: {e}"
+
+        if self.budget is None:
+            return content
+
+        tokens = estimate_tokens(content, self.model or self.budget.model)
+        allowance = self.budget.allowance(self.task_name, self.max_tokens)
+        if tokens > allowance:
+            content = truncate_to_tokens(content, tokens, allowance)
+        self.budget.record(self.task_name, self.name, tokens, min(tokens, allowance))
+        return content
+
+def token_budget_from_env(model: str = None) -> TokenBudget:
+    """Create a token budget from the TASK_TOKEN_BUDGET and TOOL_TOKEN_BUDGET environment variables.
+
+    The default tool limit fits the analysis tables of 10 competitors with 20
+    keywords each, about 8.5k tokens with OpenAI's tokenizer and 10k with
+    Claude's, so they reach the data analyst whole.
+
+    Args:
+        model (str, optional): Model whose tokenizer is used for estimates.
+
+    Returns:
+        TokenBudget: The budget for one crew run.
+    """
+    return TokenBudget(
+        task_limit=int(os.getenv("TASK_TOKEN_BUDGET", 16000)),
+        tool_limit=int(os.getenv("TOOL_TOKEN_BUDGET", 12000)),
+        model=model
+    )